@@ -4,11 +4,14 @@ from __future__ import annotations
 
 from aiohttp import web
 
+from app.services.ai.batch_executor import provider_slot_metrics
+from app.services.retrieval.rate_limit import rate_limiter_metrics
 from app.services.retrieval.registry import RetrievalRegistry
 
 
 def setup_source_routes(app: web.Application) -> None:
     app.router.add_get("/api/sources", list_sources)
+    app.router.add_get("/api/sources/metrics", source_metrics)
 
 
 async def list_sources(request: web.Request) -> web.Response:
@@ -21,3 +24,8 @@ async def list_sources(request: web.Request) -> web.Response:
         for name, instance in registry.list_sources().items()
     ]
     return web.json_response({"data": sources})
+
+
+async def source_metrics(request: web.Request) -> web.Response:
+    """Process-wide rate limiter queue depth and wait times per source, plus LLM concurrency slots."""
+    return web.json_response({"data": {"rate_limiters": rate_limiter_metrics(), "llm_slots": provider_slot_metrics()}})
@@ -331,6 +331,18 @@ async def list_runs(request: web.Request) -> web.Response:
         return web.json_response({"data": data})
 
 
+async def explain_task_query(request: web.Request) -> web.Response:
+    """Show the compiled upstream query of every source for the next run."""
+    task_id = int(request.match_info["task_id"])
+    async with async_session() as session:
+        repo = TaskRepository(session)
+        task = await repo.get_task(task_id)
+        if not task:
+            return web.json_response({"error": "task not found"}, status=404)
+        plan = await TaskRunner().explain_retrieval(session, task)
+        return web.json_response({"data": plan}, dumps=lambda obj: json.dumps(obj, default=str, ensure_ascii=False))
+
+
 async def suggest_keywords(request: web.Request) -> web.Response:
     payload = await request.json()
     prompt = payload.get("prompt")
@@ -532,6 +544,7 @@ def setup_task_routes(app: web.Application) -> None:
     app.router.add_post("/api/tasks/{task_id}/archive", archive_task)  # Archive without deleting
     app.router.add_post("/api/tasks/{task_id}/run", run_task)
     app.router.add_get("/api/tasks/{task_id}/runs", list_runs)
+    app.router.add_get("/api/tasks/{task_id}/query-plan", explain_task_query)
     app.router.add_post("/api/tasks/keywords/suggest", suggest_keywords)
     # Task status control (simplified to start/stop only)
     app.router.add_post("/api/tasks/{task_id}/start", start_task)
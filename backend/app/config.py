@@ -30,9 +30,61 @@ class AIProviderConfig(BaseModel):
     extra: Dict[str, str] = Field(default_factory=dict)
 
 
+class LLMConcurrencySettings(BaseModel):
+    """Maximum in-flight LLM calls per provider, shared by all running tasks."""
+    default_limit: int = 4
+    # 按提供商覆盖，例如 {"deepseek": 8}
+    providers: Dict[str, int] = Field(default_factory=dict)
+
+
+class FilterVerdictCacheSettings(BaseModel):
+    """On-disk cache of per-document coarse/fine filter verdicts."""
+    enabled: bool = True
+    path: str = "./cache/filter_verdicts.sqlite3"
+    ttl_seconds: float = 30 * 86400.0
+    max_entries: int = 100000
+
+
+class BatchTokenBudget(BaseModel):
+    """Estimated prompt + answer tokens one filter batch may use, and per-document abstract budgets."""
+    coarse_tokens: int = 4000
+    fine_tokens: int = 6000
+    coarse_max_documents: int = 60
+    fine_max_documents: int = 16
+    # 摘要按估算 token 截断：粗筛只看开头几句，精筛只截断特别长的摘要
+    coarse_abstract_tokens: int = 40
+    fine_abstract_tokens: int = 400
+
+
+class BatchBudgetSettings(BatchTokenBudget):
+    # 按模型覆盖，例如 {"deepseek-chat": {"fine_tokens": 12000}}
+    models: Dict[str, BatchTokenBudget] = Field(default_factory=dict)
+
+
+class RelevanceModelSettings(BaseModel):
+    """Per-task classifier that pre-screens documents before the LLM filter."""
+    path: str = "./cache/relevance_models"
+    n_features: int = 2 ** 18
+    # 概率不低于 accept 直接选中、不高于 reject 直接排除，其余送入精筛
+    accept_threshold: float = 0.9
+    reject_threshold: float = 0.05
+    # 训练样本和正样本达到下限之前只训练、不参与筛选
+    min_examples: int = 200
+    min_positives: int = 20
+    learning_rate: float = 0.5
+    l2: float = 1e-6
+    batch_size: int = 64
+    epochs: int = 3
+    bootstrap_epochs: int = 10
+
+
 class AISettings(BaseModel):
     default_provider: str = "openai"
     providers: Dict[str, AIProviderConfig] = Field(default_factory=dict)
+    concurrency: LLMConcurrencySettings = Field(default_factory=LLMConcurrencySettings)
+    verdict_cache: FilterVerdictCacheSettings = Field(default_factory=FilterVerdictCacheSettings)
+    batch_budget: BatchBudgetSettings = Field(default_factory=BatchBudgetSettings)
+    relevance_model: RelevanceModelSettings = Field(default_factory=RelevanceModelSettings)
     keyword_model: Optional[str] = None
     filter_model: Optional[str] = None
     summary_model: Optional[str] = None
@@ -75,8 +127,68 @@ class RetrievalSourceConfig(BaseModel):
     parameters: Dict[str, str] = Field(default_factory=dict)
 
 
+class RetrievalCacheSettings(BaseModel):
+    """On-disk cache of parsed retrieval results."""
+    enabled: bool = True
+    path: str = "./cache/retrieval_cache.sqlite3"
+    ttl_seconds: float = 1800.0
+    max_entries: int = 500
+
+
+class ArxivMirrorSettings(BaseModel):
+    """Local arXiv metadata mirror harvested over OAI-PMH (source ``arxiv_local``)."""
+    path: str = "./cache/arxiv_mirror.sqlite3"
+    oai_url: str = "https://oaipmh.arxiv.org/oai"
+    sets: List[str] = Field(default_factory=lambda: ["cs"])
+    # 首次收割的起始日期（YYYY-MM-DD），为空则收割全部历史
+    initial_from: Optional[str] = None
+    request_interval_seconds: float = 3.0
+    # 定时增量收割的 crontab 表达式，例如 "30 5 * * *"；为空则只能手动执行
+    harvest_cron: Optional[str] = None
+
+
+class AdaptiveFetchSettings(BaseModel):
+    """Bounds for task sources configured with ``max_results="auto"``."""
+    min_results: int = 10
+    max_results: int = 200
+    # 期望的选中率：低于它逐步缩小检索量，高于它且取满时逐步放大
+    target_yield: float = 0.2
+    max_step: float = 1.5
+    headroom: float = 1.3
+    history_runs: int = 7
+
+
+class NearDuplicateSettings(BaseModel):
+    """MinHash/LSH grouping of near-duplicate documents, for tasks with ``filter_config.near_duplicates``."""
+    path: str = "./cache/near_duplicates"
+    num_perm: int = 128
+    bands: int = 32
+    # 估计的 Jaccard 相似度（词三元组）达到该值视为同一篇文献的不同版本
+    threshold: float = 0.7
+    shingle_size: int = 3
+    min_shingles: int = 8
+
+
 class RetrievalSettings(BaseModel):
     sources: List[RetrievalSourceConfig] = Field(default_factory=lambda: [RetrievalSourceConfig(name="arxiv")])
+    cache: RetrievalCacheSettings = Field(default_factory=RetrievalCacheSettings)
+    mirror: ArxivMirrorSettings = Field(default_factory=ArxivMirrorSettings)
+    adaptive_fetch: AdaptiveFetchSettings = Field(default_factory=AdaptiveFetchSettings)
+    near_duplicates: NearDuplicateSettings = Field(default_factory=NearDuplicateSettings)
+    # 进程内合并同时发起的相同查询，只请求上游一次
+    single_flight: bool = True
+    # 单个来源的检索超时（秒），可被任务来源参数 timeout 覆盖；超时保留已取回的部分结果
+    source_timeout_seconds: float = 120.0
+
+
+class HttpClientSettings(BaseModel):
+    """Shared HTTP connection pool used for retrieval, LLM calls and webhooks."""
+    max_connections: int = 50
+    max_keepalive_connections: int = 20
+    keepalive_expiry_seconds: float = 30.0
+    timeout_seconds: float = 60.0
+    connect_timeout_seconds: float = 10.0
+    http2: bool = True
 
 
 class AuthSettings(BaseModel):
@@ -127,6 +239,7 @@ class LiteaSettings(BaseSettings):
     scheduler: SchedulerSettings = Field(default_factory=SchedulerSettings)
     zotero: ZoteroSettings = Field(default_factory=ZoteroSettings)
     retrieval: RetrievalSettings = Field(default_factory=RetrievalSettings)
+    http: HttpClientSettings = Field(default_factory=HttpClientSettings)
     auth: AuthSettings = Field(default_factory=AuthSettings)
     static: StaticConfig = Field(default_factory=load_static_config)
 
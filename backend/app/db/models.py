@@ -6,6 +6,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, JSON, String, Text, UniqueConstraint
+from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -57,6 +58,7 @@ class Task(Base):
     sources: Mapped[List["TaskSource"]] = relationship(back_populates="task", cascade="all, delete-orphan")
     runs: Mapped[List["TaskRun"]] = relationship(back_populates="task", cascade="all, delete-orphan")
     documents: Mapped[List["Document"]] = relationship(back_populates="task")
+    watermarks: Mapped[List["RetrievalWatermark"]] = relationship(back_populates="task", cascade="all, delete-orphan")
 
 
 class TaskKeyword(Base):
@@ -84,6 +86,23 @@ class TaskSource(Base):
     source: Mapped[RetrievalSource] = relationship(back_populates="task_sources")
 
 
+class RetrievalWatermark(Base):
+    """High-water mark of what a task has already retrieved from a source."""
+
+    __tablename__ = "retrieval_watermarks"
+    __table_args__ = (UniqueConstraint("task_id", "source_name", name="uq_task_source_watermark"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    source_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    # 已检索文献中最新的提交时间 / 更新时间
+    last_published_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    last_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    task: Mapped[Task] = relationship(back_populates="watermarks")
+
+
 class TaskRun(Base):
     __tablename__ = "task_runs"
 
@@ -95,7 +114,8 @@ class TaskRun(Base):
     retrieved_count: Mapped[int] = mapped_column(Integer, default=0)
     filtered_count: Mapped[int] = mapped_column(Integer, default=0)
     summary: Mapped[Optional[str]] = mapped_column(Text())
-    run_metadata: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+    # MutableDict 让 run_metadata[key] = value 这类原地修改也能被持久化
+    run_metadata: Mapped[Dict[str, Any]] = mapped_column(MutableDict.as_mutable(JSON), default=dict)
 
     task: Mapped[Task] = relationship(back_populates="runs")
     documents: Mapped[List["Document"]] = relationship(back_populates="run")
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.db import models
+from app.utils.identity import arxiv_version, identity_keys
 
 
 class DocumentRepository:
@@ -51,6 +52,33 @@ class DocumentRepository:
         )
         return result.scalar_one_or_none()
 
+    async def get_canonical_index(self, task_id: int) -> Dict[str, int]:
+        """
+        Map every identity key of a task's documents to a row id.
+
+        Keys are derived from the stored fields, so rows saved before
+        canonical ids existed are matched too. When a task already holds
+        several versions of one paper, the newest row wins.
+        """
+        result = await self._session.execute(
+            select(
+                models.Document.id,
+                models.Document.source_name,
+                models.Document.external_id,
+                models.Document.url,
+                models.Document.extra_metadata,
+            ).where(models.Document.task_id == task_id)
+        )
+        index: Dict[str, int] = {}
+        versions: Dict[str, int] = {}
+        for doc_id, source_name, external_id, url, extra in result.all():
+            version = arxiv_version(external_id, url)
+            for key in identity_keys(external_id, url, (extra or {}).get("doi"), source_name):
+                if key not in index or version > versions[key]:
+                    index[key] = doc_id
+                    versions[key] = version
+        return index
+
     async def list_documents(
         self,
         filters: Dict[str, Any],
@@ -134,6 +162,18 @@ class DocumentRepository:
         
         return documents, total
 
+    async def list_training_documents(self, task_id: int, exported_only: bool = False) -> List[models.Document]:
+        """Documents of a task whose verdict came from the LLM filter or a Zotero export."""
+        stmt = select(models.Document).where(models.Document.task_id == task_id)
+        if exported_only:
+            stmt = stmt.where(models.Document.zotero_key.is_not(None))
+        result = await self._session.execute(stmt.order_by(models.Document.id))
+        # 只有模型真正给出的结论才带 filter_scope；失败回退、本地模型预判和规则预筛选的结论都没有，不能用于训练
+        return [
+            doc for doc in result.scalars().all()
+            if doc.zotero_key or (doc.extra_metadata or {}).get("filter_scope")
+        ]
+
     async def attach_summary(self, summary: models.DocumentSummary) -> models.DocumentSummary:
         self._session.add(summary)
         await self._session.flush()
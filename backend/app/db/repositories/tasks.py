@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from typing import Iterable, List, Optional
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
 
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
@@ -127,3 +128,40 @@ class TaskRepository:
             .limit(limit)
         )
         return list(result.scalars().all())
+
+    async def get_watermarks(self, task_id: int) -> Dict[str, models.RetrievalWatermark]:
+        """Return retrieval watermarks of a task keyed by source name."""
+        result = await self._session.execute(
+            select(models.RetrievalWatermark).where(models.RetrievalWatermark.task_id == task_id)
+        )
+        return {mark.source_name: mark for mark in result.scalars().all()}
+
+    async def advance_watermark(
+        self,
+        task_id: int,
+        source_name: str,
+        published_at: Optional[datetime] = None,
+        updated_at: Optional[datetime] = None,
+    ) -> models.RetrievalWatermark:
+        """Move a task/source watermark forward; it never moves backwards."""
+        result = await self._session.execute(
+            select(models.RetrievalWatermark).where(
+                models.RetrievalWatermark.task_id == task_id,
+                models.RetrievalWatermark.source_name == source_name,
+            )
+        )
+        mark = result.scalar_one_or_none()
+        if mark is None:
+            mark = models.RetrievalWatermark(task_id=task_id, source_name=source_name)
+            self._session.add(mark)
+        if published_at and (mark.last_published_at is None or _as_utc(published_at) > _as_utc(mark.last_published_at)):
+            mark.last_published_at = published_at
+        if updated_at and (mark.last_updated_at is None or _as_utc(updated_at) > _as_utc(mark.last_updated_at)):
+            mark.last_updated_at = updated_at
+        await self._session.flush()
+        return mark
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite 读回的时间不带时区，统一按 UTC 比较
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -13,6 +13,7 @@ from app.config import get_settings
 from app.db.session import async_session, get_engine
 from app.db.base import Base
 from app.logging_config import setup_logging
+from app.services.http_clients import http_pool
 from app.services.scheduler import TaskScheduler
 
 logger = logging.getLogger(__name__)
@@ -99,13 +100,21 @@ async def create_app() -> web.Application:
                     logger.info(f"Scheduled active task {task.id} ({task.name})")
                 except Exception as e:
                     logger.error(f"Failed to schedule task {task.id}: {e}")
+        
+        harvest_cron = settings.retrieval.mirror.harvest_cron
+        if harvest_cron:
+            scheduler.schedule_mirror_harvest(harvest_cron)
     
     async def stop_scheduler(app):
         scheduler.shutdown()
         logger.info("Task scheduler stopped")
     
+    async def close_http_clients(app):
+        await http_pool.close()
+    
     app.on_startup.append(start_scheduler)
     app.on_cleanup.append(stop_scheduler)
+    app.on_cleanup.append(close_http_clients)
     
     return app
 
@@ -3,10 +3,13 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
+# 未设置温度的任务（包括旧任务的 ai_config）使用的默认值，两种筛选引擎共用
+DEFAULT_TEMPERATURE = 0.7
+
 
 class KeywordSchema(BaseModel):
     keyword: str
@@ -42,8 +45,29 @@ class AIModelConfig(BaseModel):
     model: str = Field(default="deepseek-chat", description="模型名称")
     api_key: Optional[str] = Field(None, description="API密钥（可选，使用全局配置）")
     base_url: Optional[str] = Field(None, description="API基础URL（可选）")
-    temperature: float = Field(default=0.7, ge=0, le=2, description="温度参数")
+    temperature: float = Field(default=DEFAULT_TEMPERATURE, ge=0, le=2, description="温度参数")
     max_tokens: Optional[int] = Field(None, description="最大token数")
+    engine: Literal["crewai", "direct"] = Field(default="crewai", description="筛选引擎: crewai 或 direct（直接以 JSON 模式调用提供商）")
+
+
+class PrefilterConfig(BaseModel):
+    """规则预筛选配置，在任何AI筛选之前按确定性规则排除文献"""
+    include_terms: List[str] = Field(default_factory=list, description="标题或摘要须包含其中至少一个词组；title:/abstract: 前缀限定字段")
+    exclude_terms: List[str] = Field(default_factory=list, description="标题或摘要包含任一词组即排除，如 title:survey")
+    primary_category: List[str] = Field(default_factory=list, description="主分类须为其中之一，支持 cs.* 通配")
+    categories: List[str] = Field(default_factory=list, description="分类须与其中至少一个重合")
+    exclude_categories: List[str] = Field(default_factory=list, description="含任一分类即排除")
+    authors: List[str] = Field(default_factory=list, description="作者须包含其中至少一人")
+    exclude_authors: List[str] = Field(default_factory=list, description="含任一作者即排除")
+    published_after: Optional[str] = Field(None, description="只保留此日期及之后发表的文献（ISO 格式，如 2024-01-01）")
+    published_before: Optional[str] = Field(None, description="只保留此日期之前发表的文献（ISO 格式）")
+
+    @field_validator("published_after", "published_before")
+    @classmethod
+    def validate_date(cls, value: Optional[str]) -> Optional[str]:
+        if value:
+            datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return value or None
 
 
 class FilterConfig(BaseModel):
@@ -53,6 +77,11 @@ class FilterConfig(BaseModel):
     min_relevance_score: float = Field(default=0.4, ge=0, le=1, description="最低相关度阈值")
     max_documents_per_source: int = Field(default=50, ge=1, le=200, description="每个来源最多筛选文献数")
     use_abstract_only: bool = Field(default=True, description="仅使用摘要进行筛选")
+    incremental: bool = Field(default=False, description="增量模式：内容未变且已按当前提示词评估过的文献沿用上次结论，不再送入AI筛选")
+    coarse_strategy: Literal["llm", "bm25"] = Field(default="llm", description="粗筛策略: llm(模型按标题快速筛选) 或 bm25(本地BM25词法排序，不调用模型)")
+    relevance_prescreen: bool = Field(default=False, description="用本任务历史筛选结果训练的本地模型预评分：高置信度的直接选中或排除，只有不确定的文献送入AI精筛")
+    near_duplicates: bool = Field(default=False, description="近似重复合并：改标题的预印本、会议与研讨会版本等只为一篇代表打分，其余沿用其结论")
+    prefilter: Optional[PrefilterConfig] = Field(None, description="规则预筛选：未通过规则的文献直接判为不相关，不调用模型")
 
 
 class SummaryConfig(BaseModel):
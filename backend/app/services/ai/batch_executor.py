@@ -0,0 +1,104 @@
+"""Bounded-concurrency execution of LLM batches, limited per provider."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from loguru import logger
+
+from app.config import get_settings
+from app.schemas.task import DEFAULT_TEMPERATURE
+
+
+class ProviderSlots:
+    """
+    Process-wide cap on in-flight LLM calls to one provider.
+
+    All tasks, sources and filter stages share the same slots, so running
+    batches in parallel never exceeds what the provider account allows.
+    Waiters are woken in arrival order.
+    """
+
+    def __init__(self, provider: str, limit: int) -> None:
+        self.provider = provider
+        self.limit = max(1, int(limit))
+        self._semaphore = asyncio.Semaphore(self.limit)
+        self._in_flight = 0
+        self._max_in_flight = 0
+        self._waiting = 0
+        self._calls = 0
+        self._total_wait = 0.0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._calls += 1
+        self._total_wait += time.monotonic() - started
+        self._in_flight += 1
+        self._max_in_flight = max(self._max_in_flight, self._in_flight)
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "max_in_flight": self._max_in_flight,
+            "queue_depth": self._waiting,
+            "calls": self._calls,
+            "avg_wait_seconds": round(self._total_wait / self._calls, 3) if self._calls else 0.0,
+        }
+
+
+_slots: Dict[str, ProviderSlots] = {}
+_unconfigured_warned: Set[str] = set()
+
+
+def resolve_provider(ai_config: Optional[Dict[str, Any]]) -> str:
+    """
+    Provider a task's LLM calls go to and are charged to.
+
+    A task names its own provider in ``ai_config``; when that provider is
+    not configured in this deployment the global default is used instead,
+    so tasks keep filtering rather than failing every batch.
+    """
+    settings = get_settings().ai
+    provider = (ai_config or {}).get("provider") if isinstance(ai_config, dict) else None
+    if provider and provider not in settings.providers:
+        if provider not in _unconfigured_warned:
+            _unconfigured_warned.add(provider)
+            logger.warning(
+                "AI provider '{}' is not configured, using default provider '{}'", provider, settings.default_provider
+            )
+        provider = None
+    return provider or settings.default_provider
+
+
+def resolve_temperature(ai_config: Optional[Dict[str, Any]]) -> float:
+    """Sampling temperature of a task; 0 is a valid setting, only a missing value falls back to the default."""
+    temperature = (ai_config or {}).get("temperature") if isinstance(ai_config, dict) else None
+    return float(DEFAULT_TEMPERATURE if temperature is None else temperature)
+
+
+def get_provider_slots(provider: str) -> ProviderSlots:
+    slots = _slots.get(provider)
+    if slots is None:
+        config = get_settings().ai.concurrency
+        slots = ProviderSlots(provider, config.providers.get(provider, config.default_limit))
+        _slots[provider] = slots
+    return slots
+
+
+def provider_slot_metrics() -> Dict[str, Dict[str, Any]]:
+    return {name: slots.metrics() for name, slots in _slots.items()}
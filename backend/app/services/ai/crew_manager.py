@@ -2,41 +2,28 @@
 
 from __future__ import annotations
 
-import os
-from typing import Any, Dict, List, Optional
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
-from crewai import Agent, Crew, Process, Task
+from crewai import LLM, Agent, Crew, Process, Task
 from loguru import logger
 
+try:
+    from langchain_community.chat_models import ChatLiteLLM
+except ImportError:  # pragma: no cover - 可选依赖
+    ChatLiteLLM = None
+
 from ...config import get_settings
+from ...schemas.task import DEFAULT_TEMPERATURE
+from .batch_executor import resolve_provider, resolve_temperature
+from .filter_prompts import DEFAULT_FILTER_PROMPT, FilterPrompt, coarse_filter_prompt, fine_filter_prompt
 from .provider_registry import ProviderRegistry
 
 
 _SETTINGS = get_settings()
 _STATIC_PROMPTS = _SETTINGS.static.prompts if _SETTINGS.static else {}
 
-_FALLBACK_FILTER_PROMPT = """请仔细阅读文献的完整信息，特别是摘要部分，然后评估：
-
-1. **相关性判断** (is_selected):
-    - 文献内容是否与研究主题直接相关？
-    - 是否包含所需的关键信息或方法？
-    - 返回 true（相关）或 false（不相关）
-
-2. **相关性评分** (score):
-    - 给出 0-1 之间的相关性评分
-    - 0.8-1.0: 高度相关，核心文献
-    - 0.6-0.8: 中度相关，参考价值
-    - 0.4-0.6: 低度相关，边缘相关
-    - 0.0-0.4: 基本不相关
-
-3. **文献总结** (summary):
-    - 用1-2句话总结文献的核心内容
-    - 说明为什么选择或不选择这篇文献
-
-4. **关键亮点** (highlights):
-    - 列出2-4个关键发现或创新点
-    - 与研究主题最相关的部分"""
-
 _FALLBACK_SUMMARY_PROMPT = """对筛选后的文献进行深度分析和综合总结。
 
 请从以下角度进行分析，所有输出内容均需使用中文表达：
@@ -67,45 +54,61 @@ _FALLBACK_SUMMARY_PROMPT = """对筛选后的文献进行深度分析和综合
     - 潜在的研究缺口和机会
     - 3-5个方向"""
 
-DEFAULT_FILTER_PROMPT = _STATIC_PROMPTS.get("filter_default", _FALLBACK_FILTER_PROMPT)
 DEFAULT_SUMMARY_PROMPT = _STATIC_PROMPTS.get("summary_default", _FALLBACK_SUMMARY_PROMPT)
 
+# 进程级缓存：LLM 客户端构造（含 TLS 上下文）远比 Agent/Task/Crew 昂贵，按 (provider, model, temperature) 复用
+_llm_cache: Dict[Tuple[str, str, float], Any] = {}
+_llm_lock = threading.Lock()
+
+
+def _get_llm(provider: str, llm_str: str, temperature: float, api_key: Optional[str], api_base: Optional[str]) -> Any:
+    key = (provider, llm_str, float(temperature))
+    with _llm_lock:
+        llm_obj = _llm_cache.get(key)
+        if llm_obj is None:
+            llm_obj = _build_llm(llm_str, temperature, api_key, api_base)
+            _llm_cache[key] = llm_obj
+    return llm_obj
+
+
+def _build_llm(llm_str: str, temperature: float, api_key: Optional[str], api_base: Optional[str]) -> Any:
+    # 凭据随客户端传入，不写进进程级环境变量，避免多个兼容 OpenAI 的提供商互相覆盖
+    # Prefer LiteLLM's ChatLiteLLM for proper LLM object
+    if ChatLiteLLM is not None:
+        try:
+            return ChatLiteLLM(
+                model=llm_str,
+                temperature=temperature,
+                api_base=api_base,
+                model_kwargs={"api_key": api_key} if api_key else {},
+            )
+        except ImportError:
+            pass
+    # Fallback to CrewAI's own LLM if langchain_community/litellm are not available
+    logger.warning("langchain_community not available, using CrewAI LLM for {}", llm_str)
+    return LLM(model=llm_str, temperature=temperature, api_key=api_key, base_url=api_base)
+
 
 class CrewManager:
     """Wrap crew creation for filtering and summarization flows."""
 
     def __init__(self, provider_registry: ProviderRegistry | None = None) -> None:
         self._registry = provider_registry or ProviderRegistry()
-        self._setup_environment()
 
-    def _setup_environment(self) -> None:
-        """Setup environment variables for LiteLLM providers."""
-        settings = get_settings()
-        provider = self._registry.get(settings.ai.default_provider)
-        
-        # Setup DeepSeek environment variables for LiteLLM
-        if provider.name == "deepseek":
-            if provider.api_key:
-                os.environ["DEEPSEEK_API_KEY"] = provider.api_key
-            if provider.base_url:
-                # LiteLLM expects the base URL without /v1 suffix for DeepSeek
-                base_url = provider.base_url.rstrip("/")
-                if base_url.endswith("/v1"):
-                    base_url = base_url[:-3]
-                os.environ["DEEPSEEK_API_BASE"] = base_url
-                logger.debug(f"Set DEEPSEEK_API_BASE={base_url}")
-        
-        # Setup OpenAI environment (used by default)
-        elif provider.name == "openai":
-            if provider.api_key:
-                os.environ["OPENAI_API_KEY"] = provider.api_key
-            if provider.base_url:
-                os.environ["OPENAI_API_BASE"] = provider.base_url
-
-    def _build_llm_string(self, model_override: Optional[str] = None) -> str:
+    def _credentials(self, provider_name: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """API key and LiteLLM base URL of a provider (default: the global one)."""
+        provider = self._registry.get(provider_name)
+        base_url = provider.base_url
+        if provider.name == "deepseek" and base_url:
+            # LiteLLM expects the base URL without /v1 suffix for DeepSeek
+            base_url = base_url.rstrip("/")
+            if base_url.endswith("/v1"):
+                base_url = base_url[:-3]
+        return provider.api_key, base_url
+
+    def _build_llm_string(self, model_override: Optional[str] = None, provider_name: Optional[str] = None) -> str:
         """Build LiteLLM-compatible model string."""
-        settings = get_settings()
-        provider = self._registry.get(settings.ai.default_provider)
+        provider = self._registry.get(provider_name)
         model = model_override or provider.model
         
         # For DeepSeek, use deepseek/model format with env vars
@@ -121,18 +124,22 @@ class CrewManager:
         else:
             return f"{provider.name}/{model}"
 
-    def _build_agent(self, name: str, role: str, goal: str, backstory: str, model_override: Optional[str] = None) -> Agent:
-        llm_str = self._build_llm_string(model_override)
+    def _build_agent(
+        self,
+        name: str,
+        role: str,
+        goal: str,
+        backstory: str,
+        model_override: Optional[str] = None,
+        temperature: float = DEFAULT_TEMPERATURE,
+        provider_name: Optional[str] = None,
+    ) -> Agent:
+        provider_name = provider_name or get_settings().ai.default_provider
+        llm_str = self._build_llm_string(model_override, provider_name)
         logger.debug(f"Building agent '{name}' with LLM: {llm_str}")
         
-        # Import LiteLLM's ChatLiteLLM for proper LLM object
-        try:
-            from langchain_community.chat_models import ChatLiteLLM
-            llm_obj = ChatLiteLLM(model=llm_str, temperature=0.7)
-        except ImportError:
-            # Fallback to string if langchain_community not available
-            logger.warning("langchain_community not available, using string for LLM")
-            llm_obj = llm_str
+        # Agent 本身很轻，但会被 Crew 绑定，并发批次之间不能共享；共享的是其中的 LLM 客户端
+        llm_obj = _get_llm(provider_name, llm_str, temperature, *self._credentials(provider_name))
         
         return Agent(
             role=role,
@@ -157,6 +164,7 @@ class CrewManager:
             goal="基于用户 prompt 和关键词，从候选文献信息中筛选最相关的文献，并提供结构化结论",
             backstory="你擅长理解科研需求，并准确判断文献是否匹配研究主题。",
             model_override=filter_model,
+            provider_name=resolve_provider(ai_config),
         )
         
         # Build document context string
@@ -228,6 +236,7 @@ class CrewManager:
             goal="基于用户需求仔细阅读文献完整信息，评估其与研究主题的相关性",
             backstory="你是经验丰富的文献筛选专家，擅长理解科研需求并准确判断文献价值。你会仔细阅读文献的完整摘要和详细信息。",
             model_override=filter_model,
+            provider_name=resolve_provider(ai_config),
         )
         
         # Build full document context with complete information
@@ -312,134 +321,27 @@ class CrewManager:
 
     def build_coarse_filtering_crew(self, context: Dict[str, Any], documents: List[Dict[str, Any]]) -> Crew:
         """Build crew for coarse filtering - quick screening based on titles."""
-        settings = get_settings()
-        
-        ai_config = context.get("ai_config") or {}
-        filter_model = ai_config.get("model") if ai_config.get("model") else settings.ai.filter_model
-        
-        analyst = self._build_agent(
-            name="coarse-filter-analyst",
-            role="文献快速筛选专家",
-            goal="根据标题和简短摘要快速判断文献是否可能与研究主题相关",
-            backstory="你擅长快速浏览大量文献，根据标题和关键信息快速判断文献是否值得深入阅读。对于不确定的文献，倾向于保留。",
-            model_override=filter_model,
-        )
-        
-        # Build compact document list (titles + short abstract)
-        docs_text = "\n".join([
-            f"[{i+1}] ID: {doc.get('external_id', '')}\n标题: {doc.get('title', '无标题')}\n摘要: {doc.get('abstract', '')[:150]}..."
-            for i, doc in enumerate(documents)
-        ])
-        
-        prompt = context.get("prompt", "")
-        keywords = ", ".join(context.get("keywords", []))
-        
-        filter_task = Task(
-            description=f"""
-任务：快速筛选以下候选文献，排除明显不相关的文献。
-
-研究主题: {prompt}
-关键词: {keywords}
-
-候选文献（共{len(documents)}篇）:
-{docs_text}
-
-**筛选标准：**
-1. 标题是否与研究主题有明显关联
-2. 摘要中是否包含相关的关键词或概念
-3. **宁可误保留，不要误排除** - 对于不确定的文献，设置 is_selected=true
-
-**评分标准（粗筛）：**
-- 0.6-1.0: 可能相关，保留
-- 0.3-0.6: 不确定，保留
-- 0.0-0.3: 明显不相关，排除
-
-**输出要求：**
-- 返回一个 JSON 数组
-- 每篇文献都需要给出结果
-- 粗筛阶段不需要 summary 和 highlights，可以为空
-""",
-            expected_output="""[
-  {"external_id": "id1", "is_selected": true, "score": 0.7, "summary": "", "highlights": []},
-  {"external_id": "id2", "is_selected": false, "score": 0.2, "summary": "", "highlights": []},
-  ...
-]""",
-            agent=analyst,
-        )
-        
-        crew = Crew(
-            agents=[analyst],
-            tasks=[filter_task],
-            process=Process.sequential,
-            verbose=True,
-        )
-        return crew
+        return self._build_filter_crew(context, coarse_filter_prompt(context, documents))
 
     def build_fine_filtering_crew(self, context: Dict[str, Any], documents: List[Dict[str, Any]]) -> Crew:
         """Build crew for fine filtering - detailed evaluation of multiple documents."""
-        settings = get_settings()
-        
+        return self._build_filter_crew(context, fine_filter_prompt(context, documents))
+
+    def _build_filter_crew(self, context: Dict[str, Any], prompt: FilterPrompt) -> Crew:
         ai_config = context.get("ai_config") or {}
-        filter_model = ai_config.get("model") if ai_config.get("model") else settings.ai.filter_model
-        
         analyst = self._build_agent(
-            name="fine-filter-analyst",
-            role="文献精细评估专家",
-            goal="仔细阅读文献的完整摘要，精确评估其与研究主题的相关性",
-            backstory="你是经验丰富的科研人员，擅长深入分析文献内容，准确判断其学术价值和与研究主题的相关程度。",
-            model_override=filter_model,
+            name=prompt.name,
+            role=prompt.role,
+            goal=prompt.goal,
+            backstory=prompt.backstory,
+            model_override=prompt.model,
+            temperature=resolve_temperature(ai_config),
+            provider_name=resolve_provider(ai_config),
         )
         
-        # Build detailed document context
-        docs_text = "\n\n---\n\n".join([
-            f"【文献 {i+1}】\n"
-            f"ID: {doc.get('external_id', '')}\n"
-            f"标题: {doc.get('title', '无标题')}\n"
-            f"作者: {', '.join(doc.get('authors', [])[:5]) if doc.get('authors') else '未知'}\n"
-            f"关键词: {', '.join(doc.get('keywords', [])) if doc.get('keywords') else '无'}\n"
-            f"完整摘要:\n{doc.get('abstract', '无摘要')}"
-            for i, doc in enumerate(documents)
-        ])
-        
-        prompt = context.get("prompt", "")
-        keywords = ", ".join(context.get("keywords", []))
-        
-        # 获取自定义筛选提示词
-        filter_config = context.get("filter_config") or {}
-        custom_filter_prompt = ""
-        if isinstance(filter_config, dict):
-            prompt_value = filter_config.get("filter_prompt")
-            if prompt_value:
-                custom_filter_prompt = str(prompt_value).strip()
-        
-        evaluation_guide = custom_filter_prompt if custom_filter_prompt else DEFAULT_FILTER_PROMPT
-        
         filter_task = Task(
-            description=f"""
-任务：精细评估以下{len(documents)}篇文献与研究主题的相关性。
-
-研究主题: {prompt}
-关键词: {keywords}
-
-{docs_text}
-
-{evaluation_guide}
-
-**输出要求：**
-- 返回一个 JSON 数组，包含所有 {len(documents)} 篇文献的评估结果
-- 每篇文献都需要提供 summary（中文总结）和 highlights（中文亮点）
-- 仔细阅读每篇文献的完整摘要后再做判断
-""",
-            expected_output="""[
-  {
-    "external_id": "id1",
-    "is_selected": true,
-    "score": 0.85,
-    "summary": "（中文）该文献的核心内容和选择理由",
-    "highlights": ["亮点1", "亮点2", "亮点3"]
-  },
-  ...
-]""",
+            description=prompt.description,
+            expected_output=prompt.expected_output,
             agent=analyst,
         )
         
@@ -465,6 +367,7 @@ class CrewManager:
             goal="针对选定文献生成整合总结，并分析研究趋势和关键发现",
             backstory="你是经验丰富的科研趋势分析专家，擅长从大量文献中提炼核心观点，识别研究趋势，并为科研人员提供前瞻性洞察。",
             model_override=summary_model,
+            provider_name=resolve_provider(ai_config),
         )
         
         # Build document summary context (top 15 by score)
@@ -548,3 +451,9 @@ Top 相关文献（按评分排序）:
             verbose=True,
         )
         return crew
+
+
+@lru_cache
+def get_crew_manager() -> CrewManager:
+    """Application-wide crew manager sharing LLM clients across runs."""
+    return CrewManager()
@@ -0,0 +1,115 @@
+"""Filtering engine that calls providers directly in JSON mode, without CrewAI."""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+from typing import Any, Dict, List
+
+import httpx
+from loguru import logger
+
+from app.services.ai.batch_executor import resolve_provider, resolve_temperature
+from app.services.ai.filter_prompts import FilterPrompt, coarse_filter_prompt, fine_filter_prompt
+from app.services.ai.provider_registry import ProviderClient, ProviderRegistry
+from app.utils.run_stats import FILTERING, record_stat
+
+ENGINE_CREWAI = "crewai"
+ENGINE_DIRECT = "direct"
+
+
+@dataclasses.dataclass
+class DirectResult:
+    output: str
+    usage: Dict[str, Any]
+
+
+class DirectFilterCall:
+    """One pending completion, shaped like a crew so the filter loop can kick it off."""
+
+    def __init__(self, engine: "DirectFilteringEngine", context: Dict[str, Any], prompt: FilterPrompt) -> None:
+        self._engine = engine
+        self._context = context
+        self._prompt = prompt
+
+    async def kickoff_async(self) -> DirectResult:
+        return await self._engine.complete(self._context, self._prompt)
+
+
+class DirectFilteringEngine:
+    """
+    Drop-in replacement for the ``CrewManager`` filter builders.
+
+    Each batch is a single chat completion with ``response_format`` JSON,
+    built from the same prompts as the CrewAI path. JSON mode only allows
+    an object, so the model wraps its array in ``{"results": [...]}`` and
+    the wrapper is removed before parsing.
+    """
+
+    def __init__(self, provider_registry: ProviderRegistry | None = None) -> None:
+        self._registry = provider_registry or ProviderRegistry()
+
+    def build_coarse_filtering_crew(self, context: Dict[str, Any], documents: List[Dict[str, Any]]) -> DirectFilterCall:
+        return DirectFilterCall(self, context, coarse_filter_prompt(context, documents))
+
+    def build_fine_filtering_crew(self, context: Dict[str, Any], documents: List[Dict[str, Any]]) -> DirectFilterCall:
+        return DirectFilterCall(self, context, fine_filter_prompt(context, documents))
+
+    async def complete(self, context: Dict[str, Any], prompt: FilterPrompt) -> DirectResult:
+        ai_config = context.get("ai_config") or {}
+        client = self._client(ai_config)
+        payload: Dict[str, Any] = {
+            "model": prompt.model or client.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": (
+                        f"你是{prompt.role}。{prompt.goal}。{prompt.backstory}\n"
+                        '只输出一个 JSON 对象，格式为 {"results": [...]}，results 数组即下文要求的输出。'
+                    ),
+                },
+                {"role": "user", "content": f"{prompt.description}\n期望输出（放入 results 字段）：\n{prompt.expected_output}"},
+            ],
+            "response_format": {"type": "json_object"},
+            "temperature": resolve_temperature(ai_config),
+        }
+        if ai_config.get("max_tokens"):
+            payload["max_tokens"] = int(ai_config["max_tokens"])
+
+        try:
+            response = await client.request(payload)
+        except httpx.HTTPStatusError as exc:
+            # 部分兼容接口不支持 JSON 模式，去掉后重试一次
+            if exc.response.status_code != 400:
+                raise
+            logger.warning("Provider {} rejected response_format, retrying without JSON mode", client.name)
+            payload.pop("response_format")
+            response = await client.request(payload)
+
+        usage = response.get("usage") or {}
+        source = context.get("source")
+        for key in ("prompt_tokens", "completion_tokens"):
+            if usage.get(key):
+                record_stat(FILTERING, source, key, usage[key])
+        content = response.get("choices", [{}])[0].get("message", {}).get("content") or ""
+        return DirectResult(output=_unwrap_results(content), usage=usage)
+
+    def _client(self, ai_config: Dict[str, Any]) -> ProviderClient:
+        client = self._registry.get(resolve_provider(ai_config))
+        overrides = {key: ai_config[key] for key in ("api_key", "base_url") if ai_config.get(key)}
+        return dataclasses.replace(client, **overrides) if overrides else client
+
+
+def _unwrap_results(content: str) -> str:
+    """Turn ``{"results": [...]}`` back into the bare array the batch parser expects."""
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        return content
+    if isinstance(data, dict):
+        if isinstance(data.get("results"), list):
+            return json.dumps(data["results"], ensure_ascii=False)
+        arrays = [value for value in data.values() if isinstance(value, list)]
+        if len(arrays) == 1:
+            return json.dumps(arrays[0], ensure_ascii=False)
+    return content
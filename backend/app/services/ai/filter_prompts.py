@@ -0,0 +1,174 @@
+"""Prompt text of the coarse and fine filtering stages, shared by all engines."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.config import get_settings
+from app.services.ai.prompt_compaction import document_alias, model_budget, truncate_to_tokens
+
+_SETTINGS = get_settings()
+_STATIC_PROMPTS = _SETTINGS.static.prompts if _SETTINGS.static else {}
+
+_FALLBACK_FILTER_PROMPT = """请仔细阅读文献的完整信息，特别是摘要部分，然后评估：
+
+1. **相关性判断** (is_selected):
+    - 文献内容是否与研究主题直接相关？
+    - 是否包含所需的关键信息或方法？
+    - 返回 true（相关）或 false（不相关）
+
+2. **相关性评分** (score):
+    - 给出 0-1 之间的相关性评分
+    - 0.8-1.0: 高度相关，核心文献
+    - 0.6-0.8: 中度相关，参考价值
+    - 0.4-0.6: 低度相关，边缘相关
+    - 0.0-0.4: 基本不相关
+
+3. **文献总结** (summary):
+    - 用1-2句话总结文献的核心内容
+    - 说明为什么选择或不选择这篇文献
+
+4. **关键亮点** (highlights):
+    - 列出2-4个关键发现或创新点
+    - 与研究主题最相关的部分"""
+
+DEFAULT_FILTER_PROMPT = _STATIC_PROMPTS.get("filter_default", _FALLBACK_FILTER_PROMPT)
+
+
+@dataclass(frozen=True)
+class FilterPrompt:
+    """Agent persona plus task text of one filtering batch."""
+
+    name: str
+    role: str
+    goal: str
+    backstory: str
+    description: str
+    expected_output: str
+    model: Optional[str]
+
+
+def filter_model(context: Dict[str, Any]) -> Optional[str]:
+    """任务级别的模型优先，其次是全局筛选模型"""
+    ai_config = context.get("ai_config") or {}
+    return ai_config.get("model") if ai_config.get("model") else get_settings().ai.filter_model
+
+
+COARSE_DOCUMENT_SEPARATOR = "\n"
+FINE_DOCUMENT_SEPARATOR = "\n\n---\n\n"
+
+
+# 文献在提示词中以批内编号代替 external_id，模型按编号作答，解析时再映射回原文献
+def coarse_document_text(i: int, doc: Dict[str, Any], abstract_tokens: int) -> str:
+    return f"[{document_alias(i)}] 标题: {doc.get('title', '无标题')}\n摘要: {truncate_to_tokens(doc.get('abstract') or '', abstract_tokens)}"
+
+
+def fine_document_text(i: int, doc: Dict[str, Any], abstract_tokens: int) -> str:
+    return (
+        f"【文献 {document_alias(i)}】\n"
+        f"标题: {doc.get('title', '无标题')}\n"
+        f"作者: {', '.join(doc.get('authors', [])[:5]) if doc.get('authors') else '未知'}\n"
+        f"关键词: {', '.join(doc.get('keywords', [])) if doc.get('keywords') else '无'}\n"
+        f"摘要:\n{truncate_to_tokens(doc.get('abstract') or '', abstract_tokens) or '无摘要'}"
+    )
+
+
+def coarse_filter_prompt(context: Dict[str, Any], documents: List[Dict[str, Any]]) -> FilterPrompt:
+    """Coarse filtering - quick screening based on titles."""
+    # Build compact document list (titles + short abstract)
+    abstract_tokens = model_budget(filter_model(context)).coarse_abstract_tokens
+    docs_text = COARSE_DOCUMENT_SEPARATOR.join([coarse_document_text(i, doc, abstract_tokens) for i, doc in enumerate(documents)])
+
+    prompt = context.get("prompt", "")
+    keywords = ", ".join(context.get("keywords", []))
+
+    return FilterPrompt(
+        name="coarse-filter-analyst",
+        role="文献快速筛选专家",
+        goal="根据标题和简短摘要快速判断文献是否可能与研究主题相关",
+        backstory="你擅长快速浏览大量文献，根据标题和关键信息快速判断文献是否值得深入阅读。对于不确定的文献，倾向于保留。",
+        description=f"""
+任务：快速筛选以下候选文献，排除明显不相关的文献。
+
+研究主题: {prompt}
+关键词: {keywords}
+
+候选文献（共{len(documents)}篇）:
+{docs_text}
+
+**筛选标准：**
+1. 标题是否与研究主题有明显关联
+2. 摘要中是否包含相关的关键词或概念
+3. **宁可误保留，不要误排除** - 对于不确定的文献，设置 is_selected=true
+
+**评分标准（粗筛）：**
+- 0.6-1.0: 可能相关，保留
+- 0.3-0.6: 不确定，保留
+- 0.0-0.3: 明显不相关，排除
+
+**输出要求：**
+- 返回一个 JSON 数组
+- 每篇文献都需要给出结果，id 为文献前方括号中的编号
+- 粗筛阶段只需返回 id、is_selected 和 score
+""",
+        expected_output="""[
+  {"id": 1, "is_selected": true, "score": 0.7},
+  {"id": 2, "is_selected": false, "score": 0.2},
+  ...
+]""",
+        model=filter_model(context),
+    )
+
+
+def fine_filter_prompt(context: Dict[str, Any], documents: List[Dict[str, Any]]) -> FilterPrompt:
+    """Fine filtering - detailed evaluation of multiple documents."""
+    # Build detailed document context
+    abstract_tokens = model_budget(filter_model(context)).fine_abstract_tokens
+    docs_text = FINE_DOCUMENT_SEPARATOR.join([fine_document_text(i, doc, abstract_tokens) for i, doc in enumerate(documents)])
+
+    prompt = context.get("prompt", "")
+    keywords = ", ".join(context.get("keywords", []))
+
+    # 获取自定义筛选提示词
+    filter_config = context.get("filter_config") or {}
+    custom_filter_prompt = ""
+    if isinstance(filter_config, dict):
+        prompt_value = filter_config.get("filter_prompt")
+        if prompt_value:
+            custom_filter_prompt = str(prompt_value).strip()
+
+    evaluation_guide = custom_filter_prompt if custom_filter_prompt else DEFAULT_FILTER_PROMPT
+
+    return FilterPrompt(
+        name="fine-filter-analyst",
+        role="文献精细评估专家",
+        goal="仔细阅读文献的完整摘要，精确评估其与研究主题的相关性",
+        backstory="你是经验丰富的科研人员，擅长深入分析文献内容，准确判断其学术价值和与研究主题的相关程度。",
+        description=f"""
+任务：精细评估以下{len(documents)}篇文献与研究主题的相关性。
+
+研究主题: {prompt}
+关键词: {keywords}
+
+{docs_text}
+
+{evaluation_guide}
+
+**输出要求：**
+- 返回一个 JSON 数组，包含所有 {len(documents)} 篇文献的评估结果，id 为【文献 N】中的编号 N
+- 每篇文献都需要提供 summary（中文总结）和 highlights（中文亮点）
+- 仔细阅读每篇文献的完整摘要后再做判断
+""",
+        expected_output="""[
+  {
+    "id": 1,
+    "is_selected": true,
+    "score": 0.85,
+    "summary": "（中文）该文献的核心内容和选择理由",
+    "highlights": ["亮点1", "亮点2", "亮点3"]
+  },
+  ...
+]""",
+        model=filter_model(context),
+    )
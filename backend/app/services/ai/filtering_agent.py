@@ -4,29 +4,59 @@ from __future__ import annotations
 
 import asyncio
 import json
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 from loguru import logger
 
 from app.config import get_settings
-from app.services.ai.crew_manager import CrewManager
+from app.services.ai.batch_executor import ProviderSlots, get_provider_slots, resolve_provider
+from app.services.ai.crew_manager import CrewManager, get_crew_manager
+from app.services.ai.direct_engine import ENGINE_DIRECT, DirectFilteringEngine
+from app.services.ai.lexical_ranker import COARSE_STRATEGY_BM25, BM25Ranker
+from app.services.ai.prompt_compaction import resolve_alias
+from app.services.ai.relevance_model import (
+    PRESCREEN_ACCEPT,
+    PRESCREEN_REJECT,
+    RelevanceModelStore,
+    get_relevance_store,
+    split_by_confidence,
+)
+from app.services.ai.token_budget import BatchPacker, TokenBatch
+from app.services.ai.verdict_cache import VerdictCache, get_verdict_cache, verdict_scope
+from app.utils.run_stats import FILTERING, append_stat, record_stat
 
 _SETTINGS = get_settings()
 _FILTER_DEFAULTS = (_SETTINGS.static.filter_defaults if _SETTINGS.static else {})
 DEFAULT_MIN_SCORE = float(_FILTER_DEFAULTS.get("min_relevance_score", 0.4))
 DEFAULT_MAX_DOCS_PER_SOURCE = int(_FILTER_DEFAULTS.get("max_documents_per_source", 50))
 
-# 批量筛选配置
-COARSE_BATCH_SIZE = 30  # 粗筛每批处理的文献数
-FINE_BATCH_SIZE = 8     # 精筛每批处理的文献数
+
+def coarse_min_score(filter_config: Dict[str, Any]) -> float:
+    """粗筛使用比精筛更低的阈值，宁可误保留"""
+    min_score = float(filter_config.get("min_relevance_score", DEFAULT_MIN_SCORE))
+    return max(0.2, min_score - 0.2)
 
 
 class FilteringAgentService:
     """Run crew to filter documents with two-stage filtering: coarse + fine."""
 
-    def __init__(self, crew_manager: CrewManager | None = None, max_retries: int = 3) -> None:
-        self._crew_manager = crew_manager or CrewManager()
+    def __init__(
+        self,
+        crew_manager: CrewManager | None = None,
+        max_retries: int = 3,
+        verdict_cache: VerdictCache | None = None,
+        direct_engine: DirectFilteringEngine | None = None,
+        lexical_ranker: BM25Ranker | None = None,
+        relevance_store: RelevanceModelStore | None = None,
+    ) -> None:
+        self._crew_manager = crew_manager or get_crew_manager()
+        self._direct_engine = direct_engine or DirectFilteringEngine()
         self._max_retries = max_retries
+        # 缓存由调用方显式传入，None 表示不使用缓存
+        self._verdict_cache = verdict_cache
+        self._lexical_ranker = lexical_ranker or BM25Ranker()
+        self._relevance_store = relevance_store or get_relevance_store()
 
     async def filter_documents(
         self,
@@ -50,27 +80,31 @@ class FilteringAgentService:
         max_docs = int(filter_config.get("max_documents_per_source", DEFAULT_MAX_DOCS_PER_SOURCE))
         documents_to_filter = documents[:max_docs] if len(documents) > max_docs else documents
         
+        if filter_config.get("relevance_prescreen"):
+            prescreened = await self._prescreen(task_context, documents_to_filter, filter_config)
+            if prescreened is not None:
+                return prescreened
+
         logger.info(f"Starting two-stage filtering for {len(documents_to_filter)} documents (task: {task_context.get('task_name', 'unknown')})")
         
-        # 第一阶段：粗筛 - 基于标题快速筛选，批量处理
-        coarse_results = await self._coarse_filter(task_context, documents_to_filter, filter_config)
+        # 粗筛与精筛流水线执行：粗筛批次一完成，通过的文献即凑批进入精筛
+        coarse_results, passed_count, fine_results = await self._pipelined_filter(
+            task_context, documents_to_filter, filter_config
+        )
         
-        # 获取粗筛通过的文档
-        passed_doc_ids = {r["external_id"] for r in coarse_results if r.get("is_selected", False)}
-        passed_docs = [d for d in documents_to_filter if d.get("external_id") in passed_doc_ids]
+        logger.info(f"Coarse filtering: {passed_count}/{len(documents_to_filter)} documents passed")
+        record_stat(FILTERING, task_context.get("source"), "coarse_passed", passed_count)
         
-        logger.info(f"Coarse filtering: {len(passed_docs)}/{len(documents_to_filter)} documents passed")
-        
-        if not passed_docs:
+        if not passed_count:
             logger.warning("No documents passed coarse filtering")
             return coarse_results
         
-        # 第二阶段：精筛 - 详细评估，批量处理
-        fine_results = await self._fine_filter(task_context, passed_docs, filter_config)
-        
         # 合并结果：粗筛未通过的 + 精筛结果
         final_results = []
         fine_result_map = {r["external_id"]: r for r in fine_results}
+        coarse_result_map: Dict[str, Dict[str, Any]] = {}
+        for r in coarse_results:
+            coarse_result_map.setdefault(r["external_id"], r)
         
         for doc in documents_to_filter:
             doc_id = doc.get("external_id")
@@ -78,7 +112,7 @@ class FilteringAgentService:
                 final_results.append(fine_result_map[doc_id])
             else:
                 # 粗筛未通过的文档
-                coarse_result = next((r for r in coarse_results if r["external_id"] == doc_id), None)
+                coarse_result = coarse_result_map.get(doc_id)
                 if coarse_result:
                     final_results.append(coarse_result)
                 else:
@@ -89,6 +123,187 @@ class FilteringAgentService:
         
         return final_results
 
+    async def _prescreen(
+        self,
+        task_context: Dict[str, Any],
+        documents: List[Dict[str, Any]],
+        filter_config: Dict[str, Any],
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Let the task's relevance model decide the confident documents.
+
+        Documents the model accepts or rejects with confidence skip the LLM
+        entirely; the uncertain band goes straight to the fine stage. Returns
+        None while the task has no model trained on enough history, so the
+        regular two-stage filter runs instead.
+        """
+        task_id = task_context.get("task_id")
+        model = await self._relevance_store.load(task_id) if task_id is not None else None
+        config = self._relevance_store.config
+        if model is None or not model.ready(config):
+            logger.info(f"Relevance prescreen: no trained model for task {task_id} yet, using two-stage filtering")
+            return None
+
+        probabilities = model.predict(documents)
+        accept, reject, uncertain = split_by_confidence(probabilities, config)
+        decided: Dict[str, Dict[str, Any]] = {}
+        for positions, decision in ((accept, PRESCREEN_ACCEPT), (reject, PRESCREEN_REJECT)):
+            for position in positions:
+                doc = documents[position]
+                decided[doc.get("external_id")] = self._prescreen_result(doc, float(probabilities[position]), decision)
+
+        uncertain_docs = [documents[position] for position in uncertain]
+        logger.info(
+            f"Relevance prescreen: {len(accept)} accepted, {len(reject)} rejected, "
+            f"{len(uncertain_docs)}/{len(documents)} uncertain sent to fine filtering"
+        )
+        fine_cached = await self._cached_verdicts("fine", task_context, filter_config, uncertain_docs)
+        misses = [d for d in uncertain_docs if d.get("external_id") not in fine_cached]
+        fine_results = list(fine_cached.values())
+        if misses:
+            fine_results.extend(await self._fine_filter(task_context, misses, filter_config))
+        fine_map = {r["external_id"]: r for r in fine_results}
+
+        source = task_context.get("source")
+        record_stat(FILTERING, source, "prescreen_accepted", len(accept))
+        record_stat(FILTERING, source, "prescreen_rejected", len(reject))
+        record_stat(FILTERING, source, "prescreen_uncertain", len(uncertain_docs))
+        record_stat(FILTERING, source, "llm_calls_saved", self._llm_calls_saved(task_context, filter_config, documents, [documents[p] for p in accept]))
+        return [
+            fine_map.get(doc.get("external_id")) or decided.get(doc.get("external_id")) or self._create_single_fallback_result(doc)
+            for doc in documents
+        ]
+
+    @staticmethod
+    def _prescreen_result(doc: Dict[str, Any], probability: float, decision: str) -> Dict[str, Any]:
+        selected = decision == PRESCREEN_ACCEPT
+        return {
+            "external_id": doc.get("external_id", ""),
+            "is_selected": selected,
+            "score": round(probability, 4),
+            # 未经模型精筛，选中的文献用摘要开头代替总结
+            "summary": (doc.get("abstract", "")[:200] if doc.get("abstract") else "无摘要") if selected else "",
+            "highlights": [],
+            "prescreen": decision,
+        }
+
+    @staticmethod
+    def _llm_calls_saved(
+        task_context: Dict[str, Any],
+        filter_config: Dict[str, Any],
+        documents: List[Dict[str, Any]],
+        accepted: List[Dict[str, Any]],
+    ) -> int:
+        """
+        Calls the two-stage filter would have made that the prescreen avoided.
+
+        Every coarse batch is skipped, as are the fine batches of accepted
+        documents. Rejected documents that the coarse stage would have let
+        through are not counted, so this is a lower bound.
+        """
+        coarse = 0 if filter_config.get("coarse_strategy") == COARSE_STRATEGY_BM25 else len(BatchPacker("coarse", task_context).pack(documents))
+        return coarse + len(BatchPacker("fine", task_context).pack(accepted))
+
+    async def _pipelined_filter(
+        self,
+        task_context: Dict[str, Any],
+        documents: List[Dict[str, Any]],
+        filter_config: Dict[str, Any],
+    ) -> Tuple[List[Dict[str, Any]], int, List[Dict[str, Any]]]:
+        """
+        Stream coarse survivors into fine batches without a stage barrier.
+
+        Coarse batches are packed up front to the model's token budget; fine
+        batches are cut from the stream of survivors as soon as they fill
+        the fine budget, and the remainder is flushed once every coarse
+        batch is done. Cached verdicts are resolved before any batch is built, so
+        only cache misses reach the model. With ``coarse_strategy`` set to
+        ``bm25`` the coarse stage is ranked locally and only the fine stage
+        calls the model. Returns coarse results in document order, the
+        number of survivors and the fine results.
+        """
+        slots = get_provider_slots(resolve_provider(task_context.get("ai_config")))
+        # 已有精筛结论的文献直接采用，粗筛结论命中的只需再走精筛
+        fine_cached = await self._cached_verdicts("fine", task_context, filter_config, documents)
+        pending_docs = [d for d in documents if d.get("external_id") not in fine_cached]
+        if filter_config.get("coarse_strategy") == COARSE_STRATEGY_BM25:
+            # 词法排序以本次检索的全部文献为语料，IDF 更稳定；只取未命中精筛缓存的结论
+            ranked = self._lexical_ranker.rank(task_context, documents, coarse_min_score(filter_config))
+            pending_ids = {d.get("external_id") for d in pending_docs}
+            coarse_cached = {r["external_id"]: r for r in ranked if r["external_id"] in pending_ids}
+            record_stat(FILTERING, task_context.get("source"), "coarse_lexical_ranked", len(coarse_cached))
+        else:
+            coarse_cached = await self._cached_verdicts("coarse", task_context, filter_config, pending_docs)
+        coarse_misses = [d for d in pending_docs if d.get("external_id") not in coarse_cached]
+        coarse_batches = BatchPacker("coarse", task_context).pack(coarse_misses)
+        fine_packer = BatchPacker("fine", task_context)
+
+        async def run_coarse(index: int, batch: TokenBatch) -> Tuple[int, List[Dict[str, Any]]]:
+            results = await self._run_batch(
+                "coarse", task_context, batch, filter_config, index + 1, len(coarse_batches), slots
+            )
+            return index, results
+
+        coarse_by_batch: List[List[Dict[str, Any]]] = [[] for _ in coarse_batches]
+        fine_tasks: List[asyncio.Task] = []
+        passed_count = len(fine_cached)
+
+        def feed_fine(passed: List[Dict[str, Any]]) -> None:
+            for doc in passed:
+                for batch in fine_packer.add(doc):
+                    fine_tasks.append(asyncio.ensure_future(
+                        self._run_batch("fine", task_context, batch, filter_config, len(fine_tasks) + 1, None, slots)
+                    ))
+
+        cached_passed = [
+            d for d in pending_docs
+            if d.get("external_id") in coarse_cached and coarse_cached[d.get("external_id")].get("is_selected", False)
+        ]
+        passed_count += len(cached_passed)
+        coarse_tasks = [asyncio.ensure_future(run_coarse(i, batch)) for i, batch in enumerate(coarse_batches)]
+        try:
+            feed_fine(cached_passed)
+            for finished in asyncio.as_completed(coarse_tasks):
+                index, results = await finished
+                coarse_by_batch[index] = results
+                passed_ids = {r["external_id"] for r in results if r.get("is_selected", False)}
+                passed = [d for d in coarse_batches[index].documents if d.get("external_id") in passed_ids]
+                passed_count += len(passed)
+                feed_fine(passed)
+            last = fine_packer.flush()
+            if last is not None:
+                fine_tasks.append(asyncio.ensure_future(
+                    self._run_batch("fine", task_context, last, filter_config, len(fine_tasks) + 1, None, slots)
+                ))
+            fine_by_batch = await asyncio.gather(*fine_tasks)
+        finally:
+            # 外层被取消时不留下孤立的模型调用
+            for pending in (*coarse_tasks, *fine_tasks):
+                pending.cancel()
+
+        coarse_map: Dict[str, Dict[str, Any]] = dict(coarse_cached)
+        for results in coarse_by_batch:
+            for r in results:
+                coarse_map.setdefault(r["external_id"], r)
+        coarse_results = [coarse_map[d.get("external_id")] for d in pending_docs if d.get("external_id") in coarse_map]
+        fine_results = list(fine_cached.values()) + [r for results in fine_by_batch for r in results]
+        return coarse_results, passed_count, fine_results
+
+    async def _cached_verdicts(
+        self,
+        stage: str,
+        task_context: Dict[str, Any],
+        filter_config: Dict[str, Any],
+        documents: List[Dict[str, Any]],
+    ) -> Dict[str, Dict[str, Any]]:
+        if self._verdict_cache is None or not documents:
+            return {}
+        cached = await self._verdict_cache.lookup(verdict_scope(stage, task_context, filter_config), documents)
+        if cached:
+            logger.info(f"{stage.capitalize()} verdict cache: {len(cached)}/{len(documents)} documents reused")
+            record_stat(FILTERING, task_context.get("source"), f"{stage}_cache_hits", len(cached))
+        return cached
+
     async def _coarse_filter(
         self,
         task_context: Dict[str, Any],
@@ -96,53 +311,7 @@ class FilteringAgentService:
         filter_config: Dict[str, Any],
     ) -> List[Dict[str, Any]]:
         """第一阶段：粗筛 - 基于标题快速筛选大批量文献"""
-        all_results = []
-        
-        # 分批处理
-        for batch_start in range(0, len(documents), COARSE_BATCH_SIZE):
-            batch_docs = documents[batch_start:batch_start + COARSE_BATCH_SIZE]
-            batch_num = batch_start // COARSE_BATCH_SIZE + 1
-            total_batches = (len(documents) + COARSE_BATCH_SIZE - 1) // COARSE_BATCH_SIZE
-            
-            logger.info(f"Coarse filter batch {batch_num}/{total_batches}: {len(batch_docs)} documents")
-            
-            for attempt in range(self._max_retries):
-                try:
-                    crew = self._crew_manager.build_coarse_filtering_crew(task_context, batch_docs)
-                    
-                    if hasattr(crew, "kickoff_async"):
-                        result = await crew.kickoff_async()
-                    else:
-                        result = await asyncio.to_thread(crew.kickoff)
-                    
-                    raw_output = getattr(result, "output", None) or str(result)
-                    logger.debug(f"Coarse filter raw output: {raw_output[:500]}...")
-                    
-                    batch_results = self._parse_batch_results(raw_output, batch_docs, filter_config, is_coarse=True)
-                    
-                    if batch_results:
-                        all_results.extend(batch_results)
-                        logger.info(f"Coarse batch {batch_num}: {sum(1 for r in batch_results if r.get('is_selected'))} passed")
-                        break
-                    else:
-                        logger.warning(f"Coarse batch {batch_num} attempt {attempt + 1}: no valid results")
-                        
-                except Exception as e:
-                    logger.error(f"Coarse batch {batch_num} attempt {attempt + 1} error: {e}")
-                    if attempt < self._max_retries - 1:
-                        await asyncio.sleep(2 ** attempt)
-                    else:
-                        # 失败时默认通过粗筛
-                        for doc in batch_docs:
-                            all_results.append({
-                                "external_id": doc.get("external_id", ""),
-                                "is_selected": True,  # 粗筛失败时默认通过
-                                "score": 0.5,
-                                "summary": "",
-                                "highlights": [],
-                            })
-        
-        return all_results
+        return await self._run_batches("coarse", task_context, documents, filter_config)
 
     async def _fine_filter(
         self,
@@ -151,47 +320,96 @@ class FilteringAgentService:
         filter_config: Dict[str, Any],
     ) -> List[Dict[str, Any]]:
         """第二阶段：精筛 - 详细评估文献，批量处理"""
-        all_results = []
-        
-        # 分批处理
-        for batch_start in range(0, len(documents), FINE_BATCH_SIZE):
-            batch_docs = documents[batch_start:batch_start + FINE_BATCH_SIZE]
-            batch_num = batch_start // FINE_BATCH_SIZE + 1
-            total_batches = (len(documents) + FINE_BATCH_SIZE - 1) // FINE_BATCH_SIZE
-            
-            logger.info(f"Fine filter batch {batch_num}/{total_batches}: {len(batch_docs)} documents")
-            
-            for attempt in range(self._max_retries):
-                try:
-                    crew = self._crew_manager.build_fine_filtering_crew(task_context, batch_docs)
-                    
+        return await self._run_batches("fine", task_context, documents, filter_config)
+
+    async def _run_batches(
+        self,
+        stage: str,
+        task_context: Dict[str, Any],
+        documents: List[Dict[str, Any]],
+        filter_config: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        """并发执行各批次，并发数受提供商限额约束；结果按批次顺序拼接"""
+        batches = BatchPacker(stage, task_context).pack(documents)
+        slots = get_provider_slots(resolve_provider(task_context.get("ai_config")))
+        batch_results = await asyncio.gather(
+            *(
+                self._run_batch(stage, task_context, batch, filter_config, batch_num, len(batches), slots)
+                for batch_num, batch in enumerate(batches, start=1)
+            )
+        )
+        return [result for results in batch_results for result in results]
+
+    async def _run_batch(
+        self,
+        stage: str,
+        task_context: Dict[str, Any],
+        batch: TokenBatch,
+        filter_config: Dict[str, Any],
+        batch_num: int,
+        total_batches: Optional[int],
+        slots: ProviderSlots,
+    ) -> List[Dict[str, Any]]:
+        is_coarse = stage == "coarse"
+        label = "Coarse" if is_coarse else "Fine"
+        batch_docs = batch.documents
+        position = f"{batch_num}/{total_batches}" if total_batches else str(batch_num)
+        logger.info(f"{label} filter batch {position}: {len(batch_docs)} documents, ~{batch.tokens} tokens")
+        append_stat(FILTERING, task_context.get("source"), f"{stage}_batch_tokens", batch.tokens)
+
+        # ai_config.engine 为 direct 时直接以 JSON 模式调用提供商，否则走 CrewAI
+        engine = self._direct_engine if (task_context.get("ai_config") or {}).get("engine") == ENGINE_DIRECT else self._crew_manager
+        for attempt in range(self._max_retries):
+            try:
+                if is_coarse:
+                    crew = engine.build_coarse_filtering_crew(task_context, batch_docs)
+                else:
+                    crew = engine.build_fine_filtering_crew(task_context, batch_docs)
+
+                # 只在真正调用模型时占用并发名额，重试退避期间释放
+                record_stat(FILTERING, task_context.get("source"), f"{stage}_llm_calls")
+                async with slots.slot():
                     if hasattr(crew, "kickoff_async"):
                         result = await crew.kickoff_async()
                     else:
                         result = await asyncio.to_thread(crew.kickoff)
-                    
-                    raw_output = getattr(result, "output", None) or str(result)
-                    logger.debug(f"Fine filter raw output: {raw_output[:500]}...")
-                    
-                    batch_results = self._parse_batch_results(raw_output, batch_docs, filter_config, is_coarse=False)
-                    
-                    if batch_results:
-                        all_results.extend(batch_results)
-                        logger.info(f"Fine batch {batch_num}: {sum(1 for r in batch_results if r.get('is_selected'))} selected")
-                        break
-                    else:
-                        logger.warning(f"Fine batch {batch_num} attempt {attempt + 1}: no valid results")
-                        
-                except Exception as e:
-                    logger.error(f"Fine batch {batch_num} attempt {attempt + 1} error: {e}")
-                    if attempt < self._max_retries - 1:
-                        await asyncio.sleep(2 ** attempt)
-                    else:
-                        # 失败时使用fallback
-                        for doc in batch_docs:
-                            all_results.append(self._create_single_fallback_result(doc))
-        
-        return all_results
+
+                raw_output = getattr(result, "output", None) or str(result)
+                logger.debug(f"{label} filter raw output: {raw_output[:500]}...")
+
+                batch_results = self._parse_batch_results(raw_output, batch_docs, filter_config, is_coarse=is_coarse)
+
+                if batch_results:
+                    verdict = "passed" if is_coarse else "selected"
+                    logger.info(f"{label} batch {batch_num}: {sum(1 for r in batch_results if r.get('is_selected'))} {verdict}")
+                    # 只缓存模型真正给出的结论，失败回退结果不入缓存
+                    if self._verdict_cache is not None:
+                        await self._verdict_cache.store(verdict_scope(stage, task_context, filter_config), batch_docs, batch_results)
+                    return batch_results
+                logger.warning(f"{label} batch {batch_num} attempt {attempt + 1}: no valid results")
+
+            except Exception as e:
+                logger.error(f"{label} batch {batch_num} attempt {attempt + 1} error: {e}")
+                if attempt < self._max_retries - 1:
+                    await asyncio.sleep(2 ** attempt)
+                elif is_coarse:
+                    # 失败时默认通过粗筛
+                    return [
+                        {
+                            "external_id": doc.get("external_id", ""),
+                            "is_selected": True,  # 粗筛失败时默认通过
+                            "score": 0.5,
+                            "summary": "",
+                            "highlights": [],
+                            "fallback": True,
+                        }
+                        for doc in batch_docs
+                    ]
+                else:
+                    # 失败时使用fallback
+                    return [self._create_single_fallback_result(doc) for doc in batch_docs]
+
+        return []
 
     def _parse_batch_results(
         self,
@@ -232,21 +450,18 @@ class FilteringAgentService:
             logger.warning(f"Expected list, got {type(data)}")
             return []
         
-        min_score = float(filter_config.get("min_relevance_score", DEFAULT_MIN_SCORE))
-        # 粗筛使用更低的阈值
-        if is_coarse:
-            min_score = max(0.2, min_score - 0.2)
+        min_score = coarse_min_score(filter_config) if is_coarse else float(filter_config.get("min_relevance_score", DEFAULT_MIN_SCORE))
         
         normalized = []
-        doc_map = {doc.get("external_id"): doc for doc in original_docs}
-        
         for item in data:
             if not isinstance(item, dict):
                 continue
             
-            external_id = str(item.get("external_id", ""))
-            if not external_id or external_id not in doc_map:
+            # 提示词中以批内编号代替 external_id，这里映射回原文献
+            doc = resolve_alias(item, original_docs)
+            if doc is None:
                 continue
+            external_id = str(doc.get("external_id", ""))
             
             score = max(0.0, min(1.0, float(item.get("score", 0.5))))
             is_selected = bool(item.get("is_selected", True))
@@ -330,6 +545,7 @@ class FilteringAgentService:
             "score": 0.5,
             "summary": document.get("abstract", "")[:200] if document.get("abstract") else "无摘要",
             "highlights": [],
+            "fallback": True,
         }
     
     def _create_fallback_results(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -341,6 +557,13 @@ class FilteringAgentService:
                 "score": 0.5,
                 "summary": doc.get("abstract", "")[:200] if doc.get("abstract") else "无摘要",
                 "highlights": [],
+                "fallback": True,
             }
             for doc in documents
         ]
+
+
+@lru_cache
+def get_filtering_service() -> FilteringAgentService:
+    """Application-wide filtering service, reused by every task run."""
+    return FilteringAgentService(verdict_cache=get_verdict_cache())
@@ -0,0 +1,132 @@
+"""Local BM25 ranking used as a model-free coarse filtering strategy."""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from loguru import logger
+
+COARSE_STRATEGY_LLM = "llm"
+COARSE_STRATEGY_BM25 = "bm25"
+
+# 拉丁字母按词切分，中文按连续汉字切成二元组
+_TOKEN = re.compile(r"[a-z0-9]+|[\u4e00-\u9fff]+")
+_STOPWORDS = frozenset(
+    """a an and are as at be by for from has have in into is it its of on or that the this to via we with
+    our their these those which using based towards toward new paper study studies""".split()
+)
+KEYWORD_WEIGHT = 2.0  # 关键词比研究主题描述中的普通词更能说明相关性
+TITLE_WEIGHT = 2.0    # 标题中的词按出现两次计
+
+
+def tokenize(text: str) -> List[str]:
+    tokens: List[str] = []
+    for match in _TOKEN.findall((text or "").lower()):
+        if "\u4e00" <= match[0] <= "\u9fff":
+            tokens.extend(match[i:i + 2] for i in range(max(1, len(match) - 1)))
+        elif match not in _STOPWORDS and len(match) > 1:
+            # 简单去掉复数词尾，让 model/models 这类词能互相匹配
+            tokens.append(match[:-1] if len(match) > 3 and match.endswith("s") and not match.endswith("ss") else match)
+    return tokens
+
+
+def query_weights(prompt: str, keywords: List[str]) -> Dict[str, float]:
+    """Query terms of a task: prompt words plus up-weighted keyword words."""
+    weights: Dict[str, float] = {}
+    for token in tokenize(prompt):
+        weights[token] = max(weights.get(token, 0.0), 1.0)
+    for keyword in keywords:
+        for token in tokenize(keyword):
+            weights[token] = max(weights.get(token, 0.0), KEYWORD_WEIGHT)
+    return weights
+
+
+def _term_counts(documents: List[Dict[str, Any]], field: str, vocabulary: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """``documents x vocabulary`` counts of one field plus each document's token count."""
+    rows: List[int] = []
+    columns: List[int] = []
+    lengths = np.zeros(len(documents))
+    for row, doc in enumerate(documents):
+        tokens = tokenize(doc.get(field) or "")
+        lengths[row] = len(tokens)
+        for token in tokens:
+            column = vocabulary.get(token)
+            if column is not None:
+                rows.append(row)
+                columns.append(column)
+    counts = np.zeros((len(documents), len(vocabulary)))
+    np.add.at(counts, (np.asarray(rows, dtype=np.intp), np.asarray(columns, dtype=np.intp)), 1.0)
+    return counts, lengths
+
+
+class BM25Ranker:
+    """
+    Score title and abstract against the task prompt and keywords with BM25.
+
+    The documents being filtered form the corpus, so IDF reflects what is
+    common in this retrieval rather than in English at large. Only query
+    terms are counted, which keeps the term-frequency matrices at
+    ``documents x query terms``; scoring is one vectorized pass over them.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+
+    def scores(self, task_context: Dict[str, Any], documents: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Raw BM25 score per document, and whether a keyword term occurs in its title."""
+        weights = query_weights(task_context.get("prompt") or "", list(task_context.get("keywords") or []))
+        if not documents or not weights:
+            return np.zeros(len(documents)), np.zeros(len(documents), dtype=bool)
+        vocabulary = {term: column for column, term in enumerate(weights)}
+        query = np.fromiter(weights.values(), dtype=float, count=len(weights))
+        title_tf, title_lengths = _term_counts(documents, "title", vocabulary)
+        abstract_tf, abstract_lengths = _term_counts(documents, "abstract", vocabulary)
+
+        tf = TITLE_WEIGHT * title_tf + abstract_tf
+        lengths = TITLE_WEIGHT * title_lengths + abstract_lengths
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log1p((len(documents) - df + 0.5) / (df + 0.5))
+        norm = self.k1 * (1.0 - self.b + self.b * lengths / (lengths.mean() or 1.0))
+        saturated = tf * (self.k1 + 1.0) / (tf + norm[:, None])
+        title_keyword = (title_tf[:, query >= KEYWORD_WEIGHT] > 0).any(axis=1)
+        return saturated @ (idf * query), title_keyword
+
+    def rank(
+        self,
+        task_context: Dict[str, Any],
+        documents: List[Dict[str, Any]],
+        min_score: float,
+    ) -> List[Dict[str, Any]]:
+        """
+        Coarse verdicts in the same shape as the model's.
+
+        Raw scores are mapped to ``s / (s + m)`` with ``m`` the median score of
+        the documents that match at all, so a typical match lands at 0.5 and
+        only documents far weaker than that fall under the coarse threshold.
+        As the model is told to, it prefers keeping: a keyword in the title
+        keeps a document whatever its score. A batch without any lexical
+        overlap (e.g. Chinese prompt, English papers and no keywords) says
+        nothing about relevance, so every document is kept for the fine stage.
+        """
+        raw, title_keyword = self.scores(task_context, documents)
+        matched = raw[raw > 0.0]
+        if not len(matched):
+            logger.warning("BM25 coarse filter: no lexical overlap with the task, keeping all {} documents", len(documents))
+            scaled, selected = np.full(len(documents), 0.5), np.ones(len(documents), dtype=bool)
+        else:
+            scaled = raw / (raw + float(np.median(matched)))
+            selected = (scaled >= min_score) | title_keyword
+        return [
+            {
+                "external_id": doc.get("external_id", ""),
+                "is_selected": bool(keep),
+                "score": round(float(score), 4),
+                "summary": "",
+                "highlights": [],
+            }
+            for doc, score, keep in zip(documents, scaled, selected)
+        ]
+
@@ -0,0 +1,224 @@
+"""Declarative rule prefilter evaluated before any LLM filtering."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+# 规则按此顺序编译和统计
+RULES = (
+    "exclude_terms",
+    "include_terms",
+    "primary_category",
+    "categories",
+    "exclude_categories",
+    "authors",
+    "exclude_authors",
+    "published_after",
+    "published_before",
+)
+_FIELDS = ("title", "abstract")
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def _phrase_pattern(phrases: Iterable[str]) -> Optional[re.Pattern[str]]:
+    """One case-insensitive alternation; word boundaries only where the phrase ends in a word character."""
+    parts = []
+    for phrase in phrases:
+        escaped = re.escape(" ".join(phrase.split()))
+        start = r"\b" if re.match(r"\w", phrase, re.ASCII) else ""
+        end = r"\b" if re.search(r"\w$", phrase, re.ASCII) else ""
+        parts.append(f"{start}{escaped}{end}")
+    return re.compile("|".join(parts), re.IGNORECASE) if parts else None
+
+
+def _category_pattern(categories: Iterable[str]) -> Optional[re.Pattern[str]]:
+    """``cs.CL`` matches exactly, ``cs.*`` or ``cs`` match the whole archive."""
+    parts = []
+    for category in categories:
+        archive = category[:-2] if category.endswith(".*") else category
+        parts.append(re.escape(archive) + (r"(?:\..+)?" if "." not in archive else ""))
+    return re.compile(f"^(?:{'|'.join(parts)})$", re.IGNORECASE) if parts else None
+
+
+def _parse_bound(value: Any) -> Optional[datetime]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, date):
+        parsed = datetime(value.year, value.month, value.day)
+    else:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    # 统一为 naive UTC，带时区与不带时区的时间可以直接比较
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    try:
+        return _parse_bound(value)
+    except ValueError:
+        return None
+
+
+class _Columns:
+    """Column view of a document batch, built once and shared by every rule."""
+
+    def __init__(self, documents: List[Dict[str, Any]]) -> None:
+        extras = [doc.get("extra") or {} for doc in documents]
+        self.text = {
+            "title": [" ".join(str(doc.get("title") or "").split()) for doc in documents],
+            "abstract": [" ".join(str(doc.get("abstract") or "").split()) for doc in documents],
+        }
+        self.text["any"] = [f"{title}\n{abstract}" for title, abstract in zip(self.text["title"], self.text["abstract"])]
+        self.primary = [str(extra.get("primary_category") or "") for extra in extras]
+        self.categories = [[str(c) for c in (extra.get("categories") or [])] for extra in extras]
+        self.authors = [[str(a) for a in (doc.get("authors") or [])] for doc in documents]
+        self.published = [_timestamp(doc.get("published_at")) for doc in documents]
+
+
+@dataclass(frozen=True)
+class _Rule:
+    name: str
+    keep: Callable[[_Columns], List[bool]]
+
+
+class Prefilter:
+    """
+    Compiled ``filter_config.prefilter`` rules.
+
+    Term rules take phrases matched case-insensitively on whole words in
+    title and abstract; ``title:`` or ``abstract:`` restricts a phrase to
+    one field. Category rules read ``extra.primary_category`` and
+    ``extra.categories`` and accept ``cs.*`` wildcards. Author rules match
+    whole words inside author names. Documents lacking the metadata a rule
+    looks at (no categories, no authors, no date) pass that rule, so
+    non-arXiv sources are not dropped by arXiv-only rules.
+    """
+
+    def __init__(self, rules: List[_Rule]) -> None:
+        self.rules = rules
+
+    @classmethod
+    def compile(cls, spec: Optional[Dict[str, Any]]) -> Optional["Prefilter"]:
+        """Build the rules of ``spec``; None when it defines none."""
+        if not spec:
+            return None
+        unknown = set(spec) - set(RULES)
+        if unknown:
+            logger.warning("Ignoring unknown prefilter rules: {}", ", ".join(sorted(unknown)))
+        rules: List[_Rule] = []
+        for name in RULES:
+            rule = getattr(cls, f"_{name}")(spec.get(name))
+            if rule is not None:
+                rules.append(_Rule(name, rule))
+        return cls(rules) if rules else None
+
+    def apply(self, documents: List[Dict[str, Any]]) -> Tuple[List[bool], Dict[str, int], List[Optional[str]]]:
+        """
+        Evaluate every rule over the batch.
+
+        Returns the keep mask, the number of documents each rule rejects
+        (a document failing two rules counts for both) and, per document,
+        the first rule it failed.
+        """
+        columns = _Columns(documents)
+        first_failed: List[Optional[str]] = [None] * len(documents)
+        drops: Dict[str, int] = {}
+        for rule in self.rules:
+            passed = rule.keep(columns)
+            drops[rule.name] = passed.count(False)
+            first_failed = [failed or (None if ok else rule.name) for failed, ok in zip(first_failed, passed)]
+        return [failed is None for failed in first_failed], drops, first_failed
+
+    @staticmethod
+    def _term_masks(terms: List[str]) -> Optional[Callable[[_Columns], List[bool]]]:
+        """Mask of documents containing any of ``terms``."""
+        by_field: Dict[str, List[str]] = {}
+        for term in terms:
+            field, _, phrase = term.partition(":")
+            if phrase and field.strip().lower() in _FIELDS:
+                by_field.setdefault(field.strip().lower(), []).append(phrase.strip())
+            else:
+                by_field.setdefault("any", []).append(term)
+        patterns = {field: _phrase_pattern(phrases) for field, phrases in by_field.items()}
+        if not patterns:
+            return None
+
+        def found(columns: _Columns) -> List[bool]:
+            hits = [[pattern.search(text) is not None for text in columns.text[field]] for field, pattern in patterns.items()]
+            return [any(row) for row in zip(*hits)]
+
+        return found
+
+    @classmethod
+    def _include_terms(cls, value: Any) -> Optional[Callable[[_Columns], List[bool]]]:
+        return cls._term_masks(_as_list(value)) if _as_list(value) else None
+
+    @classmethod
+    def _exclude_terms(cls, value: Any) -> Optional[Callable[[_Columns], List[bool]]]:
+        found = cls._term_masks(_as_list(value)) if _as_list(value) else None
+        return (lambda columns: [not hit for hit in found(columns)]) if found else None
+
+    @staticmethod
+    def _primary_category(value: Any) -> Optional[Callable[[_Columns], List[bool]]]:
+        pattern = _category_pattern(_as_list(value))
+        if pattern is None:
+            return None
+        return lambda columns: [not primary or pattern.match(primary) is not None for primary in columns.primary]
+
+    @staticmethod
+    def _categories(value: Any) -> Optional[Callable[[_Columns], List[bool]]]:
+        pattern = _category_pattern(_as_list(value))
+        if pattern is None:
+            return None
+        return lambda columns: [not categories or any(pattern.match(c) for c in categories) for categories in columns.categories]
+
+    @staticmethod
+    def _exclude_categories(value: Any) -> Optional[Callable[[_Columns], List[bool]]]:
+        pattern = _category_pattern(_as_list(value))
+        if pattern is None:
+            return None
+        return lambda columns: [not any(pattern.match(c) for c in categories) for categories in columns.categories]
+
+    @staticmethod
+    def _authors(value: Any) -> Optional[Callable[[_Columns], List[bool]]]:
+        pattern = _phrase_pattern(_as_list(value))
+        if pattern is None:
+            return None
+        return lambda columns: [not authors or any(pattern.search(a) for a in authors) for authors in columns.authors]
+
+    @staticmethod
+    def _exclude_authors(value: Any) -> Optional[Callable[[_Columns], List[bool]]]:
+        pattern = _phrase_pattern(_as_list(value))
+        if pattern is None:
+            return None
+        return lambda columns: [not any(pattern.search(a) for a in authors) for authors in columns.authors]
+
+    @staticmethod
+    def _published_after(value: Any) -> Optional[Callable[[_Columns], List[bool]]]:
+        bound = _parse_bound(value)
+        if bound is None:
+            return None
+        # 缺少日期的文献放行
+        return lambda columns: [published is None or published >= bound for published in columns.published]
+
+    @staticmethod
+    def _published_before(value: Any) -> Optional[Callable[[_Columns], List[bool]]]:
+        bound = _parse_bound(value)
+        if bound is None:
+            return None
+        return lambda columns: [published is None or published < bound for published in columns.published]
@@ -0,0 +1,77 @@
+"""Compact rendering helpers for filter prompts: token estimates, abstract truncation and ID aliases."""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Any, Dict, List, Optional
+
+from app.config import BatchTokenBudget, get_settings
+
+# 中日韩字符约一个字一个 token，其余文本按约 4 个字符一个 token 估算
+_CJK = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]")
+_ALIAS = re.compile(r"\d+")
+ELLIPSIS = "…"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap tokenizer-free estimate, biased slightly high."""
+    if not text:
+        return 0
+    cjk = len(_CJK.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut ``text`` to about ``max_tokens`` estimated tokens.
+
+    The cut backs off to the last word boundary when one is close, and an
+    ellipsis marks that the text goes on.
+    """
+    text = " ".join((text or "").split())
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max(max_tokens - 1, 0)
+    spent = 0.0
+    end = 0
+    for end, char in enumerate(text):
+        spent += 1.0 if _CJK.match(char) else 0.25
+        if spent > budget:
+            break
+    cut = text[:end]
+    space = cut.rfind(" ")
+    if space > len(cut) * 0.8:
+        cut = cut[:space]
+    return cut.rstrip(" ,;:") + ELLIPSIS
+
+
+def model_budget(model: Optional[str]) -> BatchTokenBudget:
+    """Budget of ``model``, falling back to the global defaults."""
+    config = get_settings().ai.batch_budget
+    return config.models.get(model, config) if model else config
+
+
+def document_alias(position: int) -> int:
+    """Alias of the document at ``position`` in its batch, as shown to the model."""
+    return position + 1
+
+
+def resolve_alias(item: Dict[str, Any], documents: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Document a model answer refers to.
+
+    Answers name documents by their batch alias (``"id": 3``, tolerating
+    ``"3"`` or ``"[3]"``); a full ``external_id`` is still accepted so a
+    model that echoes it anyway is not penalised.
+    """
+    alias = item.get("id")
+    if isinstance(alias, float):
+        alias = int(alias)
+    match = _ALIAS.search(str(alias)) if alias is not None and not isinstance(alias, bool) else None
+    if match and 1 <= int(match.group()) <= len(documents):
+        return documents[int(match.group()) - 1]
+    external_id = str(item.get("external_id", ""))
+    if external_id:
+        return next((doc for doc in documents if doc.get("external_id") == external_id), None)
+    return None
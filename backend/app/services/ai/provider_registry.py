@@ -5,9 +5,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Callable, Dict
 
-import httpx
-
 from app.config import AIProviderConfig, get_settings
+from app.services.http_clients import http_pool
 
 
 @dataclass
@@ -27,10 +26,12 @@ class ProviderClient:
         # otherwise use /v1/chat/completions
         endpoint = "/chat/completions" if self.base_url and self.base_url.rstrip("/").endswith("/v1") else "/v1/chat/completions"
         
-        async with httpx.AsyncClient(base_url=self.base_url or "", timeout=60) as client:
-            response = await client.post(endpoint, json=payload, headers=headers)
-            response.raise_for_status()
-            return response.json()
+        url = f"{(self.base_url or '').rstrip('/')}{endpoint}"
+        
+        client = http_pool.httpx_client()
+        response = await client.post(url, json=payload, headers=headers, timeout=60)
+        response.raise_for_status()
+        return response.json()
 
 
 class ProviderRegistry:
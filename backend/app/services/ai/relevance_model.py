@@ -0,0 +1,225 @@
+"""Per-task relevance classifier learned from past filter verdicts."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import zlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.config import RelevanceModelSettings, get_settings
+from app.services.ai.lexical_ranker import tokenize
+
+PRESCREEN_ACCEPT = "accept"
+PRESCREEN_REJECT = "reject"
+
+
+def hashed_features(doc: Dict[str, Any], n_features: int) -> np.ndarray:
+    """Sorted, de-duplicated feature indices of title words, abstract words and abstract bigrams."""
+    title = tokenize(doc.get("title") or "")
+    abstract = tokenize(doc.get("abstract") or "")
+    names = [f"t:{token}" for token in title]
+    names.extend(f"a:{token}" for token in abstract)
+    names.extend(f"b:{first} {second}" for first, second in zip(abstract, abstract[1:]))
+    # crc32 在进程之间稳定，内置 hash 每次启动随机化，不能用于持久化的模型
+    return np.unique(np.fromiter((zlib.crc32(name.encode("utf-8")) % n_features for name in names), dtype=np.int64, count=len(names)))
+
+
+class _Design:
+    """Binary hashed features of a document set in CSR form, rows L2-normalized."""
+
+    def __init__(self, indices: np.ndarray, values: np.ndarray, indptr: np.ndarray) -> None:
+        self.indices = indices
+        self.values = values
+        self.indptr = indptr
+        self.count = len(indptr) - 1
+        self.rows = np.repeat(np.arange(self.count), np.diff(indptr))
+
+    @classmethod
+    def build(cls, documents: Sequence[Dict[str, Any]], n_features: int) -> "_Design":
+        per_doc = [hashed_features(doc, n_features) for doc in documents]
+        sizes = np.fromiter((len(indices) for indices in per_doc), dtype=np.int64, count=len(per_doc))
+        indices = np.concatenate(per_doc) if per_doc else np.zeros(0, dtype=np.int64)
+        values = np.repeat(1.0 / np.sqrt(np.maximum(sizes, 1)), sizes)
+        return cls(indices, values, np.concatenate(([0], np.cumsum(sizes))))
+
+    def select(self, members: np.ndarray) -> "_Design":
+        slices = [slice(self.indptr[m], self.indptr[m + 1]) for m in members]
+        sizes = np.fromiter((s.stop - s.start for s in slices), dtype=np.int64, count=len(slices))
+        return _Design(
+            np.concatenate([self.indices[s] for s in slices]),
+            np.concatenate([self.values[s] for s in slices]),
+            np.concatenate(([0], np.cumsum(sizes))),
+        )
+
+
+@dataclass
+class RelevanceModel:
+    """
+    Logistic regression over hashed title/abstract features.
+
+    Trained with AdaGrad, so a model can keep learning run after run from
+    only the new verdicts; the squared-gradient sums are part of the saved
+    state. Probabilities are not re-balanced for the usually small share of
+    selected documents, which keeps them usable as confidence thresholds.
+    """
+
+    n_features: int
+    weights: np.ndarray
+    bias: float = 0.0
+    grad_sq: np.ndarray = field(default=None)  # type: ignore[assignment]
+    bias_grad_sq: float = 0.0
+    examples: int = 0
+    positives: int = 0
+    runs: int = 0
+    zotero_ids: Set[int] = field(default_factory=set)
+
+    @classmethod
+    def empty(cls, n_features: int) -> "RelevanceModel":
+        return cls(n_features, np.zeros(n_features, dtype=np.float32), grad_sq=np.zeros(n_features, dtype=np.float32))
+
+    def predict(self, documents: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Probability of being selected, per document."""
+        if not documents:
+            return np.zeros(0)
+        return self._probabilities(_Design.build(documents, self.n_features))
+
+    def partial_fit(
+        self,
+        documents: Sequence[Dict[str, Any]],
+        labels: Sequence[bool],
+        sample_weights: Sequence[float],
+        config: RelevanceModelSettings,
+        epochs: int,
+    ) -> None:
+        if not documents:
+            return
+        design = _Design.build(documents, self.n_features)
+        targets = np.asarray(labels, dtype=float)
+        weights = np.asarray(sample_weights, dtype=float)
+        rng = np.random.default_rng(self.examples)
+        for _ in range(epochs):
+            order = rng.permutation(design.count)
+            for start in range(0, design.count, config.batch_size):
+                members = order[start:start + config.batch_size]
+                self._step(design.select(members), targets[members], weights[members], config)
+        self.examples += design.count
+        self.positives += int(targets.sum())
+
+    def ready(self, config: RelevanceModelSettings) -> bool:
+        return self.examples >= config.min_examples and self.positives >= config.min_positives
+
+    def _probabilities(self, design: _Design) -> np.ndarray:
+        logits = np.bincount(design.rows, weights=self.weights[design.indices] * design.values, minlength=design.count)
+        return 1.0 / (1.0 + np.exp(-np.clip(logits + self.bias, -30.0, 30.0)))
+
+    def _step(self, batch: _Design, targets: np.ndarray, weights: np.ndarray, config: RelevanceModelSettings) -> None:
+        errors = (self._probabilities(batch) - targets) * weights / max(weights.sum(), 1e-9)
+        touched, inverse = np.unique(batch.indices, return_inverse=True)
+        gradient = np.bincount(inverse, weights=errors[batch.rows] * batch.values, minlength=len(touched))
+        # L2 只作用于本批出现的特征（惰性正则），避免每步更新整个权重向量
+        gradient += config.l2 * self.weights[touched]
+        self.grad_sq[touched] += gradient ** 2
+        self.weights[touched] -= config.learning_rate * gradient / (np.sqrt(self.grad_sq[touched]) + 1e-8)
+        bias_gradient = float(errors.sum())
+        self.bias_grad_sq += bias_gradient ** 2
+        self.bias -= config.learning_rate * bias_gradient / (np.sqrt(self.bias_grad_sq) + 1e-8)
+
+
+def training_example(
+    doc: Dict[str, Any],
+    selected: bool,
+    score: Optional[float],
+    exported: bool = False,
+) -> Tuple[Dict[str, Any], bool, float]:
+    """
+    (document, label, weight) of one filter verdict.
+
+    Selected or exported to Zotero counts as relevant. Verdicts far from the
+    0.5 boundary weigh more, and a Zotero export is the strongest signal.
+    """
+    if exported:
+        return doc, True, 2.0
+    score = float(score if score is not None else 0.5)
+    return doc, bool(selected), 0.5 + abs(score - 0.5)
+
+
+class RelevanceModelStore:
+    """One ``.npz`` file per task under the configured directory."""
+
+    def __init__(self, config: RelevanceModelSettings) -> None:
+        self.config = config
+        self._root = Path(config.path)
+
+    async def load(self, task_id: int) -> Optional[RelevanceModel]:
+        return await asyncio.to_thread(self._load, task_id)
+
+    async def save(self, task_id: int, model: RelevanceModel) -> None:
+        await asyncio.to_thread(self._save, task_id, model)
+
+    def _path(self, task_id: int) -> Path:
+        return self._root / f"task_{task_id}.npz"
+
+    def _load(self, task_id: int) -> Optional[RelevanceModel]:
+        path = self._path(task_id)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta["n_features"] != self.config.n_features:
+                    logger.info("Relevance model of task {} uses another feature size, retraining", task_id)
+                    return None
+                return RelevanceModel(
+                    n_features=meta["n_features"],
+                    weights=data["weights"].copy(),
+                    bias=meta["bias"],
+                    grad_sq=data["grad_sq"].copy(),
+                    bias_grad_sq=meta["bias_grad_sq"],
+                    examples=meta["examples"],
+                    positives=meta["positives"],
+                    runs=meta["runs"],
+                    zotero_ids=set(meta["zotero_ids"]),
+                )
+        except Exception as exc:  # pragma: no cover - 文件损坏时重新训练
+            logger.warning("Failed to load relevance model of task {}: {}", task_id, exc)
+            return None
+
+    def _save(self, task_id: int, model: RelevanceModel) -> None:
+        self._root.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "n_features": model.n_features,
+            "bias": model.bias,
+            "bias_grad_sq": model.bias_grad_sq,
+            "examples": model.examples,
+            "positives": model.positives,
+            "runs": model.runs,
+            "zotero_ids": sorted(model.zotero_ids),
+        }
+        path = self._path(task_id)
+        partial = path.with_suffix(".tmp.npz")
+        np.savez(partial, weights=model.weights, grad_sq=model.grad_sq, meta=np.array(json.dumps(meta)))
+        os.replace(partial, path)
+
+
+@lru_cache
+def get_relevance_store() -> RelevanceModelStore:
+    return RelevanceModelStore(get_settings().ai.relevance_model)
+
+
+def split_by_confidence(
+    probabilities: np.ndarray,
+    config: RelevanceModelSettings,
+) -> Tuple[List[int], List[int], List[int]]:
+    """Positions of confident accepts, confident rejects and the uncertain band."""
+    accept = np.flatnonzero(probabilities >= config.accept_threshold)
+    reject = np.flatnonzero(probabilities <= config.reject_threshold)
+    uncertain = np.flatnonzero((probabilities > config.reject_threshold) & (probabilities < config.accept_threshold))
+    return accept.tolist(), reject.tolist(), uncertain.tolist()
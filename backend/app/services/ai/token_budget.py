@@ -0,0 +1,111 @@
+"""Token estimation and budget-based packing of filter batches."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.config import BatchTokenBudget
+from app.services.ai.filter_prompts import (
+    COARSE_DOCUMENT_SEPARATOR,
+    FINE_DOCUMENT_SEPARATOR,
+    coarse_document_text,
+    coarse_filter_prompt,
+    fine_document_text,
+    fine_filter_prompt,
+    filter_model,
+)
+from app.services.ai.prompt_compaction import estimate_tokens, model_budget
+
+# 每篇文献在回答中占用的 token：粗筛只有编号和评分，精筛还有中文总结和亮点
+ANSWER_TOKENS = {"coarse": 15, "fine": 210}
+
+
+def document_tokens(stage: str, doc: Dict[str, Any], abstract_tokens: int) -> int:
+    """Prompt text of one document as rendered for ``stage`` plus its share of the answer."""
+    if stage == "coarse":
+        text = coarse_document_text(0, doc, abstract_tokens) + COARSE_DOCUMENT_SEPARATOR
+    else:
+        text = fine_document_text(0, doc, abstract_tokens) + FINE_DOCUMENT_SEPARATOR
+    return estimate_tokens(text) + ANSWER_TOKENS[stage]
+
+
+def prompt_overhead(stage: str, context: Dict[str, Any]) -> int:
+    """Tokens of the prompt template itself: persona, task text and output format."""
+    build = coarse_filter_prompt if stage == "coarse" else fine_filter_prompt
+    prompt = build(context, [])
+    return sum(estimate_tokens(part) for part in (prompt.role, prompt.goal, prompt.backstory, prompt.description, prompt.expected_output))
+
+
+def budget_for(context: Dict[str, Any]) -> BatchTokenBudget:
+    """Budget of the filter model, falling back to the global defaults."""
+    return model_budget(filter_model(context))
+
+
+@dataclass
+class TokenBatch:
+    documents: List[Dict[str, Any]] = field(default_factory=list)
+    tokens: int = 0
+
+
+class BatchPacker:
+    """
+    Fill filter batches up to a per-model token budget.
+
+    ``pack`` bins a known document set first-fit-decreasing, so long and
+    short abstracts share batches and the batch count stays near minimal;
+    each batch keeps the input order. ``add``/``flush`` cut batches from a
+    stream (coarse survivors flowing into the fine stage). A document that
+    alone exceeds the budget still gets a batch of its own.
+    """
+
+    def __init__(self, stage: str, context: Dict[str, Any], budget: Optional[BatchTokenBudget] = None) -> None:
+        budget = budget or budget_for(context)
+        self.stage = stage
+        self.overhead = prompt_overhead(stage, context)
+        self.token_budget = budget.coarse_tokens if stage == "coarse" else budget.fine_tokens
+        self.max_documents = max(1, budget.coarse_max_documents if stage == "coarse" else budget.fine_max_documents)
+        self.abstract_tokens = budget.coarse_abstract_tokens if stage == "coarse" else budget.fine_abstract_tokens
+        self._pending = TokenBatch(tokens=self.overhead)
+
+    def pack(self, documents: List[Dict[str, Any]]) -> List[TokenBatch]:
+        costs = [document_tokens(self.stage, doc, self.abstract_tokens) for doc in documents]
+        bins: List[List[int]] = []
+        loads: List[int] = []
+        for index in sorted(range(len(documents)), key=lambda i: costs[i], reverse=True):
+            target = next(
+                (
+                    b for b, members in enumerate(bins)
+                    if len(members) < self.max_documents and loads[b] + costs[index] <= self.token_budget
+                ),
+                None,
+            )
+            if target is None:
+                bins.append([])
+                loads.append(self.overhead)
+                target = len(bins) - 1
+            bins[target].append(index)
+            loads[target] += costs[index]
+        # 批内按原顺序排列，批次按首篇文献的位置排序，保证结果可复现
+        ordered = sorted((sorted(members), load) for members, load in zip(bins, loads))
+        return [TokenBatch([documents[i] for i in members], load) for members, load in ordered]
+
+    def add(self, doc: Dict[str, Any]) -> List[TokenBatch]:
+        """Buffer a document; returns the batches it completed (at most two)."""
+        cost = document_tokens(self.stage, doc, self.abstract_tokens)
+        ready: List[TokenBatch] = []
+        if self._pending.documents and self._pending.tokens + cost > self.token_budget:
+            ready.append(self._take())
+        self._pending.documents.append(doc)
+        self._pending.tokens += cost
+        # 数量已满就立即发出，不必等下一篇文献到来
+        if len(self._pending.documents) >= self.max_documents:
+            ready.append(self._take())
+        return ready
+
+    def flush(self) -> Optional[TokenBatch]:
+        return self._take() if self._pending.documents else None
+
+    def _take(self) -> TokenBatch:
+        batch, self._pending = self._pending, TokenBatch(tokens=self.overhead)
+        return batch
@@ -0,0 +1,117 @@
+"""Persistent cache of per-document LLM filter verdicts."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from app.config import get_settings
+from app.services.ai.batch_executor import resolve_provider, resolve_temperature
+from app.services.ai.direct_engine import ENGINE_CREWAI
+from app.services.ai.lexical_ranker import COARSE_STRATEGY_LLM
+from app.services.ai.prompt_compaction import model_budget
+from app.utils.disk_cache import DiskCache
+
+VERDICT_CACHE_NAMESPACE = "filter_verdicts"
+
+
+def document_fingerprint(doc: Dict[str, Any]) -> str:
+    """Hash of the content the filter prompts show, independent of ids and versions."""
+    raw = json.dumps(
+        [
+            " ".join(str(doc.get("title") or "").split()),
+            " ".join(str(doc.get("abstract") or "").split()),
+            list(doc.get("authors") or []),
+            list(doc.get("keywords") or []),
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def verdict_scope(stage: str, task_context: Dict[str, Any], filter_config: Dict[str, Any]) -> str:
+    """
+    Everything besides the document that determines a verdict.
+
+    Covers the stage, provider, model, engine and temperature, the abstract
+    budget the stage's prompt is rendered with, the research prompt,
+    keywords, the custom filter prompt and the relevance threshold, so tasks
+    sharing all of them share verdicts while any change starts afresh. A
+    non-default coarse strategy is part of the scope too, since the stored
+    final verdict of a coarse-rejected document depends on it.
+    """
+    settings = get_settings()
+    ai_config = task_context.get("ai_config") or {}
+    provider = resolve_provider(ai_config)
+    provider_config = settings.ai.providers.get(provider)
+    model = ai_config.get("model") or settings.ai.filter_model or (provider_config.model if provider_config else None)
+    budget = model_budget(model)
+    parts: List[Any] = [
+        stage,
+        provider,
+        model,
+        ai_config.get("engine") or ENGINE_CREWAI,
+        resolve_temperature(ai_config),
+        budget.coarse_abstract_tokens if stage == "coarse" else budget.fine_abstract_tokens,
+        task_context.get("prompt") or "",
+        sorted(task_context.get("keywords") or []),
+        str(filter_config.get("filter_prompt") or "").strip(),
+        filter_config.get("min_relevance_score"),
+    ]
+    # 默认策略不写入，已有缓存和增量标记保持有效
+    strategy = filter_config.get("coarse_strategy")
+    if strategy and strategy != COARSE_STRATEGY_LLM:
+        parts.append(strategy)
+    raw = json.dumps(parts, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class VerdictCache:
+    """
+    Verdicts keyed by (scope, document fingerprint).
+
+    Reruns, new versions of an unchanged paper and tasks with the same
+    prompt and model all hit the same entries. Size and TTL eviction come
+    from ``DiskCache``.
+    """
+
+    def __init__(self, cache: DiskCache) -> None:
+        self._cache = cache
+
+    async def lookup(self, scope: str, documents: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Cached verdicts by ``external_id``, re-targeted at the given documents."""
+        keys = {self._key(scope, doc): doc.get("external_id", "") for doc in documents}
+        try:
+            found = await self._cache.get_many(VERDICT_CACHE_NAMESPACE, list(keys))
+        except Exception as exc:  # pragma: no cover - 缓存损坏时直接走模型
+            logger.warning("Filter verdict cache lookup failed: {}", exc)
+            return {}
+        return {keys[key]: {**verdict, "external_id": keys[key]} for key, verdict in found.items()}
+
+    async def store(self, scope: str, documents: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> None:
+        by_id = {result["external_id"]: result for result in results}
+        items = {
+            self._key(scope, doc): by_id[doc.get("external_id")]
+            for doc in documents
+            if doc.get("external_id") in by_id
+        }
+        try:
+            await self._cache.set_many(VERDICT_CACHE_NAMESPACE, items)
+        except Exception as exc:  # pragma: no cover
+            logger.warning("Filter verdict cache write failed: {}", exc)
+
+    @staticmethod
+    def _key(scope: str, doc: Dict[str, Any]) -> str:
+        return hashlib.sha256(f"{scope}:{document_fingerprint(doc)}".encode("utf-8")).hexdigest()
+
+
+@lru_cache
+def get_verdict_cache() -> Optional[VerdictCache]:
+    config = get_settings().ai.verdict_cache
+    if not config.enabled:
+        return None
+    return VerdictCache(DiskCache(config.path, ttl_seconds=config.ttl_seconds, max_entries=config.max_entries))
@@ -0,0 +1,107 @@
+"""Application-wide pooled HTTP clients."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import aiohttp
+import httpx
+from loguru import logger
+
+from app.config import get_settings
+
+
+@dataclass
+class _LoopClients:
+    """Clients bound to one event loop; their connections cannot be used from another."""
+
+    httpx: Optional[httpx.AsyncClient] = None
+    aiohttp: Optional[aiohttp.ClientSession] = None
+
+    async def aclose(self) -> None:
+        if self.httpx is not None and not self.httpx.is_closed:
+            await self.httpx.aclose()
+        if self.aiohttp is not None and not self.aiohttp.closed:
+            await self.aiohttp.close()
+        self.httpx = None
+        self.aiohttp = None
+
+
+class HttpClientPool:
+    """
+    Keep-alive HTTP clients shared by retrieval, LLM providers and webhooks.
+
+    Clients are created lazily, one set per event loop, so code running on
+    another loop (e.g. a scheduler on its own loop) gets its own clients
+    instead of replacing those of the main loop. ``close`` closes the
+    clients of every loop and is registered as an application cleanup
+    hook; scripts that run several loops close the pool before each ends.
+    """
+
+    def __init__(self) -> None:
+        self._pools: Dict[asyncio.AbstractEventLoop, _LoopClients] = {}
+
+    def httpx_client(self) -> httpx.AsyncClient:
+        """Return the shared httpx client (HTTP/2 when ``h2`` is installed)."""
+        clients = self._loop_clients()
+        if clients.httpx is None or clients.httpx.is_closed:
+            config = get_settings().http
+            http2 = config.http2 and importlib.util.find_spec("h2") is not None
+            clients.httpx = httpx.AsyncClient(
+                http2=http2,
+                follow_redirects=True,
+                timeout=httpx.Timeout(config.timeout_seconds, connect=config.connect_timeout_seconds),
+                limits=httpx.Limits(
+                    max_connections=config.max_connections,
+                    max_keepalive_connections=config.max_keepalive_connections,
+                    keepalive_expiry=config.keepalive_expiry_seconds,
+                ),
+            )
+            logger.info("Created pooled httpx client (http2={}, max_connections={})", http2, config.max_connections)
+        return clients.httpx
+
+    async def aiohttp_session(self) -> aiohttp.ClientSession:
+        """Return the shared aiohttp session."""
+        clients = self._loop_clients()
+        if clients.aiohttp is None or clients.aiohttp.closed:
+            config = get_settings().http
+            connector = aiohttp.TCPConnector(
+                limit=config.max_connections,
+                keepalive_timeout=config.keepalive_expiry_seconds,
+            )
+            clients.aiohttp = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=config.timeout_seconds, connect=config.connect_timeout_seconds),
+            )
+            logger.info("Created pooled aiohttp session (limit={})", config.max_connections)
+        return clients.aiohttp
+
+    async def close(self) -> None:
+        """Close the pooled clients of every event loop."""
+        current = asyncio.get_running_loop()
+        for loop, clients in list(self._pools.items()):
+            if loop is current:
+                await clients.aclose()
+            elif loop.is_running():
+                # 其他线程上的 loop：在它自己的 loop 上关闭
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(clients.aclose(), loop))
+            self._pools.pop(loop, None)
+        logger.info("Pooled HTTP clients closed")
+
+    def _loop_clients(self) -> _LoopClients:
+        loop = asyncio.get_running_loop()
+        clients = self._pools.get(loop)
+        if clients is None:
+            # 已关闭的 loop 上的连接既不能复用也无法再关闭，只能丢弃
+            for stale in [other for other in self._pools if other.is_closed()]:
+                logger.warning("Dropping HTTP clients of a closed event loop that was not closed with the pool")
+                del self._pools[stale]
+            clients = self._pools[loop] = _LoopClients()
+        return clients
+
+
+# Global HTTP client pool
+http_pool = HttpClientPool()
@@ -2,6 +2,8 @@
 
 import aiohttp
 from typing import List, Dict, Any
+
+from app.services.http_clients import http_pool
 from .base import MCPTool, MCPToolParameter, MCPToolResult
 
 
@@ -74,33 +76,33 @@ class FeishuTool(MCPTool):
             # Send to webhook
             self.logger.info(f"Sending to Feishu webhook: {task_name}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    webhook_url,
-                    json=message,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    response_text = await response.text()
-                    
-                    if response.status != 200:
-                        raise Exception(
-                            f"Feishu webhook returned {response.status}: "
-                            f"{response_text}"
-                        )
-                    
-                    self.logger.info(
-                        f"Feishu notification sent successfully: {task_name}"
-                    )
-                    
-                    return MCPToolResult(
-                        success=True,
-                        data={
-                            "task_name": task_name,
-                            "documents_count": documents_count,
-                            "webhook_url": webhook_url[:50] + "..."
-                        }
+            session = await http_pool.aiohttp_session()
+            async with session.post(
+                webhook_url,
+                json=message,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                response_text = await response.text()
+                
+                if response.status != 200:
+                    raise Exception(
+                        f"Feishu webhook returned {response.status}: "
+                        f"{response_text}"
                     )
-        
+                
+                self.logger.info(
+                    f"Feishu notification sent successfully: {task_name}"
+                )
+                
+                return MCPToolResult(
+                    success=True,
+                    data={
+                        "task_name": task_name,
+                        "documents_count": documents_count,
+                        "webhook_url": webhook_url[:50] + "..."
+                    }
+                )
+    
         except Exception as e:
             self.logger.error(f"Failed to send Feishu notification: {str(e)}")
             return MCPToolResult(
@@ -0,0 +1,226 @@
+"""ArXiv daily category listing source with local keyword matching."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from loguru import logger
+
+from app.config import get_settings
+from app.services.http_clients import http_pool
+from app.services.retrieval.arxiv_source import _is_behind, _parse_datetime
+from app.services.retrieval.atom_stream import ATOM, AtomEntryStream, parse_timestamp
+from app.services.retrieval.rate_limit import get_rate_limiter
+from app.services.zotero.client import ZoteroClient
+from app.utils.disk_cache import DiskCache
+
+ARXIV_LISTING_URL = "https://rss.arxiv.org/atom/{category}"
+ARXIV_NS = "{http://arxiv.org/schemas/atom}"
+DC_NS = "{http://purl.org/dc/elements/1.1/}"
+LISTING_CACHE_NAMESPACE = "arxiv_listing"
+LISTING_TTL_SECONDS = 36 * 3600  # 键里已带日期，TTL 只用于清理旧列表
+_ABSTRACT_PREFIX = re.compile(r"^arXiv:\S+\s+Announce Type:\s*\S+\s*(?:Abstract:\s*)?", re.IGNORECASE)
+
+
+class ArxivListingRetrievalSource:
+    """
+    Pull each category's daily announcement feed once and match keywords locally.
+
+    Listings are shared across tasks per (category, UTC day) through the
+    retrieval cache file, so N keyword tasks on one category cost one request.
+    Parameters: ``categories`` (comma separated, required), ``match``
+    (``any`` or ``all`` keywords), ``announce_types`` (default ``new,cross``)
+    and the ``since`` watermark.
+    """
+
+    name = "arxiv_listing"
+
+    # 进程级：同一 (分类, 日期) 的列表同时只抓取一次，并发调用者共享同一个加载任务
+    _listings: Dict[str, asyncio.Task[List[Dict[str, Any]]]] = {}
+
+    def __init__(self, parameters: Optional[Dict[str, Any]] = None) -> None:
+        self._zotero_client = ZoteroClient()
+        self._rate_limiter = get_rate_limiter(self.name, parameters, default_interval=1.0)
+
+    async def search(self, prompt: str, keywords: List[str], parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        documents: List[Dict[str, Any]] = []
+        async for page in self.iter_search(prompt, keywords, parameters):
+            documents.extend(page)
+        return documents
+
+    async def iter_search(
+        self,
+        prompt: str,
+        keywords: List[str],
+        parameters: Dict[str, Any],
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield matching documents one category listing at a time."""
+        plan = self.describe_query(prompt, keywords, parameters, limit)
+        if not plan["categories"]:
+            logger.warning("arxiv_listing source needs a 'categories' parameter, nothing to fetch")
+            return
+        remaining = plan["max_results"]
+        matcher = _KeywordMatcher(keywords, require_all=plan["match"] == "all")
+        announce_types = set(plan["announce_types"])
+        since = _parse_datetime(parameters.get("since"))
+        seen: set[str] = set()
+
+        for category in plan["categories"]:
+            if remaining <= 0:
+                break
+            page = []
+            for doc in await self._get_listing(category):
+                # 交叉列表会在多个分类中重复出现
+                if doc["external_id"] in seen:
+                    continue
+                if announce_types and doc["extra"].get("announce_type") not in announce_types:
+                    continue
+                if since is not None and _is_behind(doc, "submittedDate", since):
+                    continue
+                if not matcher.matches(doc):
+                    continue
+                seen.add(doc["external_id"])
+                page.append(doc)
+                if len(page) >= remaining:
+                    break
+            if page:
+                remaining -= len(page)
+                yield page
+
+    def describe_query(
+        self,
+        prompt: str,
+        keywords: List[str],
+        parameters: Dict[str, Any],
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Resolve which listings are fetched and how they are filtered."""
+        max_results = int(parameters.get("max_results", 200))
+        if limit is not None:
+            max_results = min(max_results, limit)
+        return {
+            "categories": _split(parameters.get("categories", "")),
+            "keywords": list(keywords),
+            "match": str(parameters.get("match", "any")).lower(),
+            "announce_types": _split(parameters.get("announce_types", "new,cross")),
+            "max_results": max_results,
+            "listing_date": _listing_date(),
+        }
+
+    async def _get_listing(self, category: str) -> List[Dict[str, Any]]:
+        key = f"{category}:{_listing_date()}"
+        listing = self._listings.get(key)
+        if listing is None:
+            listing = asyncio.create_task(self._load_listing(category, key))
+            self._listings[key] = listing
+            listing.add_done_callback(lambda task: self._forget(key, task))
+        # 单个调用者被取消（如自身超时）不影响其他等待同一列表的任务
+        return await asyncio.shield(listing)
+
+    async def _load_listing(self, category: str, key: str) -> List[Dict[str, Any]]:
+        cache = _get_listing_cache()
+        if cache is not None:
+            cached = await cache.get(LISTING_CACHE_NAMESPACE, key)
+            if cached is not None:
+                logger.debug("Using cached arXiv listing {}", key)
+                return cached
+        documents = await self._fetch_listing(category)
+        if cache is not None:
+            await cache.set(LISTING_CACHE_NAMESPACE, key, documents)
+        return documents
+
+    @classmethod
+    def _forget(cls, key: str, task: asyncio.Task[List[Dict[str, Any]]]) -> None:
+        """Drop a finished load; later callers read the disk cache or start a new load."""
+        if cls._listings.get(key) is task:
+            del cls._listings[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("arXiv listing {} failed: {}", key, task.exception())
+
+    async def _fetch_listing(self, category: str) -> List[Dict[str, Any]]:
+        await self._rate_limiter.acquire()
+        url = ARXIV_LISTING_URL.format(category=category)
+        logger.info("Fetching arXiv daily listing {}", url)
+        documents: List[Dict[str, Any]] = []
+        client = http_pool.httpx_client()
+        async with client.stream("GET", url, timeout=60.0) as response:
+            response.raise_for_status()
+            stream = AtomEntryStream(self.name, _document_from_listing_entry)
+            async for chunk in response.aiter_bytes():
+                documents.extend(stream.feed(chunk))
+            documents.extend(stream.close())
+        logger.info("arXiv listing {} has {} entries", category, len(documents))
+        return documents
+
+    async def get_detail(self, url: str) -> Optional[Dict[str, Any]]:
+        """Fetch detailed metadata through the Zotero Web Translation API."""
+        return await self._zotero_client.retrieve_webpage_metadata(url)
+
+
+class _KeywordMatcher:
+    """Case-insensitive whole-word keyword matching over title and abstract."""
+
+    def __init__(self, keywords: List[str], require_all: bool = False) -> None:
+        self._patterns = [
+            re.compile(r"(?<!\w)" + r"\s+".join(map(re.escape, kw.split())) + r"(?!\w)", re.IGNORECASE)
+            for kw in keywords
+            if kw.strip()
+        ]
+        self._require_all = require_all
+
+    def matches(self, doc: Dict[str, Any]) -> bool:
+        if not self._patterns:
+            return True
+        text = f"{doc.get('title', '')}\n{doc.get('abstract', '')}"
+        hits = (pattern.search(text) is not None for pattern in self._patterns)
+        return all(hits) if self._require_all else any(hits)
+
+
+def _document_from_listing_entry(entry: ET.Element, source_name: str) -> Dict[str, Any]:
+    """Convert an rss.arxiv.org Atom entry to the ``ArxivRetrievalSource`` shape."""
+    # id 形如 oai:arXiv.org:2402.00001v1，统一成 API 返回的 abs 链接
+    arxiv_id = entry.findtext(f"{ATOM}id", default="").rsplit(":", 1)[-1]
+    entry_id = f"http://arxiv.org/abs/{arxiv_id}"
+    categories = [c.get("term") for c in entry.findall(f"{ATOM}category") if c.get("term")]
+    creators = entry.findtext(f"{DC_NS}creator") or ""
+    summary = (entry.findtext(f"{ATOM}summary") or "").strip()
+    return {
+        "external_id": entry_id,
+        "title": " ".join((entry.findtext(f"{ATOM}title") or "").split()),
+        "abstract": _ABSTRACT_PREFIX.sub("", summary).strip(),
+        "authors": [name.strip() for name in re.split(r",\s*(?:and\s+)?|\s+and\s+", creators) if name.strip()],
+        "url": entry_id,
+        "published_at": parse_timestamp(entry.findtext(f"{ATOM}published")),
+        "source": source_name,
+        "extra": {
+            "pdf_url": f"http://arxiv.org/pdf/{arxiv_id}",
+            "primary_category": categories[0] if categories else None,
+            "categories": categories,
+            "announce_type": entry.findtext(f"{ARXIV_NS}announce_type"),
+            "updated": entry.findtext(f"{ATOM}updated"),
+        },
+    }
+
+
+@lru_cache
+def _get_listing_cache() -> Optional[DiskCache]:
+    config = get_settings().retrieval.cache
+    if not config.enabled:
+        return None
+    return DiskCache(config.path, ttl_seconds=LISTING_TTL_SECONDS, max_entries=config.max_entries)
+
+
+def _listing_date() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def _split(value: Any) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value).split(",") if item.strip()]
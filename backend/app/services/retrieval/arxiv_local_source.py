@@ -0,0 +1,96 @@
+"""Retrieval source backed by the local arXiv metadata mirror."""
+
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from loguru import logger
+
+from app.services.retrieval.arxiv_mirror import document_from_row, get_mirror_store
+from app.services.retrieval.arxiv_source import DEFAULT_PAGE_SIZE, _parse_datetime
+from app.services.zotero.client import ZoteroClient
+
+
+class ArxivLocalRetrievalSource:
+    """
+    Search harvested arXiv metadata with SQLite FTS5 instead of the live API.
+
+    Parameters: ``match`` (raw FTS5 expression, defaults to the keywords
+    OR-ed as phrases), ``categories`` (comma separated, e.g. ``cs.AI,cs.CL``
+    or ``cs``), ``max_results``, ``sort_by`` (submittedDate, lastUpdatedDate
+    or relevance) and the ``since`` watermark.
+    """
+
+    name = "arxiv_local"
+
+    def __init__(self, parameters: Optional[Dict[str, Any]] = None) -> None:
+        self._store = get_mirror_store()
+        self._zotero_client = ZoteroClient()
+
+    async def search(self, prompt: str, keywords: List[str], parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        documents: List[Dict[str, Any]] = []
+        async for page in self.iter_search(prompt, keywords, parameters):
+            documents.extend(page)
+        return documents
+
+    async def iter_search(
+        self,
+        prompt: str,
+        keywords: List[str],
+        parameters: Dict[str, Any],
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        plan = self.describe_query(prompt, keywords, parameters, limit)
+        max_results = plan["max_results"]
+        if max_results <= 0 or not plan["query"]:
+            return
+        logger.info("Searching local arXiv mirror with match='{}', max_results={}", plan["query"], max_results)
+
+        offset = 0
+        while offset < max_results:
+            batch_size = min(plan["page_size"], max_results - offset)
+            rows = await self._store.search(
+                plan["query"],
+                limit=batch_size,
+                offset=offset,
+                categories=plan["categories"],
+                since=_parse_datetime(parameters.get("since")),
+                date_field="updated" if plan["sort_by"] == "lastUpdatedDate" else "published",
+                order="relevance" if plan["sort_by"] == "relevance" else "date",
+            )
+            if not rows:
+                break
+            yield [document_from_row(row, self.name) for row in rows]
+            offset += len(rows)
+            if len(rows) < batch_size:
+                break
+
+    def describe_query(
+        self,
+        prompt: str,
+        keywords: List[str],
+        parameters: Dict[str, Any],
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Resolve the FTS5 query ``iter_search`` will run."""
+        max_results = int(parameters.get("max_results", 50))
+        if limit is not None:
+            max_results = min(max_results, limit)
+        categories = [cat.strip() for cat in str(parameters.get("categories", "")).split(",") if cat.strip()]
+        return {
+            "query": parameters.get("match") or _fts_phrases(keywords or prompt.split()),
+            "categories": categories,
+            "max_results": max_results,
+            "page_size": max(1, min(int(parameters.get("page_size", DEFAULT_PAGE_SIZE)), max_results or 1)),
+            "sort_by": parameters.get("sort_by", "submittedDate"),
+        }
+
+    async def get_detail(self, url: str) -> Optional[Dict[str, Any]]:
+        """Fetch detailed metadata through the Zotero Web Translation API."""
+        return await self._zotero_client.retrieve_webpage_metadata(url)
+
+
+def _fts_phrases(terms: List[str]) -> str:
+    """OR together quoted phrases so user keywords never hit FTS5 syntax."""
+    phrases = ['"' + term.replace('"', '""') + '"' for term in (t.strip() for t in terms) if term]
+    return " OR ".join(phrases)
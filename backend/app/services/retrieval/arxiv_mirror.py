@@ -0,0 +1,423 @@
+"""Local arXiv metadata mirror: SQLite/FTS5 store and OAI-PMH harvester."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import httpx
+from loguru import logger
+
+from app.config import get_settings
+from app.services.http_clients import http_pool
+from app.services.retrieval.rate_limit import get_rate_limiter
+
+OAI = "{http://www.openarchives.org/OAI/2.0/}"
+ARXIV_RAW = "{http://arxiv.org/OAI/arXivRaw/}"
+OAI_RATE_LIMITER = "arxiv_oai"
+_AUTHOR_SPLIT = re.compile(r",\s*(?:and\s+)?|\s+and\s+")
+
+
+class ArxivMirrorStore:
+    """
+    SQLite store of arXiv metadata with an FTS5 index over title, abstract
+    and authors. Timestamps are stored as UTC ISO strings so they compare
+    lexicographically. Blocking SQLite calls run in a worker thread.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS papers (
+                    id INTEGER PRIMARY KEY,
+                    arxiv_id TEXT NOT NULL UNIQUE,
+                    version INTEGER NOT NULL DEFAULT 1,
+                    title TEXT NOT NULL,
+                    abstract TEXT NOT NULL,
+                    authors TEXT NOT NULL,
+                    categories TEXT NOT NULL,
+                    comment TEXT,
+                    journal_ref TEXT,
+                    doi TEXT,
+                    published TEXT,
+                    updated TEXT,
+                    datestamp TEXT
+                );
+                CREATE INDEX IF NOT EXISTS ix_papers_published ON papers(published);
+                CREATE INDEX IF NOT EXISTS ix_papers_updated ON papers(updated);
+                CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                    title, abstract, authors, content='papers', content_rowid='id', tokenize='porter unicode61'
+                );
+                CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+                    INSERT INTO papers_fts(rowid, title, abstract, authors) VALUES (new.id, new.title, new.abstract, new.authors);
+                END;
+                CREATE TRIGGER IF NOT EXISTS papers_ad AFTER DELETE ON papers BEGIN
+                    INSERT INTO papers_fts(papers_fts, rowid, title, abstract, authors) VALUES ('delete', old.id, old.title, old.abstract, old.authors);
+                END;
+                CREATE TRIGGER IF NOT EXISTS papers_au AFTER UPDATE ON papers BEGIN
+                    INSERT INTO papers_fts(papers_fts, rowid, title, abstract, authors) VALUES ('delete', old.id, old.title, old.abstract, old.authors);
+                    INSERT INTO papers_fts(rowid, title, abstract, authors) VALUES (new.id, new.title, new.abstract, new.authors);
+                END;
+                CREATE TABLE IF NOT EXISTS harvest_state (
+                    set_spec TEXT PRIMARY KEY,
+                    last_datestamp TEXT NOT NULL,
+                    harvested_at REAL NOT NULL,
+                    records INTEGER NOT NULL DEFAULT 0
+                );
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self._path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    async def upsert(self, records: Sequence[Dict[str, Any]]) -> None:
+        await asyncio.to_thread(self._upsert, records)
+
+    async def delete(self, arxiv_ids: Sequence[str]) -> None:
+        await asyncio.to_thread(self._delete, arxiv_ids)
+
+    async def search(
+        self,
+        match: str,
+        limit: int,
+        offset: int = 0,
+        categories: Sequence[str] = (),
+        since: Optional[datetime] = None,
+        date_field: str = "published",
+        order: str = "date",
+    ) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._search, match, limit, offset, categories, since, date_field, order)
+
+    async def get_last_datestamp(self, set_spec: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get_last_datestamp, set_spec)
+
+    async def set_last_datestamp(self, set_spec: str, datestamp: str, records: int) -> None:
+        await asyncio.to_thread(self._set_last_datestamp, set_spec, datestamp, records)
+
+    async def stats(self) -> Dict[str, Any]:
+        return await asyncio.to_thread(self._stats)
+
+    def _upsert(self, records: Sequence[Dict[str, Any]]) -> None:
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO papers (arxiv_id, version, title, abstract, authors, categories, comment, journal_ref, doi, published, updated, datestamp)
+                VALUES (:arxiv_id, :version, :title, :abstract, :authors, :categories, :comment, :journal_ref, :doi, :published, :updated, :datestamp)
+                ON CONFLICT(arxiv_id) DO UPDATE SET
+                    version = excluded.version, title = excluded.title, abstract = excluded.abstract,
+                    authors = excluded.authors, categories = excluded.categories, comment = excluded.comment,
+                    journal_ref = excluded.journal_ref, doi = excluded.doi, published = excluded.published,
+                    updated = excluded.updated, datestamp = excluded.datestamp
+                """,
+                [{**record, "authors": json.dumps(record["authors"], ensure_ascii=False)} for record in records],
+            )
+
+    def _delete(self, arxiv_ids: Sequence[str]) -> None:
+        with self._lock, self._connect() as conn:
+            conn.executemany("DELETE FROM papers WHERE arxiv_id = ?", [(arxiv_id,) for arxiv_id in arxiv_ids])
+
+    def _search(
+        self,
+        match: str,
+        limit: int,
+        offset: int,
+        categories: Sequence[str],
+        since: Optional[datetime],
+        date_field: str,
+        order: str,
+    ) -> List[Dict[str, Any]]:
+        column = "updated" if date_field == "updated" else "published"
+        clauses = ["papers_fts MATCH ?"]
+        params: List[Any] = [match]
+        if since is not None:
+            clauses.append(f"p.{column} >= ?")
+            params.append(_iso(since))
+        if categories:
+            # 带点的是完整分类（cs.AI）；不带点的既可能是大类前缀（cs），也可能是完整分类（hep-ph）
+            patterns = [f"% {cat} %" for cat in categories] + [f"% {cat}.%" for cat in categories if "." not in cat]
+            clauses.append("(" + " OR ".join("(' ' || p.categories || ' ') LIKE ?" for _ in patterns) + ")")
+            params.extend(patterns)
+        order_by = "bm25(papers_fts)" if order == "relevance" else f"p.{column} DESC"
+        sql = (
+            "SELECT p.* FROM papers_fts JOIN papers p ON p.id = papers_fts.rowid "
+            f"WHERE {' AND '.join(clauses)} ORDER BY {order_by} LIMIT ? OFFSET ?"
+        )
+        params.extend([limit, offset])
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [dict(row, authors=json.loads(row["authors"])) for row in rows]
+
+    def _get_last_datestamp(self, set_spec: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT last_datestamp FROM harvest_state WHERE set_spec = ?", (set_spec,)).fetchone()
+        return row["last_datestamp"] if row else None
+
+    def _set_last_datestamp(self, set_spec: str, datestamp: str, records: int) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO harvest_state (set_spec, last_datestamp, harvested_at, records) VALUES (?, ?, ?, ?)
+                ON CONFLICT(set_spec) DO UPDATE SET
+                    last_datestamp = excluded.last_datestamp, harvested_at = excluded.harvested_at,
+                    records = harvest_state.records + excluded.records
+                """,
+                (set_spec, datestamp, time.time(), records),
+            )
+
+    def _stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            papers = conn.execute("SELECT COUNT(*), MAX(published), MAX(updated) FROM papers").fetchone()
+            sets = conn.execute("SELECT set_spec, last_datestamp, harvested_at, records FROM harvest_state").fetchall()
+        return {
+            "papers": papers[0],
+            "latest_published": papers[1],
+            "latest_updated": papers[2],
+            "sets": [dict(row) for row in sets],
+        }
+
+
+class ArxivMirrorHarvester:
+    """
+    Incrementally harvest ``arXivRaw`` metadata over OAI-PMH into the store.
+
+    Each set resumes from the datestamp of its last completed harvest; the
+    boundary day is fetched again, which is harmless because writes upsert.
+    """
+
+    def __init__(self, store: Optional[ArxivMirrorStore] = None) -> None:
+        config = get_settings().retrieval.mirror
+        self._config = config
+        self._store = store or get_mirror_store()
+        self._rate_limiter = get_rate_limiter(OAI_RATE_LIMITER, default_interval=config.request_interval_seconds)
+
+    async def harvest(self, sets: Optional[Sequence[str]] = None, from_date: Optional[str] = None) -> Dict[str, int]:
+        """Harvest every configured set; returns the number of records written per set."""
+        results: Dict[str, int] = {}
+        for set_spec in sets or self._config.sets:
+            results[set_spec] = await self.harvest_set(set_spec, from_date)
+        return results
+
+    async def harvest_set(self, set_spec: str, from_date: Optional[str] = None) -> int:
+        start = from_date or await self._store.get_last_datestamp(set_spec) or self._config.initial_from
+        params: Dict[str, str] = {"verb": "ListRecords", "metadataPrefix": "arXivRaw", "set": set_spec}
+        if start:
+            params["from"] = start
+        logger.info("Harvesting arXiv set {} from {}", set_spec, start or "the beginning")
+
+        written = 0
+        latest = start or ""
+        while True:
+            page = await self._fetch_page(params)
+            if page["records"]:
+                await self._store.upsert(page["records"])
+            if page["deleted"]:
+                await self._store.delete(page["deleted"])
+            written += len(page["records"])
+            latest = max([latest, *page["datestamps"]])
+            token = page["resumption_token"]
+            if not token:
+                break
+            params = {"verb": "ListRecords", "resumptionToken": token}
+            logger.debug("Harvested {} records of set {} so far", written, set_spec)
+
+        # 仅在整个列表取完后推进断点，中途失败下次会从原位置重来
+        if latest:
+            await self._store.set_last_datestamp(set_spec, latest, written)
+        logger.info("Harvested {} records for arXiv set {} (datestamp {})", written, set_spec, latest or "-")
+        return written
+
+    async def _fetch_page(self, params: Dict[str, str], max_retries: int = 5) -> Dict[str, Any]:
+        last_error: Optional[Exception] = None
+        for attempt in range(max_retries):
+            await self._rate_limiter.acquire()
+            client = http_pool.httpx_client()
+            try:
+                async with client.stream("GET", self._config.oai_url, params=params, timeout=120.0) as response:
+                    if response.status_code == 503:
+                        # OAI-PMH 流控：按 Retry-After 等待后重试
+                        retry_after = _retry_after_seconds(response.headers.get("Retry-After"))
+                        logger.warning("OAI-PMH asked to retry after {}s", retry_after)
+                        await asyncio.sleep(retry_after)
+                        continue
+                    response.raise_for_status()
+                    parser = OaiRecordStream()
+                    async for chunk in response.aiter_bytes():
+                        parser.feed(chunk)
+                    return parser.close()
+            except (httpx.ConnectError, httpx.TimeoutException) as exc:
+                last_error = exc
+                wait_time = 2 ** attempt
+                logger.warning("OAI-PMH request failed ({}), retrying in {}s", type(exc).__name__, wait_time)
+                await asyncio.sleep(wait_time)
+        if last_error:
+            raise last_error
+        raise RuntimeError("OAI-PMH endpoint kept returning 503")
+
+
+class OaiRecordStream:
+    """Incremental parser for one OAI-PMH ``ListRecords`` response."""
+
+    def __init__(self) -> None:
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root: Optional[ET.Element] = None
+        self._list: Optional[ET.Element] = None
+        self.records: List[Dict[str, Any]] = []
+        self.deleted: List[str] = []
+        self.datestamps: List[str] = []
+        self.resumption_token: Optional[str] = None
+        self.error: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> None:
+        self._parser.feed(chunk)
+        self._drain()
+
+    def close(self) -> Dict[str, Any]:
+        self._parser.close()
+        self._drain()
+        if self.error and self.error != "noRecordsMatch":
+            raise RuntimeError(f"OAI-PMH error: {self.error}")
+        return {
+            "records": self.records,
+            "deleted": self.deleted,
+            "datestamps": self.datestamps,
+            "resumption_token": self.resumption_token,
+        }
+
+    def _drain(self) -> None:
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = elem
+                elif elem.tag == f"{OAI}ListRecords":
+                    self._list = elem
+                continue
+            if elem.tag == f"{OAI}record":
+                self._handle_record(elem)
+                if self._list is not None:
+                    self._list.remove(elem)
+            elif elem.tag == f"{OAI}resumptionToken":
+                self.resumption_token = (elem.text or "").strip() or None
+            elif elem.tag == f"{OAI}error":
+                self.error = elem.get("code") or (elem.text or "").strip()
+
+    def _handle_record(self, record: ET.Element) -> None:
+        header = record.find(f"{OAI}header")
+        if header is None:
+            return
+        datestamp = header.findtext(f"{OAI}datestamp", default="")
+        if datestamp:
+            self.datestamps.append(datestamp)
+        if header.get("status") == "deleted":
+            identifier = header.findtext(f"{OAI}identifier", default="")
+            self.deleted.append(identifier.rsplit(":", 1)[-1])
+            return
+        raw = record.find(f"{OAI}metadata/{ARXIV_RAW}arXivRaw")
+        if raw is not None:
+            self.records.append(_record_from_raw(raw, datestamp))
+
+
+def _record_from_raw(raw: ET.Element, datestamp: str) -> Dict[str, Any]:
+    versions = raw.findall(f"{ARXIV_RAW}version")
+    dates = [_parse_rfc2822(v.findtext(f"{ARXIV_RAW}date")) for v in versions]
+    authors = _AUTHOR_SPLIT.split(" ".join((raw.findtext(f"{ARXIV_RAW}authors") or "").split()))
+    return {
+        "arxiv_id": raw.findtext(f"{ARXIV_RAW}id", default=""),
+        "version": max(len(versions), 1),
+        "title": " ".join((raw.findtext(f"{ARXIV_RAW}title") or "").split()),
+        "abstract": (raw.findtext(f"{ARXIV_RAW}abstract") or "").strip(),
+        "authors": [name.strip() for name in authors if name.strip()],
+        "categories": " ".join((raw.findtext(f"{ARXIV_RAW}categories") or "").split()),
+        "comment": raw.findtext(f"{ARXIV_RAW}comments"),
+        "journal_ref": raw.findtext(f"{ARXIV_RAW}journal-ref"),
+        "doi": raw.findtext(f"{ARXIV_RAW}doi"),
+        "published": _iso(dates[0]) if dates and dates[0] else None,
+        "updated": _iso(dates[-1]) if dates and dates[-1] else None,
+        "datestamp": datestamp,
+    }
+
+
+def document_from_row(row: Dict[str, Any], source_name: str) -> Dict[str, Any]:
+    """Convert a store row into the same document shape as ``ArxivRetrievalSource``."""
+    entry_id = f"http://arxiv.org/abs/{row['arxiv_id']}v{row['version']}"
+    categories = row["categories"].split()
+    published = row.get("published")
+    return {
+        "external_id": entry_id,
+        "title": row["title"],
+        "abstract": row["abstract"],
+        "authors": row["authors"],
+        "url": entry_id,
+        "published_at": datetime.fromisoformat(published) if published else None,
+        "source": source_name,
+        "extra": {
+            "pdf_url": f"http://arxiv.org/pdf/{row['arxiv_id']}v{row['version']}",
+            "primary_category": categories[0] if categories else None,
+            "categories": categories,
+            "comment": row.get("comment"),
+            "journal_ref": row.get("journal_ref"),
+            "doi": row.get("doi"),
+            "updated": row.get("updated"),
+        },
+    }
+
+
+_store: Optional[ArxivMirrorStore] = None
+
+
+def get_mirror_store() -> ArxivMirrorStore:
+    global _store
+    if _store is None:
+        _store = ArxivMirrorStore(get_settings().retrieval.mirror.path)
+    return _store
+
+
+async def harvest_arxiv_mirror() -> Dict[str, int]:
+    """Scheduler entry point: harvest all configured sets."""
+    try:
+        return await ArxivMirrorHarvester().harvest()
+    except Exception as exc:
+        logger.error("arXiv mirror harvest failed: {}", exc)
+        return {}
+
+
+def _iso(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def _parse_rfc2822(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_after_seconds(value: Optional[str]) -> float:
+    try:
+        return max(1.0, float(value)) if value else 30.0
+    except ValueError:
+        return 30.0
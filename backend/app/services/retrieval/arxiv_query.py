@@ -0,0 +1,142 @@
+"""Compile task keywords and parameters into field-scoped arXiv API queries."""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+FIELD_PREFIXES = {"ti", "au", "abs", "co", "jr", "cat", "rn", "id", "all"}
+DEFAULT_FIELDS = "ti,abs"
+_PREFIXED = re.compile(r"^([a-z]{2,3}):\S")
+
+
+def compile_arxiv_query(
+    keywords: List[str],
+    parameters: Dict[str, Any],
+    prompt: str = "",
+    since: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Build the ``search_query`` string plus the clauses it was made of.
+
+    Parameters understood:
+      - ``query``: raw arXiv syntax, used verbatim instead of the keywords
+      - ``fields``: fields each keyword is matched in (default ``ti,abs``)
+      - ``keyword_operator``: ``OR`` (default) or ``AND`` between keywords
+      - ``categories``: comma separated, ``cs.CL`` or a whole archive ``cs``
+      - ``exclude``: comma separated keywords removed with ``ANDNOT``
+      - ``date_from`` / ``date_to`` (ISO dates) or ``days``: submission window
+
+    Keywords already carrying a field prefix (``au:smith``) pass through;
+    multi-word keywords become quoted phrases. ``since`` (the retrieval
+    watermark) narrows the date window further.
+    """
+    fields = [f for f in _split(parameters.get("fields", DEFAULT_FIELDS)) if f in FIELD_PREFIXES] or ["all"]
+    operator = "AND" if str(parameters.get("keyword_operator", "OR")).upper() == "AND" else "OR"
+
+    raw = parameters.get("query")
+    if raw:
+        keyword_clause = str(raw)
+    else:
+        terms = [_term_clause(kw, fields) for kw in keywords if kw and kw.strip()]
+        # 没有关键词时沿用旧行为，直接使用任务描述
+        keyword_clause = f" {operator} ".join(terms) if terms else prompt
+
+    category_clause = _category_clause(_split(parameters.get("categories", "")))
+    exclude_terms = [_term_clause(kw, fields) for kw in _split(parameters.get("exclude", ""))]
+    date_clause = _date_clause(parameters, since)
+
+    parts = [clause for clause in (keyword_clause, category_clause, date_clause) if clause]
+    query = " AND ".join(f"({part})" if len(parts) > 1 and _needs_group(part) else part for part in parts)
+    if exclude_terms and query:
+        query = f"({query}) ANDNOT ({' OR '.join(exclude_terms)})"
+
+    return {
+        "query": query,
+        "clauses": {
+            "keywords": keyword_clause,
+            "categories": category_clause,
+            "dates": date_clause,
+            "exclude": exclude_terms,
+        },
+    }
+
+
+def date_field(sort_by: str) -> str:
+    return "lastUpdatedDate" if sort_by == "lastUpdatedDate" else "submittedDate"
+
+
+def date_range_clause(field: str, start: datetime, end: Optional[datetime] = None) -> str:
+    """Build an arXiv date-range clause; the upper bound defaults to the end of today (GMT)."""
+    start = start.astimezone(timezone.utc)
+    # 上界取当天结束，同一天内的相同查询保持一致
+    end = (end or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    return f"{field}:[{start:%Y%m%d%H%M} TO {end:%Y%m%d}2359]"
+
+
+def _term_clause(keyword: str, fields: List[str]) -> str:
+    keyword = keyword.strip()
+    match = _PREFIXED.match(keyword)
+    if match and match.group(1) in FIELD_PREFIXES:
+        return keyword
+    text = " ".join(keyword.replace('"', " ").split())
+    # arXiv 对带空格或连字符的词按短语处理需要加引号
+    value = f'"{text}"' if re.search(r"[\s\-]", text) else text
+    scoped = [f"{field}:{value}" for field in fields]
+    return scoped[0] if len(scoped) == 1 else "(" + " OR ".join(scoped) + ")"
+
+
+def _category_clause(categories: List[str]) -> str:
+    terms = [f"cat:{cat}" if "." in cat or "-" in cat else f"cat:{cat}.*" for cat in categories]
+    if len(terms) > 1:
+        return " OR ".join(terms)
+    return terms[0] if terms else ""
+
+
+def _date_clause(parameters: Dict[str, Any], since: Optional[datetime]) -> str:
+    start = _parse_date(parameters.get("date_from"))
+    end = _parse_date(parameters.get("date_to"))
+    days = parameters.get("days")
+    if days not in (None, ""):
+        window_start = datetime.now(timezone.utc) - timedelta(days=float(days))
+        start = max(start, window_start) if start else window_start
+    if since is not None:
+        since = since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+        start = max(start, since) if start else since
+    if start is None and end is None:
+        return ""
+    field = date_field(parameters.get("sort_by", "submittedDate"))
+    return date_range_clause(field, start or datetime(1991, 1, 1, tzinfo=timezone.utc), end)
+
+
+def _needs_group(clause: str) -> bool:
+    if " OR " not in clause and " ANDNOT " not in clause:
+        return False
+    # 已经整体包在一对括号里的子句无需再加括号
+    depth = 0
+    for index, char in enumerate(clause):
+        depth += char == "("
+        depth -= char == ")"
+        if depth == 0 and index < len(clause) - 1:
+            return True
+    return False
+
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _split(value: Any) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value or "").split(",") if item.strip()]
@@ -3,132 +3,242 @@
 from __future__ import annotations
 
 import asyncio
-import xml.etree.ElementTree as ET
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import itertools
+from contextlib import aclosing
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import httpx
 from loguru import logger
 
-import arxiv
+try:
+    import arxiv
+except ImportError:  # pragma: no cover - 可选依赖，缺失时走 HTTP API
+    arxiv = None
 
+from app.services.http_clients import http_pool
+from app.services.retrieval.arxiv_query import compile_arxiv_query, date_field
+from app.services.retrieval.atom_stream import AtomEntryStream
+from app.services.retrieval.rate_limit import get_rate_limiter
 from app.services.zotero.client import ZoteroClient
 
+DEFAULT_PAGE_SIZE = 100  # arxiv 库默认页大小
+ARXIV_REQUEST_INTERVAL_SECONDS = 3.0  # arXiv API 要求相邻请求间隔约 3 秒
+DATE_SORT_FIELDS = {"submittedDate", "lastUpdatedDate"}
+
 
 class ArxivRetrievalSource:
     """ArXiv source with arxiv library support and HTTP API fallback."""
 
     name = "arxiv"
+    cacheable = True
 
-    def __init__(self) -> None:
+    def __init__(self, parameters: Optional[Dict[str, Any]] = None) -> None:
         self._client = arxiv.Client() if arxiv is not None else None
         self._zotero_client = ZoteroClient()
+        # 所有任务共享同一个限流器，遵守 arXiv 每 3 秒一次请求的要求
+        self._rate_limiter = get_rate_limiter(self.name, parameters, default_interval=ARXIV_REQUEST_INTERVAL_SECONDS)
 
     async def search(self, prompt: str, keywords: List[str], parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
-        query = parameters.get("query") or " OR ".join(keywords) or prompt
+        documents: List[Dict[str, Any]] = []
+        async for page in self.iter_search(prompt, keywords, parameters):
+            documents.extend(page)
+        return documents
+
+    async def iter_search(
+        self,
+        prompt: str,
+        keywords: List[str],
+        parameters: Dict[str, Any],
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield documents page by page, never fetching more than ``limit`` results.
+
+        When ``parameters["since"]`` carries a watermark, only documents newer
+        than it are requested and paging stops at the first older result.
+        ``parameters["transport"] = "http"`` bypasses the arxiv library.
+        """
+        plan = self.describe_query(prompt, keywords, parameters, limit)
+        query = plan["query"]
+        max_results = plan["max_results"]
+        if max_results <= 0:
+            return
+        page_size = plan["page_size"]
+        sort_by = plan["sort_by"]
+        sort_order = plan["sort_order"]
+
+        since = _parse_datetime(parameters.get("since"))
+        sort_field = date_field(sort_by)
+        # 只有按时间倒序时，遇到早于水位线的结果才能提前停止翻页
+        stop_at_watermark = since is not None and sort_by in DATE_SORT_FIELDS and sort_order == "descending"
+
+        logger.info("Searching arXiv with query='{}', max_results={}, page_size={}", query, max_results, page_size)
+
+        use_library = self._client is not None and parameters.get("transport", "library") != "http"
+        if use_library:
+            pages = self._iter_library_pages(query, max_results, page_size, sort_by, sort_order)
+        else:
+            if self._client is None:
+                logger.warning("arxiv library unavailable, using arXiv HTTP API")
+            pages = self._iter_http_pages(query, max_results, page_size, sort_by, sort_order)
+
+        async with aclosing(pages):
+            async for page in pages:
+                if not stop_at_watermark:
+                    yield page
+                    continue
+                fresh = [doc for doc in page if not _is_behind(doc, sort_field, since)]
+                if fresh:
+                    yield fresh
+                if len(fresh) < len(page):
+                    logger.info("Reached arXiv watermark {}, stop paging", since.isoformat())
+                    break
+
+    def describe_query(
+        self,
+        prompt: str,
+        keywords: List[str],
+        parameters: Dict[str, Any],
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Resolve the exact upstream request ``iter_search`` will issue."""
+        compiled = compile_arxiv_query(keywords, parameters, prompt, since=_parse_datetime(parameters.get("since")))
         max_results = int(parameters.get("max_results", 50))
-        logger.info("Searching arXiv with query='{}', max_results={}", query, max_results)
+        if limit is not None:
+            max_results = min(max_results, limit)
+        sort_by = parameters.get("sort_by", "submittedDate")
+        return {
+            "query": compiled["query"],
+            "clauses": compiled["clauses"],
+            "max_results": max_results,
+            "page_size": max(1, min(int(parameters.get("page_size", DEFAULT_PAGE_SIZE)), max_results)),
+            "sort_by": sort_by,
+            "sort_order": parameters.get("sort_order", "descending"),
+        }
 
-        if self._client is not None and arxiv is not None:
-            # Map sort parameters to arxiv library enums
-            sort_by_str = parameters.get("sort_by", "submittedDate")
-            sort_order_str = parameters.get("sort_order", "descending")
-            
-            sort_by_map = {
-                "submittedDate": arxiv.SortCriterion.SubmittedDate,
-                "lastUpdatedDate": arxiv.SortCriterion.LastUpdatedDate,
-                "relevance": arxiv.SortCriterion.Relevance,
-            }
-            sort_order_map = {
-                "descending": arxiv.SortOrder.Descending,
-                "ascending": arxiv.SortOrder.Ascending,
-            }
-            
-            sort_by = sort_by_map.get(sort_by_str, arxiv.SortCriterion.SubmittedDate)
-            sort_order = sort_order_map.get(sort_order_str, arxiv.SortOrder.Descending)
-            
-            search = arxiv.Search(
+    async def _iter_library_pages(
+        self,
+        query: str,
+        max_results: int,
+        page_size: int,
+        sort_by: str,
+        sort_order: str,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Pull one API page at a time from the arxiv library generator."""
+        # Map sort parameters to arxiv library enums
+        sort_by_map = {
+            "submittedDate": arxiv.SortCriterion.SubmittedDate,
+            "lastUpdatedDate": arxiv.SortCriterion.LastUpdatedDate,
+            "relevance": arxiv.SortCriterion.Relevance,
+        }
+        sort_order_map = {
+            "descending": arxiv.SortOrder.Descending,
+            "ascending": arxiv.SortOrder.Ascending,
+        }
+
+        search = arxiv.Search(
+            query=query,
+            max_results=max_results,
+            sort_by=sort_by_map.get(sort_by, arxiv.SortCriterion.SubmittedDate),
+            sort_order=sort_order_map.get(sort_order, arxiv.SortOrder.Descending),
+        )
+        # 每次请求的页大小与消费粒度一致，取满一页才会触发下一次 API 调用；
+        # 库内部的重试不经过限流器，因此关闭，失败后在这里排队重试
+        client = arxiv.Client(
+            page_size=page_size,
+            delay_seconds=self._client.delay_seconds,
+            num_retries=0,
+        )
+        results = client.results(search)
+
+        loop = asyncio.get_running_loop()
+        yielded = 0
+        attempt = 0
+        while yielded < max_results:
+            batch_size = min(page_size, max_results - yielded)
+            # 取满一页恰好触发一次 API 请求，先在全局限流器排队
+            await self._rate_limiter.acquire()
+            try:
+                items = await loop.run_in_executor(None, lambda: list(itertools.islice(results, batch_size)))
+            except arxiv.ArxivError as exc:
+                attempt += 1
+                if attempt > self._client.num_retries:
+                    raise
+                logger.warning("arXiv page request failed on attempt {} ({}), retrying", attempt, type(exc).__name__)
+                # 出错的生成器已结束，从已取到的位置重新开始
+                results = client.results(search, offset=yielded)
+                continue
+            attempt = 0
+            if not items:
+                break
+            yield [self._document_from_result(item) for item in items]
+            yielded += len(items)
+            if len(items) < batch_size:
+                break
+
+    async def _iter_http_pages(
+        self,
+        query: str,
+        max_results: int,
+        page_size: int,
+        sort_by: str,
+        sort_order: str,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Page through the arXiv HTTP API, stopping at ``max_results``."""
+        start = 0
+        while start < max_results:
+            batch_size = min(page_size, max_results - start)
+            items = await self._search_via_http(
                 query=query,
-                max_results=max_results,
+                max_results=batch_size,
+                start=start,
                 sort_by=sort_by,
                 sort_order=sort_order,
             )
-            
-            loop = asyncio.get_event_loop()
-            results = await loop.run_in_executor(
-                None,
-                lambda: list(self._client.results(search)),
-            )
-            
-            documents: List[Dict[str, Any]] = []
-            for item in results:
-                published_at: Optional[datetime] = item.published if item.published else None
-                documents.append(
-                    {
-                        "external_id": item.entry_id,
-                        "title": item.title,
-                        "abstract": item.summary,
-                        "authors": [author.name for author in item.authors],
-                        "url": item.entry_id,
-                        "published_at": published_at,
-                        "source": self.name,
-                        "extra": {
-                            "pdf_url": item.pdf_url,
-                            "primary_category": item.primary_category,
-                            "categories": item.categories,
-                            "comment": item.comment,
-                            "journal_ref": item.journal_ref,
-                            "doi": item.doi,
-                            "updated": item.updated.isoformat() if item.updated else None,
-                        },
-                    }
-                )
-            return documents
-        else:
-            logger.warning("arxiv library unavailable, using arXiv HTTP API")
-            results = await self._search_via_http(
-                query=query,
-                max_results=max_results,
-                sort_by=parameters.get("sort_by", "submittedDate"),
-                sort_order=parameters.get("sort_order", "descending"),
-            )
+            if not items:
+                break
+            yield items
+            start += len(items)
+            if len(items) < batch_size:
+                break
 
-            documents: List[Dict[str, Any]] = []
-            for item in results:
-                published_at: Optional[datetime] = None
-                raw_published = item.get("published")
-                if raw_published:
-                    try:
-                        published_at = datetime.fromisoformat(str(raw_published).replace("Z", "+00:00"))
-                    except ValueError:
-                        published_at = None
-                documents.append(
-                    {
-                        "external_id": item.get("id", ""),
-                        "title": item.get("title", ""),
-                        "abstract": item.get("summary", ""),
-                        "authors": item.get("authors", []),
-                        "url": item.get("link", ""),
-                        "published_at": published_at,
-                        "source": self.name,
-                        "extra": {k: v for k, v in item.items() if k not in {"id", "title", "summary", "authors", "link", "published"}},
-                    }
-                )
-            return documents
+    def _document_from_result(self, item: Any) -> Dict[str, Any]:
+        """Convert an ``arxiv.Result`` into the document record shape."""
+        published_at: Optional[datetime] = item.published if item.published else None
+        return {
+            "external_id": item.entry_id,
+            "title": item.title,
+            "abstract": item.summary,
+            "authors": [author.name for author in item.authors],
+            "url": item.entry_id,
+            "published_at": published_at,
+            "source": self.name,
+            "extra": {
+                "pdf_url": item.pdf_url,
+                "primary_category": item.primary_category,
+                "categories": item.categories,
+                "comment": item.comment,
+                "journal_ref": item.journal_ref,
+                "doi": item.doi,
+                "updated": item.updated.isoformat() if item.updated else None,
+            },
+        }
 
     async def _search_via_http(
         self,
         query: str,
         max_results: int = 50,
+        start: int = 0,
         sort_by: str = "submittedDate",
         sort_order: str = "descending",
         max_retries: int = 3,
     ) -> List[Dict[str, Any]]:
-        """Fallback to arXiv HTTP API with retry mechanism."""
+        """Query the arXiv HTTP API with retries, parsing the feed as it streams in."""
         url = "https://export.arxiv.org/api/query"
         params = {
             "search_query": query,
-            "start": 0,
+            "start": start,
             "max_results": max_results,
             "sortBy": sort_by,
             "sortOrder": sort_order,
@@ -137,10 +247,16 @@ class ArxivRetrievalSource:
         last_error = None
         for attempt in range(max_retries):
             try:
-                async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                    response = await client.get(url, params=params)
+                await self._rate_limiter.acquire()
+                client = http_pool.httpx_client()
+                documents: List[Dict[str, Any]] = []
+                async with client.stream("GET", url, params=params, timeout=30.0) as response:
                     response.raise_for_status()
-                    return self._parse_atom_feed(response.text)
+                    stream = AtomEntryStream(self.name)
+                    async for chunk in response.aiter_bytes():
+                        documents.extend(stream.feed(chunk))
+                    documents.extend(stream.close())
+                return documents
             except (httpx.ConnectError, httpx.TimeoutException) as e:
                 last_error = e
                 wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
@@ -202,31 +318,22 @@ class ArxivRetrievalSource:
         logger.info("Successfully fetched detailed metadata with {} fields", len(metadata))
         return metadata
 
-    def _parse_atom_feed(self, payload: str) -> List[Dict[str, Any]]:
-        """Parse arXiv Atom feed."""
-        ns = {"atom": "http://www.w3.org/2005/Atom"}
-        root = ET.fromstring(payload)
-        documents: List[Dict[str, Any]] = []
-        for entry in root.findall("atom:entry", ns):
-            doc_id = entry.findtext("atom:id", default="", namespaces=ns)
-            title = (entry.findtext("atom:title", default="", namespaces=ns) or "").strip()
-            summary = (entry.findtext("atom:summary", default="", namespaces=ns) or "").strip()
-            published = entry.findtext("atom:published", default="", namespaces=ns)
-            links = entry.findall("atom:link", ns)
-            link = ""
-            for lnk in links:
-                if lnk.attrib.get("rel") == "alternate":
-                    link = lnk.attrib.get("href", "")
-                    break
-            authors = [author.findtext("atom:name", default="", namespaces=ns) for author in entry.findall("atom:author", ns)]
-            documents.append(
-                {
-                    "id": doc_id,
-                    "title": title,
-                    "summary": summary,
-                    "published": published,
-                    "link": link,
-                    "authors": [name for name in authors if name],
-                }
-            )
-        return documents
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    """Parse a datetime or ISO string, assuming UTC for naive values."""
+    if value is None or value == "":
+        return None
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _is_behind(document: Dict[str, Any], field: str, since: datetime) -> bool:
+    if field == "lastUpdatedDate":
+        timestamp = _parse_datetime((document.get("extra") or {}).get("updated")) or _parse_datetime(document.get("published_at"))
+    else:
+        timestamp = _parse_datetime(document.get("published_at"))
+    return timestamp is not None and timestamp < since
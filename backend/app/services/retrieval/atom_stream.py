@@ -0,0 +1,116 @@
+"""Incremental parser turning arXiv Atom feeds into document records."""
+
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+ARXIV = "{http://arxiv.org/schemas/atom}"
+
+EntryConverter = Callable[[ET.Element, str], Dict[str, Any]]
+
+
+class AtomEntryStream:
+    """
+    Feed raw bytes as they arrive and collect finished documents per chunk.
+
+    Each ``<entry>`` is converted straight into the retrieval document shape
+    and then dropped from the tree, so memory stays bounded by one entry
+    rather than the whole response. ``converter`` adapts other Atom dialects
+    (e.g. the category listing feeds) to the same shape.
+    """
+
+    def __init__(self, source_name: str, converter: Optional[EntryConverter] = None) -> None:
+        self._source_name = source_name
+        self._converter = converter or _document_from_entry
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root: Optional[ET.Element] = None
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> List[Dict[str, Any]]:
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        documents: List[Dict[str, Any]] = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = elem
+                continue
+            if elem.tag == f"{ATOM}entry":
+                documents.append(self._converter(elem, self._source_name))
+                # 已转换的 entry 立即从树上摘除，避免整份响应常驻内存
+                if self._root is not None:
+                    self._root.remove(elem)
+        return documents
+
+
+def parse_atom_chunks(
+    chunks: Iterable[bytes],
+    source_name: str,
+    converter: Optional[EntryConverter] = None,
+) -> List[Dict[str, Any]]:
+    """Parse an already available feed, e.g. read from disk."""
+    stream = AtomEntryStream(source_name, converter)
+    documents: List[Dict[str, Any]] = []
+    for chunk in chunks:
+        documents.extend(stream.feed(chunk))
+    documents.extend(stream.close())
+    return documents
+
+
+def _document_from_entry(entry: ET.Element, source_name: str) -> Dict[str, Any]:
+    link = ""
+    pdf_url = None
+    authors: List[str] = []
+    categories: List[str] = []
+    for child in entry:
+        tag = child.tag
+        if tag == f"{ATOM}link":
+            if child.get("rel") == "alternate" and not link:
+                link = child.get("href", "")
+            elif child.get("title") == "pdf":
+                pdf_url = child.get("href")
+        elif tag == f"{ATOM}author":
+            name = child.findtext(f"{ATOM}name")
+            if name:
+                authors.append(name)
+        elif tag == f"{ATOM}category":
+            term = child.get("term")
+            if term:
+                categories.append(term)
+
+    primary = entry.find(f"{ARXIV}primary_category")
+    return {
+        "external_id": entry.findtext(f"{ATOM}id", default=""),
+        "title": (entry.findtext(f"{ATOM}title") or "").strip(),
+        "abstract": (entry.findtext(f"{ATOM}summary") or "").strip(),
+        "authors": authors,
+        "url": link,
+        "published_at": parse_timestamp(entry.findtext(f"{ATOM}published")),
+        "source": source_name,
+        "extra": {
+            "pdf_url": pdf_url,
+            "primary_category": primary.get("term") if primary is not None else None,
+            "categories": categories,
+            "comment": entry.findtext(f"{ARXIV}comment"),
+            "journal_ref": entry.findtext(f"{ARXIV}journal_ref"),
+            "doi": entry.findtext(f"{ARXIV}doi"),
+            "updated": entry.findtext(f"{ATOM}updated"),
+        },
+    }
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Protocol
+from typing import Any, AsyncIterator, Dict, List, Optional, Protocol
 
 
 class RetrievalSource(Protocol):
@@ -26,3 +26,21 @@ class RetrievalSource(Protocol):
             Dictionary with detailed metadata or None if extraction fails
         """
         ...
+
+
+class StreamingRetrievalSource(RetrievalSource, Protocol):
+    async def iter_search(
+        self,
+        prompt: str,
+        keywords: List[str],
+        parameters: Dict[str, Any],
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield documents page by page.
+
+        Implementations must stop requesting further pages once ``limit``
+        documents have been produced, so callers can push their document cap
+        down to the upstream API.
+        """
+        ...
@@ -0,0 +1,142 @@
+"""Persistent response cache for retrieval sources."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from contextlib import aclosing
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from app.config import get_settings
+from app.utils.disk_cache import DiskCache
+from app.utils.run_stats import RETRIEVAL, record_stat
+
+_BOOLEAN_OPERATORS = {"AND", "OR", "ANDNOT"}
+_CACHE_NAMESPACE = "retrieval"
+
+
+@lru_cache
+def get_retrieval_cache() -> DiskCache:
+    """Process-wide retrieval cache built from settings."""
+    config = get_settings().retrieval.cache
+    return DiskCache(config.path, ttl_seconds=config.ttl_seconds, max_entries=config.max_entries)
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and case-fold terms, keeping boolean operators intact."""
+    tokens = str(query).split()
+    return " ".join(token if token in _BOOLEAN_OPERATORS else token.lower() for token in tokens)
+
+
+def resolve_query_key(
+    source: Any,
+    prompt: str,
+    keywords: List[str],
+    parameters: Dict[str, Any],
+    limit: Optional[int] = None,
+) -> Tuple[str, int]:
+    """
+    Identify an upstream request as (source, normalized query, sort, max_results).
+
+    Returns the hashed key together with the effective ``max_results``.
+    Sources may expose ``describe_query`` to report the exact request they
+    will issue; otherwise the key is derived from the raw parameters.
+    """
+    describe = getattr(source, "describe_query", None)
+    if describe is not None:
+        plan = describe(prompt, keywords, parameters, limit)
+        query = plan["query"]
+        sort = [plan.get("sort_by"), plan.get("sort_order")]
+        max_results = plan.get("max_results")
+    else:
+        query = parameters.get("query") or " OR ".join(keywords) or prompt
+        sort = [parameters.get("sort_by"), parameters.get("sort_order")]
+        max_results = int(parameters.get("max_results", 50))
+        if limit is not None:
+            max_results = min(max_results, limit)
+    raw = json.dumps([source.name, normalize_query(query), sort, max_results], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest(), int(max_results)
+
+
+class CachedRetrievalSource:
+    """
+    Wrap a retrieval source with the persistent response cache.
+
+    Entries are keyed by ``resolve_query_key``. Only complete result sets
+    are stored.
+    """
+
+    def __init__(self, source: Any, cache: Optional[DiskCache] = None) -> None:
+        self._source = source
+        self._cache = cache or get_retrieval_cache()
+        self.name = source.name
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self._source, item)
+
+    async def search(self, prompt: str, keywords: List[str], parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        documents: List[Dict[str, Any]] = []
+        async for page in self.iter_search(prompt, keywords, parameters):
+            documents.extend(page)
+        return documents
+
+    async def iter_search(
+        self,
+        prompt: str,
+        keywords: List[str],
+        parameters: Dict[str, Any],
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        key, max_results = resolve_query_key(self._source, prompt, keywords, parameters, limit)
+        page_size = max(1, int(parameters.get("page_size", 100)))
+
+        cached = await self._cache.get(_CACHE_NAMESPACE, key)
+        if cached is not None:
+            record_stat(RETRIEVAL, self.name, "cache_hits")
+            logger.info("Retrieval cache hit for {} ({} documents)", self.name, len(cached))
+            for start in range(0, len(cached), page_size):
+                yield cached[start:start + page_size]
+            return
+
+        record_stat(RETRIEVAL, self.name, "cache_misses")
+        documents: List[Dict[str, Any]] = []
+        stored = False
+        async with aclosing(self._iter_upstream(prompt, keywords, parameters, limit)) as pages:
+            async for page in pages:
+                documents.extend(page)
+                # 取满上限即视为完整结果，在交出最后一页前写入（调用方取满后会直接停止迭代）
+                if len(documents) >= max_results:
+                    await self._cache.set(_CACHE_NAMESPACE, key, documents)
+                    stored = True
+                yield page
+        # 提前中断或超时的部分结果不会走到这里，也就不会被缓存
+        if not stored:
+            await self._cache.set(_CACHE_NAMESPACE, key, documents)
+
+    def cache_key(
+        self,
+        prompt: str,
+        keywords: List[str],
+        parameters: Dict[str, Any],
+        limit: Optional[int] = None,
+    ) -> str:
+        return resolve_query_key(self._source, prompt, keywords, parameters, limit)[0]
+
+    async def _iter_upstream(
+        self,
+        prompt: str,
+        keywords: List[str],
+        parameters: Dict[str, Any],
+        limit: Optional[int],
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        iter_search = getattr(self._source, "iter_search", None)
+        if iter_search is None:
+            documents = await self._source.search(prompt, keywords, parameters)
+            yield documents[:limit] if limit is not None else documents
+            return
+        async with aclosing(iter_search(prompt, keywords, parameters, limit=limit)) as pages:
+            async for page in pages:
+                yield page
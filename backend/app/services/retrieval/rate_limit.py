@@ -0,0 +1,112 @@
+"""Process-wide request rate limiting per retrieval source."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from app.utils.run_stats import RETRIEVAL, record_stat
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket that queues callers in FIFO order instead of rejecting them.
+
+    ``interval_seconds`` is the steady-state spacing between requests and
+    ``burst`` how many requests may go out back to back after an idle period.
+    """
+
+    def __init__(self, name: str, interval_seconds: float, burst: int = 1) -> None:
+        self.name = name
+        self._lock = asyncio.Lock()
+        self.configure(interval_seconds, burst)
+        self._tokens = float(self._burst)
+        self._updated = time.monotonic()
+        self._waiting = 0
+        self._max_waiting = 0
+        self._acquired = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def configure(self, interval_seconds: float, burst: int = 1) -> None:
+        self._interval = max(0.0, float(interval_seconds))
+        self._burst = max(1, int(burst))
+
+    async def acquire(self) -> float:
+        """Wait for a token; returns the seconds spent queued."""
+        started = time.monotonic()
+        self._waiting += 1
+        self._max_waiting = max(self._max_waiting, self._waiting)
+        try:
+            # asyncio.Lock 按到达顺序唤醒等待者，保证各任务公平排队
+            async with self._lock:
+                self._refill()
+                if self._tokens < 1 and self._interval > 0:
+                    await asyncio.sleep((1 - self._tokens) * self._interval)
+                    self._refill()
+                self._tokens = max(0.0, self._tokens - 1)
+        finally:
+            self._waiting -= 1
+
+        waited = time.monotonic() - started
+        self._acquired += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        record_stat(RETRIEVAL, self.name, "rate_limited_requests")
+        record_stat(RETRIEVAL, self.name, "rate_limit_wait_ms", round(waited * 1000, 1))
+        if waited > 0.5:
+            logger.debug("Rate limiter {} delayed request by {:.2f}s", self.name, waited)
+        return waited
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self._interval <= 0:
+            self._tokens = float(self._burst)
+        else:
+            self._tokens = min(float(self._burst), self._tokens + (now - self._updated) / self._interval)
+        self._updated = now
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self._interval,
+            "burst": self._burst,
+            "queue_depth": self._waiting,
+            "max_queue_depth": self._max_waiting,
+            "acquired": self._acquired,
+            "total_wait_seconds": round(self._total_wait, 3),
+            "avg_wait_seconds": round(self._total_wait / self._acquired, 3) if self._acquired else 0.0,
+            "max_wait_seconds": round(self._max_wait, 3),
+        }
+
+
+_limiters: Dict[str, TokenBucketLimiter] = {}
+
+
+def get_rate_limiter(
+    name: str,
+    parameters: Optional[Dict[str, Any]] = None,
+    default_interval: float = 0.0,
+) -> TokenBucketLimiter:
+    """
+    Return the shared limiter of a source, (re)configured from its parameters.
+
+    Recognised parameters: ``rate_limit_interval`` (seconds between requests)
+    and ``rate_limit_burst``.
+    """
+    parameters = parameters or {}
+    interval = float(parameters.get("rate_limit_interval", default_interval))
+    burst = int(parameters.get("rate_limit_burst", 1))
+    limiter = _limiters.get(name)
+    if limiter is None:
+        limiter = TokenBucketLimiter(name, interval, burst)
+        _limiters[name] = limiter
+    else:
+        limiter.configure(interval, burst)
+    return limiter
+
+
+def rate_limiter_metrics() -> Dict[str, Dict[str, Any]]:
+    return {name: limiter.metrics() for name, limiter in _limiters.items()}
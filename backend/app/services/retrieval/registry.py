@@ -7,7 +7,11 @@ from typing import Dict, Type
 from loguru import logger
 
 from app.config import get_settings
+from app.services.retrieval.arxiv_listing_source import ArxivListingRetrievalSource
+from app.services.retrieval.arxiv_local_source import ArxivLocalRetrievalSource
 from app.services.retrieval.arxiv_source import ArxivRetrievalSource
+from app.services.retrieval.cache import CachedRetrievalSource
+from app.services.retrieval.single_flight import SingleFlightSource
 
 
 class RetrievalRegistry:
@@ -15,6 +19,8 @@ class RetrievalRegistry:
 
     _source_classes: Dict[str, Type] = {
         "arxiv": ArxivRetrievalSource,
+        "arxiv_local": ArxivLocalRetrievalSource,
+        "arxiv_listing": ArxivListingRetrievalSource,
     }
 
     def __init__(self) -> None:
@@ -28,12 +34,23 @@ class RetrievalRegistry:
                 continue
             if source_conf.name in self._source_classes:
                 try:
-                    self._instances[source_conf.name] = self._source_classes[source_conf.name]()
+                    source = self._source_classes[source_conf.name](parameters=source_conf.parameters)
+                    if self._use_cache(source, source_conf.parameters):
+                        source = CachedRetrievalSource(source)
+                    if get_settings().retrieval.single_flight:
+                        source = SingleFlightSource(source)
+                    self._instances[source_conf.name] = source
                 except Exception as exc:  # pragma: no cover - log and continue
                     logger.error("Failed to init source {}: {}", source_conf.name, exc)
             else:
                 logger.warning("Skipping unregistered source: {}", source_conf.name)
 
+    def _use_cache(self, source: object, parameters: Dict[str, str]) -> bool:
+        """Sources opt in with ``cacheable = True``; config parameter cache=false opts out."""
+        if not get_settings().retrieval.cache.enabled or not getattr(source, "cacheable", False):
+            return False
+        return str(parameters.get("cache", "true")).strip().lower() not in {"0", "false", "no", "off"}
+
     def get(self, name: str):
         if name not in self._instances:
             raise KeyError(f"Retrieval source '{name}' is not available")
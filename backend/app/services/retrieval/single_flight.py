@@ -0,0 +1,128 @@
+"""Coalesce identical in-flight retrieval queries."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from loguru import logger
+
+from app.services.retrieval.cache import resolve_query_key
+from app.utils.run_stats import RETRIEVAL, collect_stats, merge_stats, record_stat
+
+
+class _Flight:
+    """One upstream query whose pages are broadcast to every waiter."""
+
+    def __init__(self) -> None:
+        self.pages: List[List[Dict[str, Any]]] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+        # 上游请求期间记录的缓存、限流等计数，由每个等待者各自并入所在运行
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self.condition = asyncio.Condition()
+        self.driver: Optional[asyncio.Task] = None
+
+
+class SingleFlightSource:
+    """
+    Share one upstream request between concurrent identical queries.
+
+    Flights are process-wide and keyed like the retrieval cache, so tasks
+    scheduled at the same minute with the same keywords hit the source once.
+    Pages are fanned out as they arrive; a waiter that leaves early (e.g. on
+    its own deadline) does not cancel the flight for the others. Counters
+    recorded while driving the shared request are collected on the flight
+    and reported to every waiter's run when it leaves.
+    """
+
+    _flights: Dict[str, _Flight] = {}
+
+    def __init__(self, source: Any) -> None:
+        self._source = source
+        self.name = source.name
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self._source, item)
+
+    async def search(self, prompt: str, keywords: List[str], parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        documents: List[Dict[str, Any]] = []
+        async for page in self.iter_search(prompt, keywords, parameters):
+            documents.extend(page)
+        return documents
+
+    async def iter_search(
+        self,
+        prompt: str,
+        keywords: List[str],
+        parameters: Dict[str, Any],
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        key, _ = resolve_query_key(self._source, prompt, keywords, parameters, limit)
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.driver = asyncio.create_task(self._drive(key, flight, prompt, keywords, parameters, limit))
+        else:
+            record_stat(RETRIEVAL, self.name, "coalesced")
+            logger.info("Joined in-flight {} query", self.name)
+
+        flight.waiters += 1
+        index = 0
+        try:
+            while True:
+                async with flight.condition:
+                    await flight.condition.wait_for(lambda: index < len(flight.pages) or flight.done)
+                    pages = flight.pages[index:]
+                    done = flight.done
+                for page in pages:
+                    index += 1
+                    yield page
+                if done:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+        finally:
+            merge_stats(RETRIEVAL, flight.stats)
+            flight.waiters -= 1
+            # 所有等待者都离开后，没有必要继续请求上游
+            if flight.waiters == 0 and not flight.done and flight.driver is not None:
+                flight.driver.cancel()
+
+    async def _drive(
+        self,
+        key: str,
+        flight: _Flight,
+        prompt: str,
+        keywords: List[str],
+        parameters: Dict[str, Any],
+        limit: Optional[int],
+    ) -> None:
+        try:
+            # 驱动任务复制的是首个调用者的上下文，计数改记到 flight 上，不只归入那一次运行
+            with collect_stats(RETRIEVAL, flight.stats):
+                iter_search = getattr(self._source, "iter_search", None)
+                if iter_search is None:
+                    documents = await self._source.search(prompt, keywords, parameters)
+                    await self._publish(flight, documents[:limit] if limit is not None else documents)
+                else:
+                    async with aclosing(iter_search(prompt, keywords, parameters, limit=limit)) as pages:
+                        async for page in pages:
+                            await self._publish(flight, page)
+        except asyncio.CancelledError:
+            flight.error = RuntimeError(f"{self.name} query cancelled")
+        except Exception as exc:
+            flight.error = exc
+        finally:
+            self._flights.pop(key, None)
+            async with flight.condition:
+                flight.done = True
+                flight.condition.notify_all()
+
+    async def _publish(self, flight: _Flight, page: List[Dict[str, Any]]) -> None:
+        async with flight.condition:
+            flight.pages.append(page)
+            flight.condition.notify_all()
@@ -73,6 +73,23 @@ class TaskScheduler:
         
         logger.info(f"Scheduled task {task.id} ({task.name}) at {task.run_at_hour:02d}:{task.run_at_minute:02d}")
     
+    def schedule_mirror_harvest(self, cron_expression: str):
+        """
+        Schedule incremental harvesting of the local arXiv mirror.
+        
+        Args:
+            cron_expression: Crontab expression in the scheduler timezone
+        """
+        from app.services.retrieval.arxiv_mirror import harvest_arxiv_mirror
+
+        self.scheduler.add_job(
+            harvest_arxiv_mirror,
+            trigger=CronTrigger.from_crontab(cron_expression, timezone=self.scheduler.timezone),
+            id='arxiv_mirror_harvest',
+            replace_existing=True
+        )
+        logger.info(f"Scheduled arXiv mirror harvest with cron '{cron_expression}'")
+    
     async def remove_task(self, task_id: int):
         """
         Remove a task from the schedule.
@@ -0,0 +1,118 @@
+"""Adaptive per-source fetch sizing from recent selection yield."""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.config import AdaptiveFetchSettings
+from app.db import models
+
+AUTO = "auto"
+DEFAULT_MAX_RESULTS = 50
+
+
+def is_auto(parameters: Dict[str, Any]) -> bool:
+    return str(parameters.get("max_results", "")).strip().lower() == AUTO
+
+
+def plan_fetch_size(
+    source_name: str,
+    runs: List[models.TaskRun],
+    parameters: Dict[str, Any],
+    config: AdaptiveFetchSettings,
+    watermark_at: Optional[datetime] = None,
+    now: Optional[datetime] = None,
+    cap: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Size the next fetch of a ``max_results="auto"`` source.
+
+    The previous size is scaled by observed yield (selected / retrieved)
+    relative to ``target_yield``, by at most ``max_step`` per run, so
+    low-yield tasks shrink towards ``min_results`` and saturated high-yield
+    tasks grow towards ``max_results``. When recent runs returned fewer
+    documents than requested, the size is also capped at the expected new
+    volume (per-day volume times the current watermark gap).
+
+    ``cap`` is the task's per-source document cap (``max_documents_per_source``):
+    no more documents than that are filtered, so the size never exceeds it
+    and a size held down by it is reported with reason ``cap``. Since a
+    capped source always looks saturated, raise the cap to let it grow.
+    """
+    min_results = int(parameters.get("min_results", config.min_results))
+    max_results = int(parameters.get("max_results_cap", config.max_results))
+    if cap is not None:
+        max_results = min(max_results, cap)
+        min_results = min(min_results, max_results)
+    target_yield = float(parameters.get("target_yield", config.target_yield))
+
+    history = _history(source_name, runs, config.history_runs)
+    gap_days = _gap_days(watermark_at, now)
+    if not history:
+        size = _clamp(DEFAULT_MAX_RESULTS, min_results, max_results)
+        reason = "cap" if size == cap and cap < DEFAULT_MAX_RESULTS else "no_history"
+        return {"size": size, "reason": reason, "gap_days": gap_days}
+
+    retrieved = sum(stat["count"] for stat in history)
+    selected = sum(stat["selected"] for stat in history)
+    # 加一平滑，避免少量样本把比例推到 0 或 1
+    yield_rate = (selected + 1) / (retrieved + 2)
+    last_size = int(history[0].get("fetch_size") or DEFAULT_MAX_RESULTS)
+    saturated = any(stat["count"] >= int(stat.get("fetch_size") or DEFAULT_MAX_RESULTS) for stat in history)
+
+    factor = min(config.max_step, max(1 / config.max_step, yield_rate / target_yield))
+    if not saturated:
+        factor = min(factor, 1.0)
+    size = last_size * factor
+    reason = "grow" if factor > 1 else "shrink" if factor < 1 else "hold"
+
+    volume = None
+    if not saturated:
+        per_day = max(stat["count"] / max(stat.get("gap_days") or 1.0, 1.0) for stat in history)
+        volume = per_day * max(gap_days or 1.0, 1.0) * config.headroom
+        if volume < size:
+            size, reason = volume, "volume"
+
+    clamped = _clamp(math.ceil(size), min_results, max_results)
+    if cap is not None and clamped == cap and math.ceil(size) > cap:
+        reason = "cap"
+    return {
+        "size": clamped,
+        "reason": reason,
+        "yield": round(yield_rate, 3),
+        "saturated": saturated,
+        "expected_volume": round(volume, 1) if volume is not None else None,
+        "gap_days": gap_days,
+        "history_runs": len(history),
+    }
+
+
+def _history(source_name: str, runs: List[models.TaskRun], limit: int) -> List[Dict[str, Any]]:
+    """Per-source stats of recent completed runs, newest first."""
+    history: List[Dict[str, Any]] = []
+    for run in runs:
+        if run.status != "completed":
+            continue
+        stat = ((run.run_metadata or {}).get("retrieval") or {}).get(source_name)
+        # 只有记录了选中数的运行才能计算产出率
+        if not stat or stat.get("status") != "ok" or "selected" not in stat:
+            continue
+        history.append(stat)
+        if len(history) >= limit:
+            break
+    return history
+
+
+def _gap_days(watermark_at: Optional[datetime], now: Optional[datetime]) -> Optional[float]:
+    if watermark_at is None:
+        return None
+    now = now or datetime.now(timezone.utc)
+    if watermark_at.tzinfo is None:
+        watermark_at = watermark_at.replace(tzinfo=timezone.utc)
+    return round(max((now - watermark_at).total_seconds() / 86400, 0.0), 2)
+
+
+def _clamp(value: int, low: int, high: int) -> int:
+    return max(low, min(high, value))
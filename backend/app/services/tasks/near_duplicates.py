@@ -0,0 +1,186 @@
+"""MinHash signatures and LSH banding for near-duplicate documents."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.config import NearDuplicateSettings, get_settings
+from app.services.ai.lexical_ranker import tokenize
+
+# 大于 2^32 的素数：哈希值和系数都小于 2^32，a*x+b 不会溢出 uint64
+_PRIME = np.uint64(4294967311)
+_SEED = 20240601
+
+
+def shingles(doc: Dict[str, Any], size: int) -> np.ndarray:
+    """Hashed word ``size``-grams of title and abstract."""
+    tokens = tokenize(f"{doc.get('title') or ''} {doc.get('abstract') or ''}")
+    grams = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    return np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+class MinHasher:
+    """
+    Fixed-seed MinHash, so signatures stay comparable across runs.
+
+    ``bands * rows`` must equal ``num_perm``; two documents become LSH
+    candidates when all rows of any band agree, and are confirmed when the
+    share of equal signature entries (the Jaccard estimate) reaches the
+    threshold.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, shingle_size: int = 3, min_shingles: int = 8) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(_SEED)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.min_shingles = min_shingles
+        self._a = rng.integers(1, 2 ** 32, size=num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, 2 ** 32, size=num_perm, dtype=np.uint64)[:, None]
+
+    def signature(self, doc: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Signature of a document, or None when it is too short to compare reliably."""
+        hashed = shingles(doc, self.shingle_size)
+        if len(hashed) < self.min_shingles:
+            return None
+        return ((self._a * hashed[None, :] + self._b) % _PRIME).min(axis=1).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+
+class LSHIndex:
+    """Banded buckets over a signature matrix, one row per stored item."""
+
+    def __init__(self, hasher: MinHasher, signatures: np.ndarray) -> None:
+        self._hasher = hasher
+        self.signatures = signatures
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+        for position, signature in enumerate(signatures):
+            for key in hasher.band_keys(signature):
+                self._buckets[key].append(position)
+
+    def query(self, signature: np.ndarray, threshold: float) -> List[Tuple[int, float]]:
+        """Stored rows similar to ``signature``, most similar first."""
+        candidates = {position for key in self._hasher.band_keys(signature) for position in self._buckets.get(key, ())}
+        if not candidates:
+            return []
+        positions = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (self.signatures[positions] == signature).mean(axis=1)
+        keep = similarity >= threshold
+        order = np.argsort(-similarity[keep], kind="stable")
+        return [(int(p), float(s)) for p, s in zip(positions[keep][order], similarity[keep][order])]
+
+
+def group_near_duplicates(hasher: MinHasher, signatures: List[Optional[np.ndarray]], threshold: float) -> List[int]:
+    """
+    Group id per item: the position of the first item of its near-duplicate group.
+
+    Items without a signature form groups of their own.
+    """
+    parent = list(range(len(signatures)))
+
+    def find(item: int) -> int:
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    present = [position for position, signature in enumerate(signatures) if signature is not None]
+    if len(present) > 1:
+        index = LSHIndex(hasher, np.stack([signatures[position] for position in present]))
+        for local, position in enumerate(present):
+            for other, _ in index.query(signatures[position], threshold):
+                if other != local:
+                    first, second = find(position), find(present[other])
+                    # 以最早出现的文献为组代表，保证结果与来源顺序一致
+                    parent[max(first, second)] = min(first, second)
+    return [find(position) for position in range(len(signatures))]
+
+
+@dataclass
+class NearDuplicatePlan:
+    """How the documents of one run are split by the near-duplicate stage."""
+
+    # 仍需送入筛选的文献（组代表和无重复的文献）
+    representatives: Dict[str, List[Dict[str, Any]]]
+    # 与任务历史文献近似重复、直接沿用其结论的文献
+    inherited: Dict[str, Dict[str, Dict[str, Any]]] = field(default_factory=dict)
+    # 同一次运行内的跟随者：external_id -> (文献, (代表来源, 代表 external_id))
+    followers: Dict[str, Dict[str, Tuple[Dict[str, Any], Tuple[str, str]]]] = field(default_factory=dict)
+    signatures: Dict[Tuple[str, str], np.ndarray] = field(default_factory=dict)
+
+
+class SignatureIndexStore:
+    """
+    Per-task MinHash signatures of stored documents, one ``.npz`` per task.
+
+    Rows are keyed by document id, so new runs are matched against every
+    paper the task has seen, not only the current retrieval.
+    """
+
+    def __init__(self, config: NearDuplicateSettings) -> None:
+        self.config = config
+        self.hasher = MinHasher(config.num_perm, config.bands, config.shingle_size, config.min_shingles)
+        self._root = Path(config.path)
+
+    async def load(self, task_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(document ids, signature matrix) of a task; empty when nothing is stored."""
+        return await asyncio.to_thread(self._load, task_id)
+
+    async def add(self, task_id: int, entries: Dict[int, np.ndarray]) -> int:
+        """Insert or replace signatures by document id; returns the index size."""
+        return await asyncio.to_thread(self._add, task_id, entries)
+
+    def _path(self, task_id: int) -> Path:
+        return self._root / f"task_{task_id}.npz"
+
+    def _empty(self) -> Tuple[np.ndarray, np.ndarray]:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, self.config.num_perm), dtype=np.uint32)
+
+    def _load(self, task_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        path = self._path(task_id)
+        if not path.exists():
+            return self._empty()
+        try:
+            with np.load(path) as data:
+                ids, signatures = data["ids"], data["signatures"]
+        except Exception as exc:  # pragma: no cover - 文件损坏时重建
+            logger.warning("Failed to load near-duplicate index of task {}: {}", task_id, exc)
+            return self._empty()
+        if signatures.shape[1] != self.config.num_perm:
+            logger.info("Near-duplicate index of task {} uses another signature size, rebuilding", task_id)
+            return self._empty()
+        return ids, signatures
+
+    def _add(self, task_id: int, entries: Dict[int, np.ndarray]) -> int:
+        ids, signatures = self._load(task_id)
+        if not entries:
+            return len(ids)
+        keep = ~np.isin(ids, np.fromiter(entries, dtype=np.int64, count=len(entries)))
+        ids = np.concatenate([ids[keep], np.fromiter(entries, dtype=np.int64, count=len(entries))])
+        signatures = np.concatenate([signatures[keep], np.stack(list(entries.values())).reshape(-1, self.config.num_perm)])
+        self._root.mkdir(parents=True, exist_ok=True)
+        path = self._path(task_id)
+        partial = path.with_suffix(".tmp.npz")
+        np.savez(partial, ids=ids, signatures=signatures)
+        os.replace(partial, path)
+        return len(ids)
+
+
+@lru_cache
+def get_signature_store() -> SignatureIndexStore:
+    return SignatureIndexStore(get_settings().retrieval.near_duplicates)
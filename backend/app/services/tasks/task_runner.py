@@ -2,18 +2,33 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any, Dict, List
+import asyncio
+import time
+from contextlib import aclosing
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.db import models
 from app.db.repositories import DocumentRepository, TaskRepository
-from app.services.ai.filtering_agent import FilteringAgentService
+from app.services.ai.filtering_agent import DEFAULT_MAX_DOCS_PER_SOURCE, FilteringAgentService, get_filtering_service
 from app.services.ai.keyword_extraction_service import KeywordExtractionService
+from app.services.ai.prefilter import Prefilter
+from app.services.ai.relevance_model import RelevanceModel, get_relevance_store, training_example
+from app.services.ai.verdict_cache import document_fingerprint, verdict_scope
 from app.services.retrieval.registry import RetrievalRegistry
+from app.services.tasks.fetch_sizing import is_auto, plan_fetch_size
+from app.services.tasks.near_duplicates import LSHIndex, NearDuplicatePlan, get_signature_store, group_near_duplicates
 from app.services.mcp import mcp_server, EmailTool, FeishuTool
+from app.utils.identity import arxiv_version, dedupe_documents, document_identity_keys
+from app.utils.run_stats import FILTERING, RETRIEVAL, collect_stats, record_stat
+
+
+# 记录结论来源的 extra_metadata 键，随每次结论整体更新
+VERDICT_STAMP_KEYS = ("filter_scope", "content_hash", "prescreen", "prefilter")
 
 
 class TaskRunner:
@@ -27,7 +42,7 @@ class TaskRunner:
     ) -> None:
         self._retrieval = retrieval_registry or RetrievalRegistry()
         self._keywords = keyword_service or KeywordExtractionService()
-        self._filtering = filtering_service or FilteringAgentService()
+        self._filtering = filtering_service or get_filtering_service()
 
         # Initialize MCP tools
         self._init_mcp_tools()
@@ -44,6 +59,7 @@ class TaskRunner:
     async def run_with_existing_run(self, session: AsyncSession, task: models.Task, run: models.TaskRun) -> None:
         """Execute the task with an existing run record."""
         doc_repo = DocumentRepository(session)
+        task_repo = TaskRepository(session)
         logger.info("Started task '{}' run {}", task.name, run.id)
         try:
             keywords = await self._get_keywords(task)
@@ -51,7 +67,12 @@ class TaskRunner:
             run.run_metadata["keywords"] = keywords
             
             # Retrieve documents (continue even if some sources fail)
-            retrieved_docs = await self._retrieve_documents(task, keywords)
+            watermarks = await task_repo.get_watermarks(task.id)
+            fetch_plans = await self._plan_fetch_sizes(task_repo, task, watermarks)
+            retrieval_stats: Dict[str, Dict[str, Any]] = {}
+            with collect_stats(RETRIEVAL, retrieval_stats):
+                retrieved_docs = await self._retrieve_documents(task, keywords, watermarks, retrieval_stats, fetch_plans)
+            run.run_metadata["retrieval"] = retrieval_stats
             run.retrieved_count = sum(len(items) for items in retrieved_docs.values())
             
             if run.retrieved_count == 0:
@@ -62,12 +83,59 @@ class TaskRunner:
                 await session.flush()
                 return
             
+            # 跨版本、跨来源去重后再筛选，避免同一篇文献被重复打分
+            unique_docs, dedup_stats = dedupe_documents(retrieved_docs)
+            run.run_metadata["dedup"] = dedup_stats
+            if dedup_stats["duplicates"]:
+                logger.info("Task {}: collapsed {} duplicate documents before filtering", task.id, dedup_stats["duplicates"])
+            
             # Filter documents
-            filtered_docs = await self._filter_documents(task, keywords, retrieved_docs)
+            filter_stats: Dict[str, Dict[str, Any]] = {}
+            with collect_stats(FILTERING, filter_stats):
+                carried: Dict[str, Dict[str, Dict[str, Any]]] = {}
+                to_filter = unique_docs
+                prefilter = Prefilter.compile((task.filter_config or {}).get("prefilter"))
+                if prefilter is not None:
+                    # 规则预筛选：未通过确定性规则的文献直接判为不相关，不进入任何模型调用
+                    carried, to_filter, run.run_metadata["prefilter"] = self._apply_prefilter(prefilter, keywords, unique_docs)
+                if (task.filter_config or {}).get("incremental"):
+                    # 增量模式：内容未变且已按当前提示词评估过的文献沿用上次结论
+                    reused, to_filter = await self._carry_forward_scores(doc_repo, task, keywords, to_filter)
+                    carried = self._merge_reused(carried, reused)
+                near_duplicates: Optional[NearDuplicatePlan] = None
+                if (task.filter_config or {}).get("near_duplicates"):
+                    # 近似重复的文献（改标题的预印本、会议与研讨会版本等）只为代表打分
+                    near_duplicates = await self._plan_near_duplicates(doc_repo, task, keywords, to_filter, unique_docs)
+                    to_filter = near_duplicates.representatives
+                    carried = self._merge_reused(carried, near_duplicates.inherited)
+                filtered_docs = await self._filter_documents(task, keywords, to_filter)
+                if near_duplicates is not None:
+                    carried = self._merge_reused(carried, self._follow_representatives(near_duplicates, filtered_docs))
+                if carried:
+                    filtered_docs = self._merge_carried(unique_docs, carried, filtered_docs)
+            run.run_metadata["filtering"] = filter_stats
             run.filtered_count = sum(len(items) for items in filtered_docs.values())
             
+            # 记录各来源选中数，供下次自适应检索量参考
+            for source_name, docs in filtered_docs.items():
+                retrieval_stats.setdefault(source_name, {})["selected"] = sum(1 for doc in docs if doc.get("is_selected", False))
+            run.run_metadata["retrieval"] = retrieval_stats
+            
             # Persist documents - 保存所有文档
             await self._persist_documents(session, doc_repo, run, filtered_docs)
+            await self._advance_watermarks(task_repo, task, retrieved_docs, retrieval_stats)
+            if near_duplicates is not None:
+                try:
+                    run.run_metadata["near_duplicates"] = await self._index_signatures(doc_repo, task, near_duplicates, unique_docs)
+                except Exception as exc:
+                    logger.error("Failed to update near-duplicate index for task {}: {}", task.id, exc)
+
+            if (task.filter_config or {}).get("relevance_prescreen"):
+                # 模型训练失败不影响本次运行结果
+                try:
+                    run.run_metadata["relevance_model"] = await self._train_relevance_model(doc_repo, task, filtered_docs, carried)
+                except Exception as exc:
+                    logger.error("Failed to update relevance model for task {}: {}", task.id, exc)
             
             # 只使用被选中的文档进行摘要生成和通知
             selected_docs = {}
@@ -100,6 +168,33 @@ class TaskRunner:
             run.finished_at = datetime.utcnow()
             await session.flush()
 
+    async def explain_retrieval(self, session: AsyncSession, task: models.Task) -> Dict[str, Any]:
+        """Report the upstream query each task source would issue on the next run."""
+        task_repo = TaskRepository(session)
+        keywords = await self._get_keywords(task)
+        watermarks = await task_repo.get_watermarks(task.id)
+        fetch_plans = await self._plan_fetch_sizes(task_repo, task, watermarks)
+        limit = self._document_cap(task)
+        plans: Dict[str, Any] = {}
+        for task_source in task.sources:
+            source_name = task_source.source.name
+            try:
+                source = self._retrieval.get(source_name)
+            except KeyError as exc:
+                plans[source_name] = {"error": str(exc)}
+                continue
+            parameters = self._with_watermark(task_source.parameters or {}, watermarks.get(source_name))
+            if source_name in fetch_plans:
+                parameters["max_results"] = fetch_plans[source_name]["size"]
+            describe = getattr(source, "describe_query", None)
+            if describe is None:
+                plans[source_name] = {"parameters": parameters, "max_results": limit}
+            else:
+                plans[source_name] = describe(task.prompt, keywords, parameters, limit)
+            if source_name in fetch_plans:
+                plans[source_name]["fetch_plan"] = fetch_plans[source_name]
+        return {"keywords": keywords, "document_cap": limit, "sources": plans}
+
     async def _get_keywords(self, task: models.Task) -> List[str]:
         """获取任务关键词（用户定义的关键词）"""
         user_keywords = [kw.keyword for kw in task.keywords if kw.is_user_defined]
@@ -110,20 +205,203 @@ class TaskRunner:
         self,
         task: models.Task,
         keywords: List[str],
+        watermarks: Optional[Dict[str, models.RetrievalWatermark]] = None,
+        stats: Optional[Dict[str, Dict[str, Any]]] = None,
+        fetch_plans: Optional[Dict[str, Dict[str, Any]]] = None,
     ) -> Dict[str, List[Dict[str, Any]]]:
-        documents: Dict[str, List[Dict[str, Any]]] = {}
-        for task_source in task.sources:
+        """Query all task sources concurrently, each under its own deadline."""
+        limit = self._document_cap(task)
+        watermarks = watermarks or {}
+        stats = stats if stats is not None else {}
+        fetch_plans = fetch_plans or {}
+        results = await asyncio.gather(
+            *(
+                self._retrieve_from_source(
+                    task, task_source, keywords, watermarks, limit, stats, fetch_plans.get(task_source.source.name)
+                )
+                for task_source in task.sources
+            )
+        )
+        return {task_source.source.name: docs for task_source, docs in zip(task.sources, results)}
+
+    async def _retrieve_from_source(
+        self,
+        task: models.Task,
+        task_source: models.TaskSource,
+        keywords: List[str],
+        watermarks: Dict[str, models.RetrievalWatermark],
+        limit: Optional[int],
+        stats: Dict[str, Dict[str, Any]],
+        fetch_plan: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Retrieve from one source; failures yield [] and timeouts keep the pages already fetched."""
+        source_name = task_source.source.name
+        parameters = task_source.parameters or {}
+        timeout = float(parameters.get("timeout") or get_settings().retrieval.source_timeout_seconds)
+        docs: List[Dict[str, Any]] = []
+        status = "ok"
+        error = None
+        requested: Optional[int] = limit
+        started = time.perf_counter()
+        try:
+            source = self._retrieval.get(source_name)
+            parameters = self._with_watermark(parameters, watermarks.get(source_name))
+            if fetch_plan is not None:
+                parameters["max_results"] = fetch_plan["size"]
+            describe = getattr(source, "describe_query", None)
+            if describe is not None:
+                requested = describe(task.prompt, keywords, parameters, limit).get("max_results", limit)
+            await asyncio.wait_for(
+                self._collect_documents(source, task.prompt, keywords, parameters, limit, docs),
+                timeout=timeout,
+            )
+            logger.info("Retrieved {} documents from {}", len(docs), source_name)
+        except asyncio.TimeoutError:
+            status = "timeout"
+            logger.warning("Retrieval from {} timed out after {}s, keeping {} documents", source_name, timeout, len(docs))
+        except Exception as exc:
+            status = "error"
+            error = str(exc)
+            logger.error("Failed to retrieve from {}: {}", source_name, exc)
+            # Continue with other sources even if one fails
+            docs = []
+        stats.setdefault(source_name, {}).update(
+            {
+                "status": status,
+                "count": len(docs),
+                "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+                # 取满上限或超时的检索可能漏掉更早的文献，水位线不能越过它们
+                "complete": status == "ok" and (requested is None or len(docs) < requested),
+            }
+        )
+        if error:
+            stats[source_name]["error"] = error
+        if fetch_plan is not None:
+            # 检索量已按筛选上限计算，下次据此判断是否取满
+            stats[source_name]["fetch_size"] = fetch_plan["size"]
+            stats[source_name]["gap_days"] = fetch_plan.get("gap_days")
+            stats[source_name]["fetch_plan"] = fetch_plan
+        return docs
+
+    def _with_watermark(
+        self,
+        parameters: Dict[str, Any],
+        watermark: Optional[models.RetrievalWatermark],
+    ) -> Dict[str, Any]:
+        """增量检索：把上次检索到的最新时间作为 since 传给数据源"""
+        parameters = dict(parameters or {})
+        if watermark is None or not _as_bool(parameters.get("incremental", True)):
+            return parameters
+        if parameters.get("sort_by") == "lastUpdatedDate":
+            since = watermark.last_updated_at or watermark.last_published_at
+        else:
+            since = watermark.last_published_at
+        if since is not None:
+            parameters["since"] = since
+        return parameters
+
+    async def _advance_watermarks(
+        self,
+        task_repo: TaskRepository,
+        task: models.Task,
+        documents: Dict[str, List[Dict[str, Any]]],
+        stats: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> None:
+        """
+        Move each source's watermark past the documents it returned.
+
+        Only a complete fetch (no error or timeout, fewer documents than
+        requested) advances to the newest timestamp seen. A fetch cut off by
+        its cap or deadline may have skipped documents older than what it
+        returned, so the watermark moves only to the oldest one fetched and
+        the next run queries that range again.
+        """
+        stats = stats or {}
+        for source_name, docs in documents.items():
+            published = [doc["published_at"] for doc in docs if isinstance(doc.get("published_at"), datetime)]
+            updated = []
+            for doc in docs:
+                raw_updated = (doc.get("extra") or {}).get("updated")
+                if raw_updated:
+                    try:
+                        updated.append(datetime.fromisoformat(str(raw_updated).replace("Z", "+00:00")))
+                    except ValueError:
+                        continue
+            if not published and not updated:
+                continue
+            bound = max if (stats.get(source_name) or {}).get("complete", True) else min
+            await task_repo.advance_watermark(
+                task.id,
+                source_name,
+                published_at=bound(published, default=None, key=_utc_sort_key),
+                updated_at=bound(updated, default=None, key=_utc_sort_key),
+            )
+
+    async def _plan_fetch_sizes(
+        self,
+        task_repo: TaskRepository,
+        task: models.Task,
+        watermarks: Dict[str, models.RetrievalWatermark],
+    ) -> Dict[str, Dict[str, Any]]:
+        """max_results=auto 的来源根据近期选中率和水位线间隔决定本次检索量"""
+        auto_sources = [ts for ts in task.sources if is_auto(ts.parameters or {})]
+        if not auto_sources:
+            return {}
+        config = get_settings().retrieval.adaptive_fetch
+        runs = await task_repo.list_runs(task.id, limit=config.history_runs * 3)
+        cap = self._document_cap(task)
+        plans: Dict[str, Dict[str, Any]] = {}
+        for task_source in auto_sources:
             source_name = task_source.source.name
-            try:
-                source = self._retrieval.get(source_name)
-                docs = await source.search(task.prompt, keywords, task_source.parameters)
-                documents[source_name] = docs
-                logger.info("Retrieved {} documents from {}", len(docs), source_name)
-            except Exception as exc:
-                logger.error("Failed to retrieve from {}: {}", source_name, exc)
-                # Continue with other sources even if one fails
-                documents[source_name] = []
-        return documents
+            watermark = watermarks.get(source_name)
+            plans[source_name] = plan_fetch_size(
+                source_name,
+                runs,
+                task_source.parameters or {},
+                config,
+                watermark_at=watermark.last_published_at if watermark else None,
+                cap=cap,
+            )
+            logger.info("Task {} source {}: adaptive fetch size {}", task.id, source_name, plans[source_name])
+        return plans
+
+    def _document_cap(self, task: models.Task) -> Optional[int]:
+        """每个来源实际会进入筛选的文献上限，检索时下推给数据源"""
+        filter_config = task.filter_config or {}
+        if not filter_config.get("enabled", True):
+            return None
+        return int(filter_config.get("max_documents_per_source", DEFAULT_MAX_DOCS_PER_SOURCE))
+
+    async def _collect_documents(
+        self,
+        source: Any,
+        prompt: str,
+        keywords: List[str],
+        parameters: Dict[str, Any],
+        limit: Optional[int],
+        docs: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Consume a source page by page, stopping as soon as ``limit`` is reached.
+
+        Pages are appended to ``docs`` as they arrive, so a caller that cancels
+        the collection still sees everything fetched so far.
+        """
+        docs = docs if docs is not None else []
+        iter_search = getattr(source, "iter_search", None)
+        if iter_search is None:
+            results = await source.search(prompt, keywords, parameters)
+            docs.extend(results[:limit] if limit is not None else results)
+            return docs
+
+        async with aclosing(iter_search(prompt, keywords, parameters, limit=limit)) as pages:
+            async for page in pages:
+                if limit is not None:
+                    page = page[: limit - len(docs)]
+                docs.extend(page)
+                if limit is not None and len(docs) >= limit:
+                    break
+        return docs
 
     async def _filter_documents(
         self,
@@ -132,49 +410,387 @@ class TaskRunner:
         documents: Dict[str, List[Dict[str, Any]]],
     ) -> Dict[str, List[Dict[str, Any]]]:
         """筛选文档，但保留所有文档（包括未选中的），以便完整记录"""
-        all_filtered: Dict[str, List[Dict[str, Any]]] = {}
+        # 各来源并发筛选，LLM 调用总量由提供商并发限额约束
+        results = await asyncio.gather(
+            *(self._filter_source(task, keywords, source_name, docs) for source_name, docs in documents.items())
+        )
+        return dict(zip(documents.keys(), results))
+
+    async def _filter_source(
+        self,
+        task: models.Task,
+        keywords: List[str],
+        source_name: str,
+        docs: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        context = self._filter_context(task, keywords, source_name)
+        scope = verdict_scope("fine", context, task.filter_config or {})
         
-        for source_name, docs in documents.items():
-            context = {
-                "prompt": task.prompt,
-                "keywords": keywords,
-                "source": source_name,
-                "filter_config": task.filter_config,
-                "ai_config": task.ai_config,
-            }
-            
-            # 调用AI筛选服务
-            filter_results = await self._filtering.filter_documents(context, docs)
-            
-            logger.info(f"Filter results for {source_name}: {len(filter_results)} results returned for {len(docs)} documents")
+        # 调用AI筛选服务
+        filter_results = await self._filtering.filter_documents(context, docs)
+        
+        logger.info(f"Filter results for {source_name}: {len(filter_results)} results returned for {len(docs)} documents")
+        
+        # 合并原始文档和筛选结果
+        enhanced_docs = []
+        matched_count = 0
+        for doc in docs:
+            match = next((item for item in filter_results if item.get("external_id") == doc.get("external_id")), None)
+            if match:
+                # 合并筛选结果到原文档
+                doc = {**doc, **match}
+                matched_count += 1
+            else:
+                # 如果没有匹配结果，标记为未选中
+                logger.warning(f"No filter result for document: {doc.get('external_id')} - {doc.get('title', 'Unknown')[:50]}")
+                doc["is_selected"] = False
+                doc["score"] = 0.0
+                doc["summary"] = doc.get("abstract", "")[:200] if doc.get("abstract") else "无摘要"
+                doc["highlights"] = []
+                doc["fallback"] = True
             
-            # 合并原始文档和筛选结果
-            enhanced_docs = []
-            matched_count = 0
+            if doc.get("prescreen"):
+                # 本地模型直接判定的结论不参与增量复用，也不回流训练
+                doc["extra"] = {**(doc.get("extra") or {}), "prescreen": doc["prescreen"]}
+            elif not doc.get("fallback"):
+                # 记录给出结论时的提示词与模型，增量模式据此判断结论是否仍然有效
+                doc["extra"] = {**(doc.get("extra") or {}), "filter_scope": scope, "content_hash": document_fingerprint(doc)}
+            doc.setdefault("user_keywords", keywords)
+            enhanced_docs.append(doc)
+        
+        # 记录筛选统计
+        selected_count = sum(1 for d in enhanced_docs if d.get("is_selected", False))
+        logger.info(f"Filtered {source_name}: {selected_count}/{len(enhanced_docs)} documents selected (matched: {matched_count})")
+        return enhanced_docs
+
+    def _filter_context(self, task: models.Task, keywords: List[str], source_name: str) -> Dict[str, Any]:
+        return {
+            "prompt": task.prompt,
+            "keywords": keywords,
+            "source": source_name,
+            "task_id": task.id,
+            "filter_config": task.filter_config,
+            "ai_config": task.ai_config,
+        }
+
+    @staticmethod
+    def _apply_prefilter(
+        prefilter: Prefilter,
+        keywords: List[str],
+        documents: Dict[str, List[Dict[str, Any]]],
+    ) -> Tuple[Dict[str, Dict[str, Dict[str, Any]]], Dict[str, List[Dict[str, Any]]], Dict[str, Dict[str, Any]]]:
+        """
+        Reject documents failing the task's prefilter rules.
+
+        Rejected documents are persisted like any other verdict, marked with
+        the first rule they failed and without a filter scope, so a later
+        run with other rules evaluates them again.
+        """
+        rejected: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        remaining: Dict[str, List[Dict[str, Any]]] = {}
+        stats: Dict[str, Dict[str, Any]] = {}
+        for source_name, docs in documents.items():
+            keep, drops, failed = prefilter.apply(docs)
+            remaining[source_name] = [doc for doc, passed in zip(docs, keep) if passed]
+            for doc, rule in zip(docs, failed):
+                if rule is None:
+                    continue
+                rejected.setdefault(source_name, {})[doc.get("external_id")] = {
+                    **doc,
+                    "is_selected": False,
+                    "score": 0.0,
+                    "summary": "",
+                    "highlights": [],
+                    "extra": {**(doc.get("extra") or {}), "prefilter": rule},
+                    "user_keywords": keywords,
+                }
+            stats[source_name] = {"checked": len(docs), "dropped": keep.count(False), "rules": drops}
+            if stats[source_name]["dropped"]:
+                logger.info("Source '{}': prefilter rejected {} of {} documents", source_name, stats[source_name]["dropped"], len(docs))
+        return rejected, remaining, stats
+
+    async def _carry_forward_scores(
+        self,
+        doc_repo: DocumentRepository,
+        task: models.Task,
+        keywords: List[str],
+        documents: Dict[str, List[Dict[str, Any]]],
+    ) -> Tuple[Dict[str, Dict[str, Dict[str, Any]]], Dict[str, List[Dict[str, Any]]]]:
+        """
+        Split retrieved documents into already-scored ones and ones that need the filter.
+
+        A stored document is reused when its verdict was produced under the
+        current filter scope (prompt, keywords, model, threshold) for the
+        same content fingerprint. Reused documents carry their stored
+        score, selection and summary forward.
+        """
+        canonical_index = await doc_repo.get_canonical_index(task.id)
+        matches: Dict[Tuple[str, int], int] = {}
+        for source_name, docs in documents.items():
+            for position, doc in enumerate(docs):
+                identity = document_identity_keys(doc, source_name)
+                existing_id = next((canonical_index[key] for key in identity if key in canonical_index), None)
+                if existing_id is not None:
+                    matches[(source_name, position)] = existing_id
+        rows = {row.id: row for row in await doc_repo.get_documents_by_ids(list(set(matches.values())))} if matches else {}
+
+        carried: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        remaining: Dict[str, List[Dict[str, Any]]] = {}
+        for source_name, docs in documents.items():
+            scope = verdict_scope("fine", self._filter_context(task, keywords, source_name), task.filter_config or {})
+            remaining[source_name] = []
+            for position, doc in enumerate(docs):
+                row = rows.get(matches.get((source_name, position)))
+                if row is None or not self._is_unchanged(row, doc, scope):
+                    remaining[source_name].append(doc)
+                    continue
+                carried.setdefault(source_name, {})[doc.get("external_id")] = self._stored_verdict(doc, row, scope, keywords)
+            count = len(carried.get(source_name, {}))
+            if count:
+                record_stat(FILTERING, source_name, "carried_forward", count)
+                logger.info("Source '{}': {} unchanged documents reuse stored scores", source_name, count)
+        return carried, remaining
+
+    @staticmethod
+    def _stored_verdict(
+        doc: Dict[str, Any],
+        row: models.Document,
+        scope: str,
+        keywords: List[str],
+        **extra: Any,
+    ) -> Dict[str, Any]:
+        """``doc`` carrying the stored score, selection and summary of ``row``."""
+        return {
+            **doc,
+            "is_selected": bool(row.is_filtered_in),
+            "score": row.rank_score or 0.0,
+            "summary": row.summary.summary if row.summary else "",
+            "highlights": list(row.summary.highlights or []) if row.summary else [],
+            "extra": {**(doc.get("extra") or {}), "filter_scope": scope, "content_hash": document_fingerprint(doc), **extra},
+            "user_keywords": keywords,
+        }
+
+    async def _plan_near_duplicates(
+        self,
+        doc_repo: DocumentRepository,
+        task: models.Task,
+        keywords: List[str],
+        documents: Dict[str, List[Dict[str, Any]]],
+        all_documents: Dict[str, List[Dict[str, Any]]],
+    ) -> NearDuplicatePlan:
+        """
+        Group near-duplicates so each group is scored once.
+
+        A document that is a near-duplicate of a paper the task already
+        stored reuses that paper's verdict, provided it was produced under
+        the current filter scope; documents whose own identity is stored are
+        left to incremental mode. The rest are grouped among themselves and
+        only the first member of each group is sent to the filter.
+        """
+        store = get_signature_store()
+        config = store.config
+        hasher = store.hasher
+        signatures = {
+            (source_name, doc.get("external_id")): hasher.signature(doc)
+            for source_name, docs in all_documents.items()
+            for doc in docs
+        }
+        plan = NearDuplicatePlan(representatives={}, signatures=signatures)
+
+        ids, matrix = await store.load(task.id)
+        history = LSHIndex(hasher, matrix) if len(ids) else None
+        candidates: Dict[Tuple[str, str], List[int]] = {}
+        if history is not None:
+            canonical_index = await doc_repo.get_canonical_index(task.id)
+            for source_name, docs in documents.items():
+                for doc in docs:
+                    signature = signatures[(source_name, doc.get("external_id"))]
+                    if signature is None or any(key in canonical_index for key in document_identity_keys(doc, source_name)):
+                        continue
+                    matches = [int(ids[position]) for position, _ in history.query(signature, config.threshold)]
+                    if matches:
+                        candidates[(source_name, doc.get("external_id"))] = matches
+        rows: Dict[int, models.Document] = {}
+        if candidates:
+            row_ids = sorted({row_id for matches in candidates.values() for row_id in matches})
+            rows = {row.id: row for row in await doc_repo.get_documents_by_ids(row_ids)}
+
+        pending: List[Tuple[str, Dict[str, Any]]] = []
+        for source_name, docs in documents.items():
+            scope = verdict_scope("fine", self._filter_context(task, keywords, source_name), task.filter_config or {})
             for doc in docs:
-                match = next((item for item in filter_results if item.get("external_id") == doc.get("external_id")), None)
-                if match:
-                    # 合并筛选结果到原文档
-                    doc = {**doc, **match}
-                    matched_count += 1
+                # 只沿用按当前提示词和模型给出的结论，其余照常筛选
+                row = next(
+                    (
+                        rows[row_id] for row_id in candidates.get((source_name, doc.get("external_id")), [])
+                        if row_id in rows and (rows[row_id].extra_metadata or {}).get("filter_scope") == scope
+                    ),
+                    None,
+                )
+                if row is None:
+                    pending.append((source_name, doc))
                 else:
-                    # 如果没有匹配结果，标记为未选中
-                    logger.warning(f"No filter result for document: {doc.get('external_id')} - {doc.get('title', 'Unknown')[:50]}")
-                    doc["is_selected"] = False
-                    doc["score"] = 0.0
-                    doc["summary"] = doc.get("abstract", "")[:200] if doc.get("abstract") else "无摘要"
-                    doc["highlights"] = []
-                
-                doc.setdefault("user_keywords", keywords)
-                enhanced_docs.append(doc)
-            
-            all_filtered[source_name] = enhanced_docs
-            
-            # 记录筛选统计
-            selected_count = sum(1 for d in enhanced_docs if d.get("is_selected", False))
-            logger.info(f"Filtered {source_name}: {selected_count}/{len(enhanced_docs)} documents selected (matched: {matched_count})")
-        
-        return all_filtered
+                    plan.inherited.setdefault(source_name, {})[doc.get("external_id")] = self._stored_verdict(
+                        doc, row, scope, keywords, near_duplicate_of=row.external_id
+                    )
+
+        groups = group_near_duplicates(
+            hasher, [signatures[(source_name, doc.get("external_id"))] for source_name, doc in pending], config.threshold
+        )
+        plan.representatives = {source_name: [] for source_name in documents}
+        for position, (source_name, doc) in enumerate(pending):
+            leader = groups[position]
+            if leader == position:
+                plan.representatives[source_name].append(doc)
+            else:
+                leader_source, leader_doc = pending[leader]
+                plan.followers.setdefault(source_name, {})[doc.get("external_id")] = (
+                    doc, (leader_source, leader_doc.get("external_id"))
+                )
+
+        inherited = sum(len(items) for items in plan.inherited.values())
+        followers = sum(len(items) for items in plan.followers.values())
+        if inherited or followers:
+            logger.info(
+                "Task {}: {} near-duplicates of stored papers reuse their verdicts, {} more follow a representative in this run",
+                task.id, inherited, followers,
+            )
+        return plan
+
+    @staticmethod
+    def _follow_representatives(
+        plan: NearDuplicatePlan,
+        filtered: Dict[str, List[Dict[str, Any]]],
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Copy each representative's verdict to the rest of its group."""
+        results = {(source_name, doc.get("external_id")): doc for source_name, docs in filtered.items() for doc in docs}
+        followed: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for source_name, members in plan.followers.items():
+            for external_id, (doc, leader) in members.items():
+                verdict = results.get(leader)
+                if verdict is None:
+                    continue
+                leader_extra = verdict.get("extra") or {}
+                extra = {**(doc.get("extra") or {}), "near_duplicate_of": leader[1]}
+                for key in ("filter_scope", "prescreen"):
+                    if key in leader_extra:
+                        extra[key] = leader_extra[key]
+                if "filter_scope" in extra:
+                    extra["content_hash"] = document_fingerprint(doc)
+                followed.setdefault(source_name, {})[external_id] = {
+                    **doc,
+                    **{key: verdict[key] for key in ("is_selected", "score", "summary", "highlights", "fallback", "prescreen") if key in verdict},
+                    "extra": extra,
+                    "user_keywords": verdict.get("user_keywords", doc.get("user_keywords")),
+                }
+        return followed
+
+    async def _index_signatures(
+        self,
+        doc_repo: DocumentRepository,
+        task: models.Task,
+        plan: NearDuplicatePlan,
+        documents: Dict[str, List[Dict[str, Any]]],
+    ) -> Dict[str, int]:
+        """Add this run's documents to the task's signature index, keyed by stored row."""
+        canonical_index = await doc_repo.get_canonical_index(task.id)
+        entries = {}
+        for source_name, docs in documents.items():
+            for doc in docs:
+                signature = plan.signatures.get((source_name, doc.get("external_id")))
+                row_id = next((canonical_index[key] for key in document_identity_keys(doc, source_name) if key in canonical_index), None)
+                if signature is not None and row_id is not None:
+                    entries[row_id] = signature
+        size = await get_signature_store().add(task.id, entries)
+        return {
+            "history_matches": sum(len(items) for items in plan.inherited.values()),
+            "followers": sum(len(items) for items in plan.followers.values()),
+            "index_size": size,
+        }
+
+    @staticmethod
+    def _merge_reused(
+        first: Dict[str, Dict[str, Dict[str, Any]]],
+        second: Dict[str, Dict[str, Dict[str, Any]]],
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        merged = {source_name: dict(items) for source_name, items in first.items()}
+        for source_name, items in second.items():
+            merged.setdefault(source_name, {}).update(items)
+        return merged
+
+    @staticmethod
+    def _is_unchanged(row: models.Document, doc: Dict[str, Any], scope: str) -> bool:
+        # 比较的是上次实际评估时的内容指纹，而非库中字段，同版本内容变化也能识别
+        extra = row.extra_metadata or {}
+        return extra.get("filter_scope") == scope and extra.get("content_hash") == document_fingerprint(doc)
+
+    async def _train_relevance_model(
+        self,
+        doc_repo: DocumentRepository,
+        task: models.Task,
+        filtered_docs: Dict[str, List[Dict[str, Any]]],
+        carried: Dict[str, Dict[str, Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """
+        Update the task's relevance model with this run's verdicts.
+
+        The first update trains on the task's stored LLM verdicts and Zotero
+        exports. Later ones only see the LLM verdicts of this run plus
+        documents exported to Zotero since the last update. Carried-forward,
+        fallback, prescreened and prefiltered documents are skipped, as the
+        model has either seen them already, produced them itself, or they
+        carry no relevance judgement.
+        """
+        store = get_relevance_store()
+        config = store.config
+        model = await store.load(task.id)
+        bootstrap = model is None
+        if model is None:
+            # 首次训练时本次运行的结果已入库，包含在历史中
+            rows = await doc_repo.list_training_documents(task.id)
+            model = RelevanceModel.empty(config.n_features)
+            epochs = config.bootstrap_epochs
+        else:
+            rows = [row for row in await doc_repo.list_training_documents(task.id, exported_only=True) if row.id not in model.zotero_ids]
+            epochs = config.epochs
+        examples = [
+            training_example({"title": row.title, "abstract": row.abstract}, row.is_filtered_in, row.rank_score, bool(row.zotero_key))
+            for row in rows
+        ]
+        model.zotero_ids.update(row.id for row in rows if row.zotero_key)
+        if not bootstrap:
+            for source_name, docs in filtered_docs.items():
+                reused = carried.get(source_name, {})
+                examples.extend(
+                    training_example(doc, doc.get("is_selected", False), doc.get("score"))
+                    for doc in docs
+                    if not (doc.get("fallback") or doc.get("prescreen") or doc.get("external_id") in reused)
+                )
+
+        if examples:
+            documents, labels, weights = zip(*examples)
+            await asyncio.to_thread(model.partial_fit, documents, labels, weights, config, epochs)
+        model.runs += 1
+        await store.save(task.id, model)
+        logger.info("Relevance model of task {}: trained on {} new examples ({} total)", task.id, len(examples), model.examples)
+        return {"trained": len(examples), "examples": model.examples, "positives": model.positives, "ready": model.ready(config)}
+
+    @staticmethod
+    def _merge_carried(
+        documents: Dict[str, List[Dict[str, Any]]],
+        carried: Dict[str, Dict[str, Dict[str, Any]]],
+        filtered: Dict[str, List[Dict[str, Any]]],
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Reassemble per-source lists in retrieval order."""
+        merged: Dict[str, List[Dict[str, Any]]] = {}
+        for source_name, docs in documents.items():
+            reused = carried.get(source_name, {})
+            fresh = iter(filtered.get(source_name, []))
+            merged[source_name] = [
+                reused[doc.get("external_id")] if doc.get("external_id") in reused else next(fresh)
+                for doc in docs
+            ]
+        return merged
 
     async def _persist_documents(
         self,
@@ -187,6 +803,8 @@ class TaskRunner:
         updated_count = 0
         created_count = 0
         selected_count = 0
+        version_count = 0
+        canonical_index = await doc_repo.get_canonical_index(run.task_id)
         
         for source_name, docs in filtered_docs.items():
             for doc in docs:
@@ -194,12 +812,24 @@ class TaskRunner:
                 if is_selected:
                     selected_count += 1
                 
-                # 只在当前任务内查找重复文献
-                existing = await doc_repo.get_by_external(doc["external_id"], source_name, task_id=run.task_id)
+                # 只在当前任务内查找重复文献，按规范化标识匹配（忽略 arXiv 版本号和来源差异）
+                identity = document_identity_keys(doc, source_name)
+                existing_id = next((canonical_index[key] for key in identity if key in canonical_index), None)
+                existing = await doc_repo.get_document(existing_id) if existing_id is not None else None
                 if existing:
+                    if self._apply_new_version(existing, doc):
+                        version_count += 1
                     # Update existing document fields
                     existing.is_filtered_in = is_selected  # 根据is_selected设置
                     existing.rank_score = doc.get("score", 0.0)
+                    # 只写入本次结论带有的标记；旧记录上本次没有的标记要去掉，否则回退结论会沿用上次的 filter_scope
+                    extra = doc.get("extra") or {}
+                    stored = existing.extra_metadata or {}
+                    stamp = {key: extra[key] for key in VERDICT_STAMP_KEYS if extra.get(key) is not None}
+                    updated = {key: value for key, value in stored.items() if key not in VERDICT_STAMP_KEYS or key in stamp}
+                    updated.update(stamp)
+                    if updated != stored:
+                        existing.extra_metadata = updated
                     existing.user_keywords = doc.get("user_keywords", existing.user_keywords)
                     # Also update run_id to link to current run
                     existing.run_id = run.id
@@ -243,6 +873,8 @@ class TaskRunner:
                 )
                 await doc_repo.add_documents([model])
                 created_count += 1
+                for key in identity:
+                    canonical_index.setdefault(key, model.id)
                 
                 if doc.get("summary"):
                     summary = models.DocumentSummary(
@@ -254,8 +886,25 @@ class TaskRunner:
                     await doc_repo.attach_summary(summary)
         
         await session.flush()
-        logger.info("Persisted documents: {} created, {} updated, {} selected as relevant", 
-                   created_count, updated_count, selected_count)
+        logger.info("Persisted documents: {} created, {} updated ({} new versions), {} selected as relevant", 
+                   created_count, updated_count, version_count, selected_count)
+
+    def _apply_new_version(self, existing: models.Document, doc: Dict[str, Any]) -> bool:
+        """arXiv 新版本覆盖已有记录的内容字段，并保留旧版本标识"""
+        if arxiv_version(doc.get("external_id"), doc.get("url")) <= arxiv_version(existing.external_id, existing.url):
+            return False
+        extra = {**(existing.extra_metadata or {}), **(doc.get("extra") or {})}
+        previous = list((existing.extra_metadata or {}).get("previous_versions", []))
+        previous.append(existing.external_id)
+        extra["previous_versions"] = previous
+        logger.info("Document {} updated to new version {}", existing.external_id, doc["external_id"])
+        existing.external_id = doc["external_id"]
+        existing.url = doc.get("url") or existing.url
+        existing.title = doc.get("title") or existing.title
+        existing.abstract = doc.get("abstract") or existing.abstract
+        existing.authors = doc.get("authors") or existing.authors
+        existing.extra_metadata = extra
+        return True
 
     async def _send_notifications(
         self,
@@ -413,3 +1062,13 @@ class TaskRunner:
         mcp_server.register_tool(feishu_tool)
         
         logger.info("MCP tools initialized and registered")
+
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() not in {"", "0", "false", "no", "off"}
+    return bool(value)
+
+
+def _utc_sort_key(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
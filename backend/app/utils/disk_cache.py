@@ -0,0 +1,159 @@
+"""Small persistent key/value cache backed by SQLite."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode(obj: dict) -> Any:
+    if len(obj) == 1 and "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+class DiskCache:
+    """
+    JSON value cache with TTL expiry and least-recently-used eviction.
+
+    Entries live in a standalone SQLite file, independent of the main
+    database, so the cache survives restarts and can be deleted at will.
+    Blocking SQLite calls run in a worker thread.
+    """
+
+    def __init__(self, path: str | Path, ttl_seconds: float, max_entries: int) -> None:
+        self._path = Path(path)
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed ON cache_entries(namespace, accessed_at)")
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self._get, namespace, key)
+
+    async def set(self, namespace: str, key: str, value: Any) -> None:
+        await asyncio.to_thread(self._set, namespace, key, value)
+
+    async def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Any]:
+        """Look up several keys in one round trip; missing or expired keys are omitted."""
+        return await asyncio.to_thread(self._get_many, namespace, keys)
+
+    async def set_many(self, namespace: str, items: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._set_many, namespace, items)
+
+    async def clear(self, namespace: Optional[str] = None) -> None:
+        await asyncio.to_thread(self._clear, namespace)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self._path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _get(self, namespace: str, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self._ttl:
+                conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+                return None
+            conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, namespace, key),
+            )
+        return json.loads(value, object_hook=_decode)
+
+    def _get_many(self, namespace: str, keys: List[str]) -> Dict[str, Any]:
+        now = time.time()
+        found: Dict[str, Any] = {}
+        with self._lock, self._connect() as conn:
+            # 分块查询，避免超过 SQLite 的参数个数上限
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, value, created_at FROM cache_entries WHERE namespace = ? AND key IN ({placeholders})",
+                    (namespace, *chunk),
+                ).fetchall()
+                fresh = [(key, value) for key, value, created_at in rows if now - created_at <= self._ttl]
+                for key, value in fresh:
+                    found[key] = json.loads(value, object_hook=_decode)
+                conn.executemany(
+                    "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    [(now, namespace, key) for key, _ in fresh],
+                )
+        return found
+
+    def _set(self, namespace: str, key: str, value: Any) -> None:
+        self._set_many(namespace, {key: value})
+
+    def _set_many(self, namespace: str, items: Dict[str, Any]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = [
+            (namespace, key, json.dumps(value, default=_encode, ensure_ascii=False), now, now)
+            for key, value in items.items()
+        ]
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            # 先清理过期条目，再按最近访问时间淘汰超出容量的部分
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND created_at < ?",
+                (namespace, now - self._ttl),
+            )
+            conn.execute(
+                """
+                DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                    SELECT key FROM cache_entries WHERE namespace = ?
+                    ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (namespace, namespace, self._max_entries),
+            )
+
+    def _clear(self, namespace: Optional[str]) -> None:
+        with self._lock, self._connect() as conn:
+            if namespace is None:
+                conn.execute("DELETE FROM cache_entries")
+            else:
+                conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
@@ -0,0 +1,163 @@
+"""Canonical document identity across arXiv versions, DOIs and URLs."""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# 新式编号 2301.12345v2，旧式编号 hep-th/9901001v1 / math.AG/0601001
+_ARXIV_NEW = re.compile(r"(?<!\d)(?<!\d\.)(\d{4}\.\d{4,5})(?:v(\d+))?(?![\d])")
+_ARXIV_OLD = re.compile(r"(?<![\w-])([a-z][a-z-]*(?:\.[A-Z]{2})?/\d{7})(?:v(\d+))?(?!\d)")
+_ARXIV_HINT = re.compile(r"arxiv", re.IGNORECASE)
+_BARE_ARXIV = re.compile(r"^(?:\d{4}\.\d{4,5}|[a-z][a-z-]*(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?$")
+_DOI = re.compile(r"10\.\d{4,9}/[^\s\"<>]+", re.IGNORECASE)
+_ARXIV_DOI_PREFIX = "10.48550/arxiv."
+_TRACKING_PARAMS = {"fbclid", "gclid", "ref"}
+
+
+def parse_arxiv_id(value: Optional[str]) -> Optional[Tuple[str, Optional[int]]]:
+    """Return ``(versionless id, version)`` for arXiv URLs, OAI ids, DOIs or bare ids."""
+    if not value:
+        return None
+    text = str(value).strip()
+    if not (_ARXIV_HINT.search(text) or _BARE_ARXIV.match(text)):
+        return None
+    for pattern in (_ARXIV_NEW, _ARXIV_OLD):
+        match = pattern.search(text)
+        if match:
+            return match.group(1), int(match.group(2)) if match.group(2) else None
+    return None
+
+
+def normalize_doi(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    match = _DOI.search(str(value))
+    if not match:
+        return None
+    return match.group(0).rstrip(".,;)").lower()
+
+
+def normalize_url(value: Optional[str]) -> Optional[str]:
+    """Lower-case host, drop ``www.``, fragments, trailing slashes and tracking parameters."""
+    if not value:
+        return None
+    parts = urlsplit(str(value).strip())
+    if not parts.netloc:
+        return None
+    host = parts.netloc.lower()
+    host = host[4:] if host.startswith("www.") else host
+    query = [
+        (key, val)
+        for key, val in parse_qsl(parts.query, keep_blank_values=True)
+        if not (key.lower().startswith("utm_") or key.lower() in _TRACKING_PARAMS)
+    ]
+    normalized = f"{host}{parts.path.rstrip('/') or '/'}"
+    if query:
+        normalized += "?" + urlencode(sorted(query))
+    return normalized
+
+
+def identity_keys(
+    external_id: Optional[str],
+    url: Optional[str] = None,
+    doi: Optional[str] = None,
+    source_name: Optional[str] = None,
+) -> List[str]:
+    """
+    All identities of a document, strongest first.
+
+    The first key is the canonical id: ``arxiv:<id>`` when any field points at
+    an arXiv paper, then ``doi:<doi>``, then ``url:<normalized url>``, and
+    finally the raw ``<source>:<external_id>``.
+    """
+    keys: List[str] = []
+    for candidate in (external_id, url, doi):
+        parsed = parse_arxiv_id(candidate)
+        if parsed:
+            keys.append(f"arxiv:{parsed[0]}")
+            break
+    for candidate in (doi, external_id, url):
+        normalized = normalize_doi(candidate) if candidate and ("10." in str(candidate)) else None
+        if normalized:
+            if normalized.startswith(_ARXIV_DOI_PREFIX):
+                keys.append(f"arxiv:{normalized[len(_ARXIV_DOI_PREFIX):]}")
+            keys.append(f"doi:{normalized}")
+            break
+    for candidate in (url, external_id):
+        normalized = normalize_url(candidate)
+        if normalized:
+            keys.append(f"url:{normalized}")
+            break
+    if external_id:
+        keys.append(f"{source_name or 'unknown'}:{external_id}")
+    return list(dict.fromkeys(keys))
+
+
+def document_identity_keys(doc: Dict[str, Any], source_name: Optional[str] = None) -> List[str]:
+    extra = doc.get("extra") or doc.get("extra_metadata") or {}
+    return identity_keys(doc.get("external_id"), doc.get("url"), extra.get("doi"), source_name or doc.get("source"))
+
+
+def arxiv_version(external_id: Optional[str], url: Optional[str] = None) -> int:
+    """Version number of an arXiv record; unversioned ids count as 0."""
+    for candidate in (external_id, url):
+        parsed = parse_arxiv_id(candidate)
+        if parsed:
+            return parsed[1] or 0
+    return 0
+
+
+def dedupe_documents(
+    documents: Dict[str, List[Dict[str, Any]]],
+) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, int]]:
+    """
+    Collapse documents that share any identity, across versions and sources.
+
+    The highest arXiv version wins; ties keep the first document seen, so
+    source order decides. Survivors are copies carrying ``canonical_id`` and
+    the ids they absorbed in ``extra["duplicates"]``; input dicts are left
+    untouched because retrieval pages may be shared between tasks.
+    """
+    winners: List[Dict[str, Any]] = []
+    winner_sources: List[str] = []
+    key_to_group: Dict[str, int] = {}
+    stats = {"input": 0, "unique": 0, "duplicates": 0, "version_collapsed": 0, "cross_source": 0}
+
+    for source_name, docs in documents.items():
+        for doc in docs:
+            stats["input"] += 1
+            keys = document_identity_keys(doc, source_name)
+            extra = dict(doc.get("extra") or {})
+            extra["canonical_id"] = keys[0]
+            candidate = {**doc, "extra": extra}
+            group = next((key_to_group[key] for key in keys if key in key_to_group), None)
+            if group is None:
+                group = len(winners)
+                winners.append(candidate)
+                winner_sources.append(source_name)
+            else:
+                stats["duplicates"] += 1
+                current = winners[group]
+                if winner_sources[group] != source_name:
+                    stats["cross_source"] += 1
+                if current.get("external_id") != doc.get("external_id") and keys[0] == current["extra"]["canonical_id"]:
+                    stats["version_collapsed"] += 1
+                loser, loser_source = candidate, source_name
+                if arxiv_version(doc.get("external_id"), doc.get("url")) > arxiv_version(current.get("external_id"), current.get("url")):
+                    candidate["extra"]["duplicates"] = list(current["extra"].get("duplicates", []))
+                    loser, loser_source = current, winner_sources[group]
+                    winners[group] = candidate
+                    winner_sources[group] = source_name
+                winners[group]["extra"].setdefault("duplicates", []).append(
+                    {"source": loser_source, "external_id": loser.get("external_id")}
+                )
+            for key in keys:
+                key_to_group.setdefault(key, group)
+
+    deduped: Dict[str, List[Dict[str, Any]]] = {source_name: [] for source_name in documents}
+    for source_name, doc in zip(winner_sources, winners):
+        deduped[source_name].append(doc)
+    stats["unique"] = len(winners)
+    return deduped, stats
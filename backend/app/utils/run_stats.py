@@ -0,0 +1,60 @@
+"""Per-run counters collected across source wrappers and filter batches."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+RETRIEVAL = "retrieval"
+FILTERING = "filtering"
+
+_current_stats: ContextVar[Optional[Mapping[str, Dict[str, Dict[str, Any]]]]] = ContextVar("run_stats", default=None)
+
+
+@contextmanager
+def collect_stats(namespace: str, stats: Dict[str, Dict[str, Any]]) -> Iterator[Dict[str, Dict[str, Any]]]:
+    """
+    Route counters recorded under ``namespace`` into ``stats``, keyed by source.
+
+    Tasks spawned inside the block inherit the context, so concurrent
+    per-source work reports into the same dict. Blocks of other namespaces
+    stay active inside this one.
+    """
+    token = _current_stats.set({**(_current_stats.get() or {}), namespace: stats})
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _entry(namespace: str, source_name: Optional[str]) -> Optional[Dict[str, Any]]:
+    stats = (_current_stats.get() or {}).get(namespace)
+    if stats is None:
+        return None
+    return stats.setdefault(source_name or "unknown", {})
+
+
+def record_stat(namespace: str, source_name: Optional[str], key: str, amount: float = 1) -> None:
+    """Add ``amount`` to a per-source counter of the current run, if any."""
+    entry = _entry(namespace, source_name)
+    if entry is not None:
+        entry[key] = entry.get(key, 0) + amount
+
+
+def append_stat(namespace: str, source_name: Optional[str], key: str, value: Any) -> None:
+    """Append ``value`` to a per-source list of the current run, e.g. per-batch sizes."""
+    entry = _entry(namespace, source_name)
+    if entry is not None:
+        entry.setdefault(key, []).append(value)
+
+
+def merge_stats(namespace: str, stats: Mapping[str, Mapping[str, Any]]) -> None:
+    """Add counters and lists collected elsewhere, e.g. by a shared upstream request, to the current run."""
+    for source_name, values in stats.items():
+        for key, value in values.items():
+            if isinstance(value, list):
+                for item in value:
+                    append_stat(namespace, source_name, key, item)
+            else:
+                record_stat(namespace, source_name, key, value)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+arXiv Atom 解析基准
+对比旧的 ET.fromstring 整体解析 + 二次转换，与流式 AtomEntryStream 的耗时和峰值内存
+
+用法: python benchmarks/atom_parser_benchmark.py [--entries 2000] [--chunk-size 65536] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.retrieval.atom_stream import AtomEntryStream
+
+
+def build_feed(entries: int) -> bytes:
+    """生成与 export.arxiv.org 结构一致的合成 feed"""
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">\n'
+        "<title>ArXiv Query</title><id>http://arxiv.org/api/query</id>\n"
+    ]
+    abstract = " ".join(["We study large language models for retrieval and ranking."] * 20)
+    for i in range(entries):
+        parts.append(
+            f"""<entry>
+  <id>http://arxiv.org/abs/2401.{i:05d}v1</id>
+  <updated>2024-01-{i % 28 + 1:02d}T12:00:00Z</updated>
+  <published>2024-01-{i % 28 + 1:02d}T12:00:00Z</published>
+  <title>Paper number {i} on
+    efficient retrieval</title>
+  <summary>  {abstract} </summary>
+  <author><name>Author A{i}</name></author>
+  <author><name>Author B{i}</name></author>
+  <author><name>Author C{i}</name></author>
+  <arxiv:comment>12 pages</arxiv:comment>
+  <link href="http://arxiv.org/abs/2401.{i:05d}v1" rel="alternate" type="text/html"/>
+  <link title="pdf" href="http://arxiv.org/pdf/2401.{i:05d}v1" rel="related" type="application/pdf"/>
+  <arxiv:primary_category term="cs.IR" scheme="http://arxiv.org/schemas/atom"/>
+  <category term="cs.IR" scheme="http://arxiv.org/schemas/atom"/>
+  <category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+</entry>
+"""
+        )
+    parts.append("</feed>\n")
+    return "".join(parts).encode("utf-8")
+
+
+def legacy_parse(payload: bytes) -> List[Dict[str, Any]]:
+    """旧实现：读完整个响应文本后解析，再转换为文档记录"""
+    text = payload.decode("utf-8")
+    ns = {"atom": "http://www.w3.org/2005/Atom"}
+    root = ET.fromstring(text)
+    items: List[Dict[str, Any]] = []
+    for entry in root.findall("atom:entry", ns):
+        link = ""
+        for lnk in entry.findall("atom:link", ns):
+            if lnk.attrib.get("rel") == "alternate":
+                link = lnk.attrib.get("href", "")
+                break
+        authors = [a.findtext("atom:name", default="", namespaces=ns) for a in entry.findall("atom:author", ns)]
+        items.append(
+            {
+                "id": entry.findtext("atom:id", default="", namespaces=ns),
+                "title": (entry.findtext("atom:title", default="", namespaces=ns) or "").strip(),
+                "summary": (entry.findtext("atom:summary", default="", namespaces=ns) or "").strip(),
+                "published": entry.findtext("atom:published", default="", namespaces=ns),
+                "link": link,
+                "authors": [name for name in authors if name],
+            }
+        )
+    documents = []
+    for item in items:
+        published = item.get("published")
+        documents.append(
+            {
+                "external_id": item.get("id", ""),
+                "title": item.get("title", ""),
+                "abstract": item.get("summary", ""),
+                "authors": item.get("authors", []),
+                "url": item.get("link", ""),
+                "published_at": datetime.fromisoformat(published.replace("Z", "+00:00")) if published else None,
+                "source": "arxiv",
+                "extra": {},
+            }
+        )
+    return documents
+
+
+def streaming_parse(payload: bytes, chunk_size: int) -> List[Dict[str, Any]]:
+    """新实现：按网络分块喂入，边解析边产出最终记录"""
+    stream = AtomEntryStream("arxiv")
+    documents: List[Dict[str, Any]] = []
+    for offset in range(0, len(payload), chunk_size):
+        documents.extend(stream.feed(payload[offset : offset + chunk_size]))
+    documents.extend(stream.close())
+    return documents
+
+
+def measure(label: str, func: Callable[[], List[Dict[str, Any]]], repeat: int) -> List[Dict[str, Any]]:
+    timings = []
+    result: List[Dict[str, Any]] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{label:<10} median {statistics.median(timings) * 1000:8.1f} ms   "
+        f"min {min(timings) * 1000:8.1f} ms   peak {peak / 1024 / 1024:7.2f} MiB   docs {len(result)}"
+    )
+    return result
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="arXiv Atom 解析基准")
+    parser.add_argument("--entries", type=int, default=2000, help="feed 条目数")
+    parser.add_argument("--chunk-size", type=int, default=64 * 1024, help="模拟网络分块大小（字节）")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数")
+    args = parser.parse_args()
+
+    payload = build_feed(args.entries)
+    print(f"Feed: {args.entries} entries, {len(payload) / 1024 / 1024:.2f} MiB, chunk {args.chunk_size} bytes\n")
+
+    legacy = measure("legacy", lambda: legacy_parse(payload), args.repeat)
+    streaming = measure("streaming", lambda: streaming_parse(payload, args.chunk_size), args.repeat)
+
+    # 两种实现的核心字段应完全一致
+    keys = ("external_id", "title", "abstract", "authors", "url", "published_at")
+    mismatches = sum(1 for a, b in zip(legacy, streaming) if any(a[k] != b[k] for k in keys))
+    print(f"\nCore field mismatches: {mismatches}")
+    return 1 if mismatches or len(legacy) != len(streaming) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
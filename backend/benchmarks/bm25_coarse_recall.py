@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+BM25 粗筛召回率基准
+在数据库中已保存的运行结果上，对比本地 BM25 粗筛与 LLM 粗筛
+
+以每次运行最终被选中的文献（is_filtered_in）为参照：
+- 召回率：被选中的文献中有多少能通过 BM25 粗筛（LLM 粗筛按定义为 100%）
+- 保留率：送入精筛的文献比例。LLM 粗筛以带有筛选总结的文献近似（粗筛淘汰的文献没有总结）
+
+用法: python benchmarks/bm25_coarse_recall.py [--task-id 3] [--min-score 0.4] [--database-url sqlite+aiosqlite:///./litea.db]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="BM25 粗筛召回率基准")
+    parser.add_argument("--task-id", type=int, default=None, help="只评估指定任务")
+    parser.add_argument("--min-score", type=float, default=None, help="覆盖任务的 min_relevance_score")
+    parser.add_argument("--database-url", default=None, help="数据库地址，默认读取配置")
+    return parser.parse_args()
+
+
+async def load_runs(task_id: Optional[int]) -> Dict[Tuple[int, int, str], Dict[str, Any]]:
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+
+    from app.db import models
+    from app.db.session import async_session
+
+    stmt = (
+        select(models.Document)
+        .where(models.Document.run_id.is_not(None), models.Document.task_id.is_not(None))
+        .options(selectinload(models.Document.summary), selectinload(models.Document.task))
+        .order_by(models.Document.id)
+    )
+    if task_id is not None:
+        stmt = stmt.where(models.Document.task_id == task_id)
+
+    runs: Dict[Tuple[int, int, str], Dict[str, Any]] = defaultdict(lambda: {"documents": []})
+    async with async_session() as session:
+        for row in (await session.execute(stmt)).scalars():
+            run = runs[(row.task_id, row.run_id, row.source_name)]
+            run["task"] = row.task
+            run["documents"].append(
+                {
+                    "external_id": row.external_id,
+                    "title": row.title,
+                    "abstract": row.abstract or "",
+                    "keywords": row.user_keywords or [],
+                    "selected": bool(row.is_filtered_in),
+                    "llm_kept": bool(row.summary and row.summary.summary),
+                }
+            )
+    return runs
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+    if args.database_url:
+        os.environ["DATABASE__URL"] = args.database_url
+
+    from app.services.ai.filtering_agent import coarse_min_score
+    from app.services.ai.lexical_ranker import BM25Ranker
+
+    runs = asyncio.run(load_runs(args.task_id))
+    if not runs:
+        print("没有找到已保存的运行结果")
+        return 1
+
+    ranker = BM25Ranker()
+    totals = defaultdict(int)
+    elapsed = 0.0
+    print(f"{'task':>5} {'run':>5} {'source':<14} {'docs':>5} {'selected':>8} {'LLM kept':>9} {'BM25 kept':>9} {'recall':>7}")
+    for (task_id, run_id, source_name), run in sorted(runs.items()):
+        task, docs = run["task"], run["documents"]
+        filter_config = dict(task.filter_config or {})
+        if args.min_score is not None:
+            filter_config["min_relevance_score"] = args.min_score
+        context = {"prompt": task.prompt, "keywords": docs[0]["keywords"]}
+
+        started = time.perf_counter()
+        verdicts = ranker.rank(context, docs, coarse_min_score(filter_config))
+        elapsed += time.perf_counter() - started
+
+        selected = sum(d["selected"] for d in docs)
+        llm_kept = sum(d["llm_kept"] for d in docs)
+        bm25_kept = sum(v["is_selected"] for v in verdicts)
+        hits = sum(1 for d, v in zip(docs, verdicts) if d["selected"] and v["is_selected"])
+        recall = f"{hits / selected:.1%}" if selected else "-"
+        print(f"{task_id:>5} {run_id:>5} {source_name:<14} {len(docs):>5} {selected:>8} {llm_kept:>9} {bm25_kept:>9} {recall:>7}")
+        for key, value in (("docs", len(docs)), ("selected", selected), ("llm_kept", llm_kept), ("bm25_kept", bm25_kept), ("hits", hits)):
+            totals[key] += value
+
+    docs = totals["docs"] or 1
+    print()
+    print(f"运行数: {len(runs)}  文献数: {totals['docs']}  最终选中: {totals['selected']}")
+    print(f"LLM  粗筛: 召回率 100.0%  保留率 {totals['llm_kept'] / docs:.1%}")
+    recall = totals["hits"] / totals["selected"] if totals["selected"] else 0.0
+    print(f"BM25 粗筛: 召回率 {recall:.1%}  保留率 {totals['bm25_kept'] / docs:.1%}  "
+          f"漏掉 {totals['selected'] - totals['hits']} 篇  排序耗时 {elapsed * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+筛选批次构建开销基准
+对比每批次重新构造 LLM 客户端（旧行为）与按 (provider, model, temperature) 复用客户端的耗时
+
+只构建 Crew，不发起模型请求。
+
+用法: python benchmarks/crew_setup_benchmark.py [--batches 50] [--batch-size 8]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# 未配置提供商时使用占位配置，构建 Crew 不需要真实密钥
+os.environ.setdefault("AI__DEFAULT_PROVIDER", "openai")
+os.environ.setdefault("AI__PROVIDERS__openai__name", "openai")
+os.environ.setdefault("AI__PROVIDERS__openai__api_key", "sk-benchmark")
+os.environ.setdefault("AI__PROVIDERS__openai__model", "gpt-4o-mini")
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from loguru import logger  # noqa: E402
+
+from app.services.ai import crew_manager  # noqa: E402
+from app.services.ai.crew_manager import CrewManager, get_crew_manager  # noqa: E402
+
+
+def build_documents(count: int) -> List[Dict[str, Any]]:
+    abstract = " ".join(["We study efficient retrieval with large language models."] * 12)
+    return [
+        {"external_id": f"http://arxiv.org/abs/2401.{i:05d}v1", "title": f"Paper {i}", "abstract": abstract, "authors": ["A"]}
+        for i in range(count)
+    ]
+
+
+def measure(label: str, build: Callable[[], Any], batches: int) -> float:
+    timings = []
+    for _ in range(batches):
+        started = time.perf_counter()
+        build()
+        timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    print(f"{label:>8}: median {median * 1000:7.2f} ms/batch  p95 {sorted(timings)[int(len(timings) * 0.95) - 1] * 1000:7.2f} ms  "
+          f"total {sum(timings) * 1000:8.1f} ms")
+    return median
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="筛选批次构建开销基准")
+    parser.add_argument("--batches", type=int, default=50, help="构建的批次数")
+    parser.add_argument("--batch-size", type=int, default=8, help="每批文献数")
+    args = parser.parse_args()
+    logger.remove()
+
+    docs = build_documents(args.batch_size)
+    context = {"prompt": "efficient retrieval", "keywords": ["retrieval"], "ai_config": {"temperature": 0.7}}
+
+    def fresh() -> Any:
+        # 旧行为：每批次新建 CrewManager 与 LLM 客户端
+        crew_manager._llm_cache.clear()
+        return CrewManager().build_fine_filtering_crew(context, docs)
+
+    def reused() -> Any:
+        return get_crew_manager().build_fine_filtering_crew(context, docs)
+
+    reused()  # 预热：首批仍需构造一次客户端
+    before = measure("fresh", fresh, args.batches)
+    after = measure("reused", reused, args.batches)
+    print(f"\nSpeedup: x{before / after:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+筛选引擎基准
+对比 CrewAI 路径与直接 JSON 模式调用（ai_config.engine=direct）的端到端耗时和 CPU 时间
+
+两条路径都请求本地模拟的 OpenAI 兼容接口，模型延迟由 --latency 固定，
+因此差值即为每批次的框架开销。
+
+用法: python benchmarks/filter_engine_benchmark.py [--documents 120] [--latency 0.2] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+PORT = _free_port()
+BASE_URL = f"http://127.0.0.1:{PORT}/v1"
+
+# 配置需在导入 app 之前写入环境变量
+os.environ.update({
+    "AI__DEFAULT_PROVIDER": "openai",
+    "AI__PROVIDERS__openai__name": "openai",
+    "AI__PROVIDERS__openai__api_key": "sk-benchmark",
+    "AI__PROVIDERS__openai__base_url": BASE_URL,
+    "AI__PROVIDERS__openai__model": "gpt-4o-mini",
+    "AI__VERDICT_CACHE__ENABLED": "false",
+    "AI__CONCURRENCY__DEFAULT_LIMIT": "4",
+})
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from loguru import logger  # noqa: E402
+
+from app.services.ai.filtering_agent import FilteringAgentService  # noqa: E402
+
+_ID_PATTERN = re.compile(r"ID: (\S+)")
+
+
+def build_mock_app(latency: float) -> web.Application:
+    """按提示词中出现的文献 ID 返回固定格式的结论"""
+
+    async def chat_completions(request: web.Request) -> web.Response:
+        payload = await request.json()
+        text = "\n".join(str(m.get("content", "")) for m in payload.get("messages", []))
+        ids = list(dict.fromkeys(_ID_PATTERN.findall(text)))
+        results = [
+            {"external_id": doc_id, "is_selected": i % 2 == 0, "score": 0.8 if i % 2 == 0 else 0.1, "summary": "", "highlights": []}
+            for i, doc_id in enumerate(ids)
+        ]
+        content = json.dumps({"results": results} if "response_format" in payload else results)
+        await asyncio.sleep(latency)
+        return web.json_response({
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(text) // 4, "completion_tokens": len(content) // 4, "total_tokens": (len(text) + len(content)) // 4},
+        })
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    return app
+
+
+def build_documents(count: int) -> List[Dict[str, Any]]:
+    abstract = " ".join(["We study efficient retrieval with large language models."] * 12)
+    return [
+        {
+            "external_id": f"http://arxiv.org/abs/2401.{i:05d}v1",
+            "title": f"Paper {i} on retrieval",
+            "abstract": abstract,
+            "authors": ["A. Author", "B. Author"],
+            "keywords": [],
+        }
+        for i in range(count)
+    ]
+
+
+async def run_engine(engine: str, documents: List[Dict[str, Any]], service: FilteringAgentService) -> Dict[str, float]:
+    context = {
+        "prompt": "efficient retrieval",
+        "keywords": ["retrieval"],
+        "source": "arxiv",
+        "filter_config": {"max_documents_per_source": len(documents)},
+        "ai_config": {"provider": "openai", "engine": engine},
+    }
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    results = await service.filter_documents(context, documents)
+    return {
+        "wall": time.perf_counter() - wall,
+        "cpu": time.process_time() - cpu,
+        "results": len(results),
+        "fallbacks": sum(1 for r in results if r.get("fallback")),
+    }
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    runner = web.AppRunner(build_mock_app(args.latency))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", PORT).start()
+    documents = build_documents(args.documents)
+    print(f"Documents: {args.documents}, mock latency {args.latency:.2f}s, repeat {args.repeat}\n")
+
+    try:
+        try:
+            service = FilteringAgentService(max_retries=1)
+        except Exception as exc:
+            print(f"CrewAI path unavailable ({exc}); benchmarking direct engine only")
+            from app.services.ai.direct_engine import DirectFilteringEngine
+            service = FilteringAgentService(crew_manager=object(), max_retries=1, direct_engine=DirectFilteringEngine())
+            engines = ["direct"]
+        else:
+            engines = ["crewai", "direct"]
+
+        summary: Dict[str, Dict[str, float]] = {}
+        for engine in engines:
+            runs = [await run_engine(engine, documents, service) for _ in range(args.repeat)]
+            wall = statistics.median(r["wall"] for r in runs)
+            cpu = statistics.median(r["cpu"] for r in runs)
+            summary[engine] = {"wall": wall, "cpu": cpu}
+            print(f"{engine:>7}: wall {wall * 1000:8.1f} ms  cpu {cpu * 1000:8.1f} ms  "
+                  f"results {runs[-1]['results']}  fallbacks {runs[-1]['fallbacks']}")
+        if len(summary) == 2:
+            print(f"\nDirect vs CrewAI: wall x{summary['crewai']['wall'] / summary['direct']['wall']:.2f}, "
+                  f"cpu x{summary['crewai']['cpu'] / summary['direct']['cpu']:.2f}")
+    finally:
+        await runner.cleanup()
+    return 0
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="筛选引擎基准")
+    parser.add_argument("--documents", type=int, default=120, help="待筛选文献数")
+    parser.add_argument("--latency", type=float, default=0.2, help="模拟模型响应延迟（秒）")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数")
+    parser.add_argument("--verbose", action="store_true", help="输出服务日志")
+    args = parser.parse_args()
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+    return asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+筛选提示词压缩基准
+在数据库中已保存的文献上，按当前批次预算组批，逐批对比压缩前后的提示词与回答 token 数
+
+压缩前：每篇文献带完整 external_id，模型原样回显；粗筛摘要截断 150 字符，精筛使用完整摘要
+压缩后：文献以批内编号标识，模型只回显编号；摘要按模型的 token 预算截断
+token 数为 estimate_tokens 的估算值；回答按每篇文献的固定结构估算，精筛的总结与亮点两者相同，计入 ANSWER_TOKENS
+
+用法: python benchmarks/prompt_compaction_benchmark.py [--task-id 3] [--verbose] [--database-url sqlite+aiosqlite:///./litea.db]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="筛选提示词压缩基准")
+    parser.add_argument("--task-id", type=int, default=None, help="只评估指定任务")
+    parser.add_argument("--verbose", action="store_true", help="逐批输出")
+    parser.add_argument("--database-url", default=None, help="数据库地址，默认读取配置")
+    return parser.parse_args()
+
+
+async def load_runs(task_id: Optional[int]) -> Dict[Tuple[int, int, str], Dict[str, Any]]:
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+
+    from app.db import models
+    from app.db.session import async_session
+
+    stmt = (
+        select(models.Document)
+        .where(models.Document.run_id.is_not(None), models.Document.task_id.is_not(None))
+        .options(selectinload(models.Document.task))
+        .order_by(models.Document.id)
+    )
+    if task_id is not None:
+        stmt = stmt.where(models.Document.task_id == task_id)
+
+    runs: Dict[Tuple[int, int, str], Dict[str, Any]] = defaultdict(lambda: {"documents": []})
+    async with async_session() as session:
+        for row in (await session.execute(stmt)).scalars():
+            run = runs[(row.task_id, row.run_id, row.source_name)]
+            run["task"] = row.task
+            run["documents"].append(
+                {
+                    "external_id": row.external_id,
+                    "title": row.title,
+                    "abstract": row.abstract or "",
+                    "authors": row.authors or [],
+                    "keywords": row.keywords or [],
+                    "user_keywords": row.user_keywords or [],
+                }
+            )
+    return runs
+
+
+def legacy_document_text(stage: str, i: int, doc: Dict[str, Any]) -> str:
+    """压缩前的文献渲染方式"""
+    if stage == "coarse":
+        return f"[{i+1}] ID: {doc.get('external_id', '')}\n标题: {doc.get('title', '无标题')}\n摘要: {doc.get('abstract', '')[:150]}..."
+    return (
+        f"【文献 {i+1}】\n"
+        f"ID: {doc.get('external_id', '')}\n"
+        f"标题: {doc.get('title', '无标题')}\n"
+        f"作者: {', '.join(doc.get('authors', [])[:5]) if doc.get('authors') else '未知'}\n"
+        f"关键词: {', '.join(doc.get('keywords', [])) if doc.get('keywords') else '无'}\n"
+        f"完整摘要:\n{doc.get('abstract', '无摘要')}"
+    )
+
+
+def answer_tokens(stage: str, i: int, doc: Dict[str, Any], compact: bool) -> int:
+    """一篇文献的回答结构，精筛的总结与亮点另按 ANSWER_TOKENS 计"""
+    from app.services.ai.prompt_compaction import estimate_tokens
+    from app.services.ai.token_budget import ANSWER_TOKENS
+
+    ident = f'"id": {i + 1}' if compact else f'"external_id": "{doc.get("external_id", "")}"'
+    if stage == "coarse":
+        tail = "" if compact else ', "summary": "", "highlights": []'
+        return estimate_tokens(f'{{{ident}, "is_selected": true, "score": 0.7{tail}}},')
+    return estimate_tokens(f'{{{ident}, "is_selected": true, "score": 0.85, "summary": "", "highlights": []}},') + ANSWER_TOKENS["fine"]
+
+
+def measure(stage: str, context: Dict[str, Any], documents: List[Dict[str, Any]]) -> List[Dict[str, int]]:
+    """按当前预算组批，返回每批压缩前后的输入、输出 token"""
+    from app.services.ai.filter_prompts import (
+        COARSE_DOCUMENT_SEPARATOR,
+        FINE_DOCUMENT_SEPARATOR,
+        coarse_filter_prompt,
+        fine_filter_prompt,
+    )
+    from app.services.ai.prompt_compaction import estimate_tokens
+    from app.services.ai.token_budget import BatchPacker
+
+    build = coarse_filter_prompt if stage == "coarse" else fine_filter_prompt
+    separator = COARSE_DOCUMENT_SEPARATOR if stage == "coarse" else FINE_DOCUMENT_SEPARATOR
+    rows = []
+    for batch in BatchPacker(stage, context).pack(documents):
+        docs = batch.documents
+        prompt = build(context, docs)
+        compact_input = sum(estimate_tokens(part) for part in (prompt.role, prompt.goal, prompt.backstory, prompt.description, prompt.expected_output))
+        # 压缩前：只替换文献部分，其余模板相同
+        legacy_input = (
+            compact_input
+            - estimate_tokens(separator.join(_compact_texts(stage, context, docs)))
+            + estimate_tokens(separator.join(legacy_document_text(stage, i, d) for i, d in enumerate(docs)))
+        )
+        rows.append(
+            {
+                "docs": len(docs),
+                "legacy_input": legacy_input,
+                "compact_input": compact_input,
+                "legacy_output": sum(answer_tokens(stage, i, d, compact=False) for i, d in enumerate(docs)),
+                "compact_output": sum(answer_tokens(stage, i, d, compact=True) for i, d in enumerate(docs)),
+            }
+        )
+    return rows
+
+
+def _compact_texts(stage: str, context: Dict[str, Any], docs: List[Dict[str, Any]]) -> List[str]:
+    from app.services.ai.filter_prompts import coarse_document_text, filter_model, fine_document_text
+    from app.services.ai.prompt_compaction import model_budget
+
+    budget = model_budget(filter_model(context))
+    if stage == "coarse":
+        return [coarse_document_text(i, d, budget.coarse_abstract_tokens) for i, d in enumerate(docs)]
+    return [fine_document_text(i, d, budget.fine_abstract_tokens) for i, d in enumerate(docs)]
+
+
+def reduction(before: int, after: int) -> str:
+    return f"{1 - after / before:.1%}" if before else "-"
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+    if args.database_url:
+        os.environ["DATABASE__URL"] = args.database_url
+
+    runs = asyncio.run(load_runs(args.task_id))
+    if not runs:
+        print("没有找到已保存的文献")
+        return 1
+
+    totals: Dict[str, Dict[str, int]] = {stage: defaultdict(int) for stage in ("coarse", "fine")}
+    header = f"{'task':>5} {'run':>5} {'source':<14} {'stage':<6} {'batch':>5} {'docs':>5} {'input before':>12} {'after':>7} {'saved':>6} {'output before':>13} {'after':>7} {'saved':>6}"
+    if args.verbose:
+        print(header)
+    for (task_id, run_id, source_name), run in sorted(runs.items()):
+        task, docs = run["task"], run["documents"]
+        context = {
+            "prompt": task.prompt,
+            "keywords": docs[0]["user_keywords"],
+            "source": source_name,
+            "filter_config": task.filter_config or {},
+            "ai_config": task.ai_config or {},
+        }
+        for stage in ("coarse", "fine"):
+            for number, row in enumerate(measure(stage, context, docs), start=1):
+                for key, value in row.items():
+                    totals[stage][key] += value
+                totals[stage]["batches"] += 1
+                if args.verbose:
+                    print(
+                        f"{task_id:>5} {run_id:>5} {source_name:<14} {stage:<6} {number:>5} {row['docs']:>5} "
+                        f"{row['legacy_input']:>12} {row['compact_input']:>7} {reduction(row['legacy_input'], row['compact_input']):>6} "
+                        f"{row['legacy_output']:>13} {row['compact_output']:>7} {reduction(row['legacy_output'], row['compact_output']):>6}"
+                    )
+
+    print()
+    print(f"运行数: {len(runs)}  文献数: {sum(len(run['documents']) for run in runs.values())}（精筛按全部文献估算）")
+    for stage, total in totals.items():
+        batches = total["batches"] or 1
+        print(
+            f"{stage:<6} 批次 {total['batches']:>4}  "
+            f"输入/批 {total['legacy_input'] / batches:>7.0f} -> {total['compact_input'] / batches:>7.0f} ({reduction(total['legacy_input'], total['compact_input'])})  "
+            f"输出/批 {total['legacy_output'] / batches:>7.0f} -> {total['compact_output'] / batches:>7.0f} ({reduction(total['legacy_output'], total['compact_output'])})"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
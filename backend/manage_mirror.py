@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+本地 arXiv 镜像管理工具
+提供增量收割、状态查看和检索测试功能
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.config import get_settings
+from app.services.http_clients import http_pool
+from app.services.retrieval.arxiv_local_source import ArxivLocalRetrievalSource
+from app.services.retrieval.arxiv_mirror import ArxivMirrorHarvester, get_mirror_store
+
+
+async def harvest(sets, from_date):
+    """增量收割 OAI-PMH 元数据"""
+    config = get_settings().retrieval.mirror
+    print("=" * 60)
+    print(" arXiv 镜像收割")
+    print("=" * 60)
+    print(f"OAI-PMH: {config.oai_url}")
+    print(f"镜像文件: {config.path}\n")
+    try:
+        results = await ArxivMirrorHarvester().harvest(sets=sets or None, from_date=from_date)
+    finally:
+        await http_pool.close()
+    for set_spec, count in results.items():
+        print(f"✓ {set_spec}: 写入 {count:,} 条记录")
+
+
+async def show_stats():
+    """查看镜像状态"""
+    stats = await get_mirror_store().stats()
+    print("=" * 60)
+    print(" arXiv 镜像状态")
+    print("=" * 60)
+    print(f"文献数量: {stats['papers']:,}")
+    print(f"最新提交: {stats['latest_published'] or '-'}")
+    print(f"最新更新: {stats['latest_updated'] or '-'}\n")
+    for item in stats["sets"]:
+        print(f"  {item['set_spec']:<12} 断点 {item['last_datestamp']}  累计 {item['records']:,} 条")
+
+
+async def search(keywords, max_results):
+    """在镜像中检索"""
+    source = ArxivLocalRetrievalSource()
+    documents = await source.search("", keywords, {"max_results": str(max_results)})
+    for doc in documents:
+        published = doc["published_at"].date() if doc["published_at"] else "-"
+        print(f"[{published}] {doc['external_id']}\n    {doc['title']}")
+    print(f"\n共 {len(documents)} 条")
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="本地 arXiv 镜像管理工具")
+    parser.add_argument("action", choices=["harvest", "stats", "search"], help="要执行的操作")
+    parser.add_argument("--set", dest="sets", action="append", help="OAI-PMH set，可重复指定，默认使用配置")
+    parser.add_argument("--from", dest="from_date", help="收割起始日期 YYYY-MM-DD，默认从上次断点继续")
+    parser.add_argument("--keyword", dest="keywords", action="append", default=[], help="检索关键词，可重复指定")
+    parser.add_argument("--max-results", type=int, default=20, help="检索返回数量")
+    args = parser.parse_args()
+
+    if args.action == "harvest":
+        asyncio.run(harvest(args.sets, args.from_date))
+    elif args.action == "stats":
+        asyncio.run(show_stats())
+    elif args.action == "search":
+        if not args.keywords:
+            parser.error("search 需要至少一个 --keyword")
+        asyncio.run(search(args.keywords, args.max_results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""Adaptive fetch sizing of ``max_results="auto"`` sources."""
+
+from __future__ import annotations
+
+from app.config import AdaptiveFetchSettings
+from app.db import models
+from app.services.tasks.fetch_sizing import plan_fetch_size
+
+
+def _run(count: int, selected: int, fetch_size: int) -> models.TaskRun:
+    stat = {"status": "ok", "count": count, "selected": selected, "fetch_size": fetch_size, "gap_days": 1.0}
+    return models.TaskRun(status="completed", run_metadata={"retrieval": {"arxiv": stat}})
+
+
+def test_high_yield_saturated_source_grows():
+    plan = plan_fetch_size("arxiv", [_run(50, 40, 50)], {"max_results": "auto"}, AdaptiveFetchSettings(), cap=200)
+
+    assert plan["reason"] == "grow"
+    assert plan["size"] == 75
+
+
+def test_growth_is_held_at_the_document_cap():
+    plan = plan_fetch_size("arxiv", [_run(50, 40, 50)], {"max_results": "auto"}, AdaptiveFetchSettings(), cap=50)
+
+    assert plan["size"] == 50
+    assert plan["reason"] == "cap"
+
+
+def test_no_history_starts_within_the_cap():
+    plan = plan_fetch_size("arxiv", [], {"max_results": "auto"}, AdaptiveFetchSettings(), cap=20)
+
+    assert plan == {"size": 20, "reason": "cap", "gap_days": None}
+
+
+def test_low_yield_shrinks_below_the_cap():
+    plan = plan_fetch_size("arxiv", [_run(50, 1, 50)], {"max_results": "auto"}, AdaptiveFetchSettings(), cap=50)
+
+    assert plan["reason"] == "shrink"
+    assert plan["size"] < 50
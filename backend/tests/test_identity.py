@@ -0,0 +1,78 @@
+"""Canonical arXiv identity and cross-source deduplication."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.utils.identity import dedupe_documents, document_identity_keys, parse_arxiv_id
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("http://arxiv.org/abs/2401.01234v2", ("2401.01234", 2)),
+        ("https://arxiv.org/pdf/2401.01234", ("2401.01234", None)),
+        ("oai:arXiv.org:2401.01234", ("2401.01234", None)),
+        ("10.48550/arXiv.2401.01234", ("2401.01234", None)),
+        ("2401.01234v3", ("2401.01234", 3)),
+        ("http://arxiv.org/abs/hep-th/9901001v1", ("hep-th/9901001", 1)),
+        ("https://example.org/papers/2401.01234", None),
+        (None, None),
+    ],
+)
+def test_parse_arxiv_id(value, expected):
+    assert parse_arxiv_id(value) == expected
+
+
+def test_identity_keys_put_the_versionless_arxiv_id_first():
+    doc = {"external_id": "http://arxiv.org/abs/2401.01234v2", "url": "http://arxiv.org/abs/2401.01234v2"}
+
+    assert document_identity_keys(doc, "arxiv")[0] == "arxiv:2401.01234"
+
+
+def test_versions_collapse_to_the_newest():
+    v1 = {"external_id": "http://arxiv.org/abs/2401.01234v1", "title": "old"}
+    v2 = {"external_id": "http://arxiv.org/abs/2401.01234v2", "title": "new"}
+    other = {"external_id": "http://arxiv.org/abs/2401.05678v1", "title": "other"}
+
+    deduped, stats = dedupe_documents({"arxiv": [v1, other, v2]})
+
+    assert [doc["title"] for doc in deduped["arxiv"]] == ["new", "other"]
+    assert deduped["arxiv"][0]["extra"]["canonical_id"] == "arxiv:2401.01234"
+    assert deduped["arxiv"][0]["extra"]["duplicates"] == [{"source": "arxiv", "external_id": v1["external_id"]}]
+    assert stats == {"input": 3, "unique": 2, "duplicates": 1, "version_collapsed": 1, "cross_source": 0}
+    # 输入的检索结果可能被多个任务共享，不能被修改
+    assert "extra" not in v1 and "extra" not in v2
+
+
+def test_cross_source_duplicates_keep_the_first_source_on_a_version_tie():
+    api = {"external_id": "http://arxiv.org/abs/2401.01234v1", "title": "api"}
+    listing = {"external_id": "oai:arXiv.org:2401.01234v1", "title": "listing"}
+    journal = {"external_id": "W123", "title": "journal", "extra": {"doi": "10.48550/arXiv.2401.01234"}}
+
+    deduped, stats = dedupe_documents({"arxiv": [api], "arxiv_listing": [listing], "openalex": [journal]})
+
+    assert deduped == {"arxiv": [deduped["arxiv"][0]], "arxiv_listing": [], "openalex": []}
+    assert deduped["arxiv"][0]["title"] == "api"
+    assert stats["cross_source"] == 2
+    assert stats["unique"] == 1
+
+
+def test_newer_version_from_another_source_wins():
+    api = {"external_id": "http://arxiv.org/abs/2401.01234v1", "title": "api"}
+    listing = {"external_id": "oai:arXiv.org:2401.01234v2", "title": "listing"}
+
+    deduped, _ = dedupe_documents({"arxiv": [api], "arxiv_listing": [listing]})
+
+    assert deduped["arxiv"] == []
+    assert [doc["title"] for doc in deduped["arxiv_listing"]] == ["listing"]
+    assert deduped["arxiv_listing"][0]["extra"]["duplicates"] == [{"source": "arxiv", "external_id": api["external_id"]}]
+
+
+def test_unrelated_documents_are_kept():
+    docs = [{"external_id": "a", "url": "https://example.org/a"}, {"external_id": "b", "url": "https://example.org/b"}]
+
+    deduped, stats = dedupe_documents({"web": docs})
+
+    assert len(deduped["web"]) == 2
+    assert stats["duplicates"] == 0
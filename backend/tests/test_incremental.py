@@ -0,0 +1,88 @@
+"""Incremental runs that reuse stored verdicts."""
+
+from __future__ import annotations
+
+from app.db import models
+from app.db.repositories import DocumentRepository
+from app.services.ai.verdict_cache import document_fingerprint, verdict_scope
+from app.services.tasks.task_runner import TaskRunner
+
+KEYWORDS = ["retrieval"]
+
+
+def _doc(external_id: str, abstract: str = "dense retrieval for question answering"):
+    return {"external_id": external_id, "url": external_id, "title": "Dense retrieval", "abstract": abstract, "authors": ["A"]}
+
+
+async def _seed(session):
+    task = models.Task(name="t", prompt="retrieval augmented generation", filter_config={"incremental": True}, ai_config={})
+    session.add(task)
+    await session.flush()
+    runner = TaskRunner.__new__(TaskRunner)
+    scope = verdict_scope("fine", runner._filter_context(task, KEYWORDS, "arxiv"), task.filter_config)
+    stored = [
+        # 同一篇文献的 v1，内容与本次检索到的 v2 相同
+        (_doc("http://arxiv.org/abs/2401.00001v1"), scope, True, 0.9),
+        # 按旧提示词评估过
+        (_doc("http://arxiv.org/abs/2401.00002v1"), "stale-scope", True, 0.8),
+        # 摘要已修改
+        (_doc("http://arxiv.org/abs/2401.00004v1", abstract="an older abstract"), scope, False, 0.1),
+    ]
+    for doc, doc_scope, selected, score in stored:
+        row = models.Document(
+            task_id=task.id,
+            source_name="arxiv",
+            external_id=doc["external_id"],
+            url=doc["url"],
+            title=doc["title"],
+            abstract=doc["abstract"],
+            extra_metadata={"filter_scope": doc_scope, "content_hash": document_fingerprint(doc)},
+            is_filtered_in=selected,
+            rank_score=score,
+        )
+        row.summary = models.DocumentSummary(summary="stored summary", highlights=["stored"])
+        session.add(row)
+    await session.flush()
+    return runner, task, scope
+
+
+async def test_unchanged_documents_under_the_current_scope_are_carried(session):
+    runner, task, scope = await _seed(session)
+    retrieved = {
+        "arxiv": [
+            _doc("http://arxiv.org/abs/2401.00001v2"),
+            _doc("http://arxiv.org/abs/2401.00002v1"),
+            _doc("http://arxiv.org/abs/2401.00003v1"),
+            _doc("http://arxiv.org/abs/2401.00004v1", abstract="a revised abstract"),
+        ]
+    }
+
+    carried, remaining = await runner._carry_forward_scores(DocumentRepository(session), task, KEYWORDS, retrieved)
+
+    assert list(carried["arxiv"]) == ["http://arxiv.org/abs/2401.00001v2"]
+    verdict = carried["arxiv"]["http://arxiv.org/abs/2401.00001v2"]
+    assert (verdict["is_selected"], verdict["score"], verdict["summary"]) == (True, 0.9, "stored summary")
+    assert verdict["extra"]["filter_scope"] == scope
+    assert [doc["external_id"][-7:] for doc in remaining["arxiv"]] == ["00002v1", "00003v1", "00004v1"]
+
+
+def test_merge_carried_restores_retrieval_order():
+    documents = {"arxiv": [_doc(f"id-{i}") for i in range(5)], "listing": [_doc("id-9")]}
+    carried = {"arxiv": {"id-1": {"external_id": "id-1", "reused": True}, "id-3": {"external_id": "id-3", "reused": True}}}
+    filtered = {
+        "arxiv": [{"external_id": f"id-{i}", "reused": False} for i in (0, 2, 4)],
+        "listing": [{"external_id": "id-9", "reused": False}],
+    }
+
+    merged = TaskRunner._merge_carried(documents, carried, filtered)
+
+    assert [doc["external_id"] for doc in merged["arxiv"]] == [f"id-{i}" for i in range(5)]
+    assert [doc["reused"] for doc in merged["arxiv"]] == [False, True, False, True, False]
+    assert merged["listing"] == filtered["listing"]
+
+
+def test_merge_carried_handles_a_fully_carried_source():
+    documents = {"arxiv": [_doc("id-0")]}
+    carried = {"arxiv": {"id-0": {"external_id": "id-0", "reused": True}}}
+
+    assert TaskRunner._merge_carried(documents, carried, {}) == {"arxiv": [carried["arxiv"]["id-0"]]}
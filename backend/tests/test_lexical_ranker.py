@@ -0,0 +1,63 @@
+"""BM25 coarse filtering."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.services.ai.filtering_agent import coarse_min_score
+from app.services.ai.lexical_ranker import BM25Ranker, tokenize
+
+CONTEXT = {"prompt": "retrieval augmented generation for question answering", "keywords": ["dense retrieval"]}
+DOCUMENTS = [
+    {"external_id": "match", "title": "Retrieval augmented generation for open-domain question answering", "abstract": "We combine retrieval and generation to answer questions."},
+    {"external_id": "partial", "title": "Question answering over tables", "abstract": "A generation model answers questions about tables."},
+    {"external_id": "weak", "title": "Protein structure prediction", "abstract": "We predict protein structures; generation of candidate folds is sampled."},
+    {"external_id": "keyword", "title": "Dense encoders", "abstract": "Contrastive training of dense encoders."},
+    {"external_id": "none", "title": "Galaxy rotation curves", "abstract": "Dark matter halos in spiral galaxies."},
+]
+
+
+def _verdicts(min_score: float, context=CONTEXT, documents=DOCUMENTS):
+    return {r["external_id"]: r for r in BM25Ranker().rank(context, documents, min_score)}
+
+
+def test_weak_and_unrelated_documents_fall_under_the_cut_off():
+    verdicts = _verdicts(0.2)
+
+    assert [doc_id for doc_id, r in verdicts.items() if r["is_selected"]] == ["match", "partial", "keyword"]
+    assert verdicts["match"]["score"] > verdicts["partial"]["score"] > verdicts["weak"]["score"] > verdicts["none"]["score"] == 0.0
+    assert all(r["summary"] == "" and r["highlights"] == [] for r in verdicts.values())
+
+
+def test_keyword_in_title_keeps_a_document_under_the_threshold():
+    verdicts = _verdicts(0.6)
+
+    assert verdicts["keyword"]["score"] < 0.6 and verdicts["keyword"]["is_selected"]
+    assert verdicts["partial"]["score"] < 0.6 and not verdicts["partial"]["is_selected"]
+    assert verdicts["match"]["is_selected"]
+
+
+def test_median_match_scores_one_half():
+    documents = DOCUMENTS[:3]
+    verdicts = _verdicts(0.2, {"prompt": CONTEXT["prompt"], "keywords": []}, documents)
+
+    assert sorted(r["score"] for r in verdicts.values())[1] == pytest.approx(0.5)
+
+
+def test_no_lexical_overlap_keeps_everything():
+    verdicts = _verdicts(0.9, {"prompt": "检索增强生成", "keywords": []})
+
+    assert all(r["is_selected"] and r["score"] == 0.5 for r in verdicts.values())
+
+
+def test_tokenize_drops_stopwords_and_plural_endings():
+    assert tokenize("The models of a Dense Retrieval class") == ["model", "dense", "retrieval", "class"]
+    assert tokenize("检索增强") == ["检索", "索增", "增强"]
+
+
+@pytest.mark.parametrize(
+    ("filter_config", "expected"),
+    [({"min_relevance_score": 0.4}, pytest.approx(0.2)), ({"min_relevance_score": 0.7}, pytest.approx(0.5)), ({"min_relevance_score": 0.1}, 0.2)],
+)
+def test_coarse_threshold_is_lower_than_fine_with_a_floor(filter_config, expected):
+    assert coarse_min_score(filter_config) == expected
@@ -0,0 +1,78 @@
+"""Near-duplicate grouping and verdict fan-out."""
+
+from __future__ import annotations
+
+from app.services.ai.verdict_cache import document_fingerprint
+from app.services.tasks.near_duplicates import MinHasher, NearDuplicatePlan, group_near_duplicates
+from app.services.tasks.task_runner import TaskRunner
+
+ABSTRACT = (
+    "We propose a retrieval augmented generation model that conditions a sequence to sequence "
+    "generator on passages fetched by a dense retriever and trains both end to end on open domain "
+    "question answering benchmarks with strong results"
+)
+
+
+def _doc(external_id: str, title: str, abstract: str = ABSTRACT):
+    return {"external_id": external_id, "title": title, "abstract": abstract, "extra": {"origin": external_id}}
+
+
+def test_retitled_versions_group_under_the_first_one():
+    hasher = MinHasher()
+    documents = [
+        _doc("preprint", "Retrieval augmented generation for knowledge intensive tasks"),
+        _doc("other", "Galaxy rotation curves", "Dark matter halos shape the rotation curves of spiral galaxies " * 3),
+        _doc("workshop", "Retrieval augmented generation for knowledge intensive NLP tasks"),
+        _doc("short", "Tiny", "too short"),
+    ]
+    signatures = [hasher.signature(doc) for doc in documents]
+
+    assert signatures[3] is None
+    assert group_near_duplicates(hasher, signatures, 0.7) == [0, 1, 0, 3]
+
+
+def test_followers_copy_the_leader_verdict():
+    follower = _doc("workshop", "Retrieval augmented generation for knowledge intensive NLP tasks")
+    orphan = _doc("orphan", "Retrieval augmented generation, journal version")
+    plan = NearDuplicatePlan(
+        representatives={},
+        followers={
+            "listing": {"workshop": (follower, ("arxiv", "preprint"))},
+            "arxiv": {"orphan": (orphan, ("arxiv", "missing"))},
+        },
+    )
+    leader = {
+        "external_id": "preprint",
+        "is_selected": True,
+        "score": 0.85,
+        "summary": "摘要",
+        "highlights": ["h"],
+        "user_keywords": ["retrieval"],
+        "extra": {"filter_scope": "scope", "prescreen": "model", "origin": "preprint"},
+    }
+
+    followed = TaskRunner._follow_representatives(plan, {"arxiv": [leader]})
+
+    assert list(followed) == ["listing"]
+    verdict = followed["listing"]["workshop"]
+    assert (verdict["external_id"], verdict["title"]) == ("workshop", follower["title"])
+    assert (verdict["is_selected"], verdict["score"], verdict["summary"], verdict["highlights"]) == (True, 0.85, "摘要", ["h"])
+    assert verdict["user_keywords"] == ["retrieval"]
+    assert verdict["extra"] == {
+        "origin": "workshop",
+        "near_duplicate_of": "preprint",
+        "filter_scope": "scope",
+        "prescreen": "model",
+        "content_hash": document_fingerprint(follower),
+    }
+
+
+def test_followers_of_an_unscoped_leader_get_no_content_hash():
+    follower = _doc("workshop", "Retrieval augmented generation for knowledge intensive NLP tasks")
+    plan = NearDuplicatePlan(representatives={}, followers={"arxiv": {"workshop": (follower, ("arxiv", "preprint"))}})
+    leader = {"external_id": "preprint", "is_selected": False, "score": 0.1, "fallback": True}
+
+    verdict = TaskRunner._follow_representatives(plan, {"arxiv": [leader]})["arxiv"]["workshop"]
+
+    assert verdict["fallback"] is True and not verdict["is_selected"]
+    assert verdict["extra"] == {"origin": "workshop", "near_duplicate_of": "preprint"}
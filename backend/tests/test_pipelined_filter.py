@@ -0,0 +1,93 @@
+"""Coarse→fine pipelining in the two-stage filter."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import BatchTokenBudget
+from app.services.ai import token_budget
+from app.services.ai.filtering_agent import FilteringAgentService
+
+DOCUMENTS = [{"external_id": f"d{i}", "title": f"Paper {i}", "abstract": "dense retrieval"} for i in range(12)]
+
+
+class _Crew:
+    def __init__(self, engine: "_Engine", stage: str, output: str, delay: float) -> None:
+        self._engine = engine
+        self._stage = stage
+        self._output = output
+        self._delay = delay
+
+    async def kickoff_async(self):
+        self._engine.events.append(f"{self._stage}_start")
+        await asyncio.sleep(self._delay)
+        self._engine.events.append(f"{self._stage}_done")
+        return SimpleNamespace(output=self._output)
+
+
+class _Engine:
+    """Coarse passes even-numbered documents, fine selects multiples of four."""
+
+    def __init__(self) -> None:
+        self.events = []
+        self.coarse_batches = []
+        self.fine_batches = []
+
+    @staticmethod
+    def _number(doc) -> int:
+        return int(doc["external_id"][1:])
+
+    def build_coarse_filtering_crew(self, context, documents):
+        self.coarse_batches.append([doc["external_id"] for doc in documents])
+        # 先发出的批次更慢，完成顺序与提交顺序相反
+        delay = 0.02 * (5 - len(self.coarse_batches))
+        output = [
+            {"id": i + 1, "is_selected": self._number(doc) % 2 == 0, "score": 0.9}
+            for i, doc in enumerate(documents)
+        ]
+        return _Crew(self, "coarse", json.dumps(output), delay)
+
+    def build_fine_filtering_crew(self, context, documents):
+        self.fine_batches.append([doc["external_id"] for doc in documents])
+        output = [
+            {"id": i + 1, "is_selected": True, "score": 0.8 if self._number(doc) % 4 == 0 else 0.1, "summary": "fine"}
+            for i, doc in enumerate(documents)
+        ]
+        return _Crew(self, "fine", json.dumps(output), 0.001)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(
+        token_budget,
+        "budget_for",
+        lambda context: BatchTokenBudget(coarse_tokens=100_000, fine_tokens=100_000, coarse_max_documents=3, fine_max_documents=2),
+    )
+    return _Engine()
+
+
+def _service(engine: _Engine) -> FilteringAgentService:
+    return FilteringAgentService(crew_manager=engine, direct_engine=object(), relevance_store=object(), verdict_cache=None)
+
+
+async def test_every_document_gets_one_result_in_input_order(engine):
+    results = await _service(engine).filter_documents({"prompt": "retrieval", "filter_config": {}}, DOCUMENTS)
+
+    assert [r["external_id"] for r in results] == [doc["external_id"] for doc in DOCUMENTS]
+    assert [r["external_id"] for r in results if r["is_selected"]] == ["d0", "d4", "d8"]
+    # 粗筛通过的文献都有精筛结论，未通过的保留粗筛结论
+    assert all(r["summary"] == "fine" for r in results if int(r["external_id"][1:]) % 2 == 0)
+    assert not any(r["is_selected"] or r["summary"] for r in results if int(r["external_id"][1:]) % 2 == 1)
+
+
+async def test_fine_batches_start_before_the_coarse_stage_finishes(engine):
+    await _service(engine).filter_documents({"prompt": "retrieval", "filter_config": {}}, DOCUMENTS)
+
+    assert len(engine.coarse_batches) == 4
+    assert sorted(doc for batch in engine.fine_batches for doc in batch) == sorted(f"d{i}" for i in range(0, 12, 2))
+    last_coarse_done = max(i for i, event in enumerate(engine.events) if event == "coarse_done")
+    assert engine.events.index("fine_start") < last_coarse_done
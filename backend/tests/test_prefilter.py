@@ -0,0 +1,82 @@
+"""Rule prefilter evaluated before the model."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from app.services.ai.prefilter import Prefilter
+
+DOCUMENTS = [
+    {
+        "external_id": "rag",
+        "title": "Retrieval augmented generation",
+        "abstract": "Dense retrieval for open-domain QA.",
+        "authors": ["Patrick Lewis", "Ethan Perez"],
+        "published_at": "2024-03-01T12:00:00Z",
+        "extra": {"primary_category": "cs.CL", "categories": ["cs.CL", "cs.IR"]},
+    },
+    {
+        "external_id": "survey",
+        "title": "A survey of retrievers",
+        "abstract": "We review dense retrievers.",
+        "authors": ["Jane Doe"],
+        "published_at": datetime(2023, 6, 1, tzinfo=timezone.utc),
+        "extra": {"primary_category": "cs.IR", "categories": ["cs.IR"]},
+    },
+    {
+        "external_id": "physics",
+        "title": "Retrieval of galaxy spectra",
+        "abstract": "Spectral fitting of galaxies.",
+        "authors": ["Li Wei"],
+        "published_at": "2024-05-01",
+        "extra": {"primary_category": "astro-ph.GA", "categories": ["astro-ph.GA"]},
+    },
+    # 非 arXiv 来源：没有作者、分类和日期
+    {"external_id": "web", "title": "Notes on retrieval", "abstract": "A blog post on dense retrieval."},
+]
+
+
+def _apply(spec):
+    keep, drops, failed = Prefilter.compile(spec).apply(DOCUMENTS)
+    return [doc["external_id"] for doc, ok in zip(DOCUMENTS, keep) if ok], drops, failed
+
+
+def test_empty_or_unknown_spec_compiles_to_none():
+    assert Prefilter.compile(None) is None
+    assert Prefilter.compile({}) is None
+    assert Prefilter.compile({"include_terms": [], "nonsense": ["x"]}) is None
+
+
+def test_terms_match_whole_words_and_respect_field_prefixes():
+    assert _apply({"include_terms": ["dense retrieval"]})[0] == ["rag", "web"]
+    assert _apply({"include_terms": "title:survey, abstract:spectral"})[0] == ["survey", "physics"]
+    # "retriever" 不是 "retrievers" 的整词
+    assert _apply({"include_terms": ["retriever"]})[0] == []
+    assert _apply({"exclude_terms": ["Galaxy"]})[0] == ["rag", "survey", "web"]
+
+
+def test_category_rules_accept_wildcards_and_pass_documents_without_categories():
+    assert _apply({"categories": ["cs.*"]})[0] == ["rag", "survey", "web"]
+    assert _apply({"primary_category": ["cs.CL"]})[0] == ["rag", "web"]
+    assert _apply({"categories": ["astro-ph"]})[0] == ["physics", "web"]
+    assert _apply({"exclude_categories": ["cs.IR"]})[0] == ["physics", "web"]
+
+
+def test_author_rules_pass_author_less_documents():
+    assert _apply({"authors": ["lewis"]})[0] == ["rag", "web"]
+    # 名字要整词匹配
+    assert _apply({"authors": ["Lew"]})[0] == ["web"]
+    assert _apply({"exclude_authors": ["Jane Doe"]})[0] == ["rag", "physics", "web"]
+
+
+def test_date_bounds_compare_mixed_timezones_and_pass_undated_documents():
+    assert _apply({"published_after": "2024-01-01"})[0] == ["rag", "physics", "web"]
+    assert _apply({"published_before": datetime(2024, 3, 1, 13, tzinfo=timezone.utc)})[0] == ["rag", "survey", "web"]
+
+
+def test_drops_count_every_failed_rule_and_first_failed_follows_rule_order():
+    kept, drops, failed = _apply({"categories": ["cs.*"], "exclude_terms": ["galaxy", "survey"], "published_after": "2024-01-01"})
+
+    assert kept == ["rag", "web"]
+    assert drops == {"exclude_terms": 2, "categories": 1, "published_after": 1}
+    assert failed == [None, "exclude_terms", "exclude_terms", None]
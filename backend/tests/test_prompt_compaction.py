@@ -0,0 +1,49 @@
+"""Batch aliases and abstract truncation in filter prompts."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.services.ai.prompt_compaction import (
+    ELLIPSIS,
+    document_alias,
+    estimate_tokens,
+    resolve_alias,
+    truncate_to_tokens,
+)
+
+DOCUMENTS = [{"external_id": f"http://arxiv.org/abs/2401.0000{i}v1"} for i in range(1, 4)]
+
+
+@pytest.mark.parametrize("alias", [2, "2", "[2]", "#2", 2.0])
+def test_alias_forms_resolve_to_the_batch_position(alias):
+    assert resolve_alias({"id": alias}, DOCUMENTS) is DOCUMENTS[1]
+
+
+def test_alias_round_trips_with_document_alias():
+    assert [resolve_alias({"id": document_alias(i)}, DOCUMENTS) for i in range(3)] == DOCUMENTS
+
+
+@pytest.mark.parametrize("alias", [0, 4, "-", None, True])
+def test_unusable_alias_falls_back_to_external_id(alias):
+    item = {"id": alias, "external_id": DOCUMENTS[2]["external_id"]}
+
+    assert resolve_alias(item, DOCUMENTS) is DOCUMENTS[2]
+
+
+def test_unknown_document_resolves_to_none():
+    assert resolve_alias({"id": 9}, DOCUMENTS) is None
+    assert resolve_alias({"external_id": "http://arxiv.org/abs/2401.09999v1"}, DOCUMENTS) is None
+    assert resolve_alias({}, DOCUMENTS) is None
+
+
+def test_truncate_to_tokens_cuts_at_a_word_boundary():
+    text = " ".join(f"word{i}" for i in range(100))
+
+    cut = truncate_to_tokens(text, 20)
+
+    assert cut.endswith(ELLIPSIS) and estimate_tokens(cut) <= 21
+    kept = cut[: -len(ELLIPSIS)].split()
+    assert kept == text.split()[: len(kept)]
+    assert truncate_to_tokens("short  text", 20) == "short text"
+    assert estimate_tokens("检索增强") == 4
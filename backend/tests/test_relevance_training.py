@@ -0,0 +1,60 @@
+"""Training data of the per-task relevance model."""
+
+from __future__ import annotations
+
+from app.config import RelevanceModelSettings
+from app.db import models
+from app.db.repositories import DocumentRepository
+from app.services.ai.relevance_model import RelevanceModelStore
+from app.services.tasks import task_runner
+from app.services.tasks.task_runner import TaskRunner
+
+
+async def _seed(session) -> models.Task:
+    task = models.Task(name="t", prompt="retrieval augmented generation", filter_config={}, ai_config={})
+    session.add(task)
+    await session.flush()
+    rows = [
+        # LLM 给出的结论
+        ("llm", True, 0.9, {"filter_scope": "fine:abc", "content_hash": "h1"}, None),
+        # LLM 调用失败时的回退结论：选中、0.5 分、无 filter_scope
+        ("fallback", True, 0.5, {}, None),
+        ("prescreen", True, 0.95, {"prescreen": "accept"}, None),
+        ("prefilter", False, 0.0, {"prefilter": "exclude_terms"}, None),
+        # 导出到 Zotero 的文献即使没有 LLM 结论也是可靠的正样本
+        ("exported", False, 0.5, {}, "ZKEY1"),
+    ]
+    for external_id, selected, score, extra, zotero_key in rows:
+        session.add(
+            models.Document(
+                task_id=task.id,
+                source_name="arxiv",
+                external_id=external_id,
+                title=f"{external_id} retrieval paper",
+                abstract="dense retrieval for question answering",
+                extra_metadata=extra,
+                is_filtered_in=selected,
+                rank_score=score,
+                zotero_key=zotero_key,
+            )
+        )
+    await session.flush()
+    return task
+
+
+async def test_training_documents_skip_fallback_verdicts(session):
+    task = await _seed(session)
+    rows = await DocumentRepository(session).list_training_documents(task.id)
+    assert sorted(row.external_id for row in rows) == ["exported", "llm"]
+
+
+async def test_bootstrap_does_not_train_on_fallback_rows(session, tmp_path, monkeypatch):
+    task = await _seed(session)
+    store = RelevanceModelStore(RelevanceModelSettings(path=str(tmp_path), n_features=2 ** 10, bootstrap_epochs=1))
+    monkeypatch.setattr(task_runner, "get_relevance_store", lambda: store)
+
+    runner = TaskRunner.__new__(TaskRunner)
+    result = await runner._train_relevance_model(DocumentRepository(session), task, {}, {})
+
+    assert result["trained"] == 2
+    assert result["positives"] == 2
@@ -0,0 +1,43 @@
+"""Coalescing of identical in-flight source queries."""
+
+from __future__ import annotations
+
+import asyncio
+
+from app.services.retrieval.single_flight import SingleFlightSource
+from app.utils.run_stats import RETRIEVAL, collect_stats, record_stat
+
+
+class _UpstreamSource:
+    name = "fake"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def iter_search(self, prompt, keywords, parameters, limit=None):
+        self.calls += 1
+        record_stat(RETRIEVAL, self.name, "cache_misses")
+        await asyncio.sleep(0.01)
+        yield [{"external_id": "a"}]
+        record_stat(RETRIEVAL, self.name, "rate_limit_wait_ms", 5)
+        yield [{"external_id": "b"}]
+
+
+async def _run(source: SingleFlightSource):
+    stats = {}
+    with collect_stats(RETRIEVAL, stats):
+        documents = await source.search("prompt", ["retrieval"], {})
+    return [doc["external_id"] for doc in documents], stats
+
+
+async def test_coalesced_waiters_each_report_upstream_stats():
+    upstream = _UpstreamSource()
+    source = SingleFlightSource(upstream)
+
+    (first_docs, first), (second_docs, second) = await asyncio.gather(_run(source), _run(source))
+
+    assert upstream.calls == 1
+    assert first_docs == second_docs == ["a", "b"]
+    assert first["fake"]["cache_misses"] == second["fake"]["cache_misses"] == 1
+    assert first["fake"]["rate_limit_wait_ms"] == second["fake"]["rate_limit_wait_ms"] == 5
+    assert second["fake"]["coalesced"] == 1
@@ -0,0 +1,68 @@
+"""Token-budget packing of filter batches."""
+
+from __future__ import annotations
+
+from app.config import BatchTokenBudget
+from app.services.ai.token_budget import BatchPacker, document_tokens
+
+CONTEXT = {"prompt": "retrieval augmented generation", "keywords": ["retrieval"]}
+
+
+def _doc(external_id: str, words: int):
+    return {"external_id": external_id, "title": "Dense retrieval", "abstract": " ".join(["word"] * words)}
+
+
+LONG = [_doc("long-0", 200), _doc("long-1", 200)]
+SHORT = [_doc("short-0", 10), _doc("short-1", 10)]
+
+
+def _packer(extra_tokens: int = 0, max_documents: int = 16) -> BatchPacker:
+    """A fine-stage packer whose budget fits one long and one short document."""
+    probe = BatchPacker("fine", CONTEXT, BatchTokenBudget())
+    tokens = probe.overhead + document_tokens("fine", LONG[0], probe.abstract_tokens) + document_tokens("fine", SHORT[0], probe.abstract_tokens)
+    return BatchPacker("fine", CONTEXT, BatchTokenBudget(fine_tokens=tokens + extra_tokens, fine_max_documents=max_documents))
+
+
+def _ids(batches):
+    return [[doc["external_id"] for doc in batch.documents] for batch in batches]
+
+
+def test_pack_is_first_fit_decreasing_and_keeps_input_order():
+    documents = LONG + SHORT
+    packer = _packer()
+
+    batches = packer.pack(documents)
+
+    # 按顺序切分需要三批：[long-0] [long-1, short-0] [short-1]
+    assert _ids(batches) == [["long-0", "short-0"], ["long-1", "short-1"]]
+    assert all(batch.tokens <= packer.token_budget for batch in batches)
+    streamed = [batch for doc in documents for batch in packer.add(doc)] + [packer.flush()]
+    assert len(streamed) == 3
+
+
+def test_pack_respects_max_documents():
+    documents = [_doc(f"short-{i}", 10) for i in range(5)]
+    packer = _packer(extra_tokens=10_000, max_documents=2)
+
+    assert _ids(packer.pack(documents)) == [["short-0", "short-1"], ["short-2", "short-3"], ["short-4"]]
+
+
+def test_oversized_document_gets_its_own_batch():
+    packer = _packer()
+    # 摘要会按预算截断，超长的是标题
+    huge = {**_doc("huge", 10), "title": " ".join(["title"] * 2000)}
+
+    batches = packer.pack([SHORT[0], huge, SHORT[1]])
+
+    assert _ids(batches) == [["short-0", "short-1"], ["huge"]]
+    assert batches[1].tokens > packer.token_budget
+
+
+def test_add_emits_full_batches_and_flush_returns_the_rest():
+    packer = _packer(extra_tokens=10_000, max_documents=2)
+
+    assert packer.add(SHORT[0]) == []
+    assert _ids(packer.add(SHORT[1])) == [["short-0", "short-1"]]
+    assert packer.add(LONG[0]) == []
+    assert _ids([packer.flush()]) == [["long-0"]]
+    assert packer.flush() is None
@@ -0,0 +1,85 @@
+"""Per-source retrieval watermarks."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.db import models
+from app.db.repositories import TaskRepository
+from app.services.tasks.task_runner import TaskRunner
+
+NOW = datetime(2026, 3, 10, tzinfo=timezone.utc)
+
+
+def _docs(count: int):
+    # 按提交时间倒序，与 arXiv 默认分页一致
+    return [{"external_id": f"doc-{i}", "published_at": NOW - timedelta(days=i)} for i in range(count)]
+
+
+class _Source:
+    name = "arxiv"
+
+    def __init__(self, documents, delay: float = 0.0) -> None:
+        self._documents = documents
+        self._delay = delay
+
+    def describe_query(self, prompt, keywords, parameters, limit=None):
+        max_results = int(parameters.get("max_results", 50))
+        return {"max_results": min(max_results, limit) if limit is not None else max_results}
+
+    async def iter_search(self, prompt, keywords, parameters, limit=None):
+        for doc in self._documents[: self.describe_query(prompt, keywords, parameters, limit)["max_results"]]:
+            yield [doc]
+            await asyncio.sleep(self._delay)
+
+
+def _runner(source: _Source) -> TaskRunner:
+    runner = TaskRunner.__new__(TaskRunner)
+    runner._retrieval = SimpleNamespace(get=lambda name: source)
+    return runner
+
+
+async def _retrieve(runner: TaskRunner, parameters):
+    task = SimpleNamespace(prompt="p", filter_config={})
+    task_source = SimpleNamespace(source=SimpleNamespace(name="arxiv"), parameters=parameters)
+    stats = {}
+    docs = await runner._retrieve_from_source(task, task_source, [], {}, 50, stats)
+    return docs, stats
+
+
+async def _watermark(session, runner: TaskRunner, docs, stats) -> datetime:
+    task = models.Task(name="t", prompt="p", filter_config={}, ai_config={})
+    session.add(task)
+    await session.flush()
+    repo = TaskRepository(session)
+    await runner._advance_watermarks(repo, task, {"arxiv": docs}, stats)
+    mark = (await repo.get_watermarks(task.id))["arxiv"]
+    return mark.last_published_at.replace(tzinfo=timezone.utc)
+
+
+async def test_complete_fetch_advances_to_newest(session):
+    runner = _runner(_Source(_docs(5)))
+    docs, stats = await _retrieve(runner, {"max_results": 10})
+
+    assert stats["arxiv"]["complete"] is True
+    assert await _watermark(session, runner, docs, stats) == NOW
+
+
+async def test_capped_fetch_advances_only_to_oldest(session):
+    runner = _runner(_Source(_docs(30)))
+    docs, stats = await _retrieve(runner, {"max_results": 10})
+
+    assert len(docs) == 10
+    assert stats["arxiv"]["complete"] is False
+    assert await _watermark(session, runner, docs, stats) == NOW - timedelta(days=9)
+
+
+async def test_timed_out_fetch_advances_only_to_oldest(session):
+    runner = _runner(_Source(_docs(10), delay=0.05))
+    docs, stats = await _retrieve(runner, {"max_results": 10, "timeout": 0.12})
+
+    assert stats["arxiv"]["status"] == "timeout"
+    assert 0 < len(docs) < 10
+    assert await _watermark(session, runner, docs, stats) == NOW - timedelta(days=len(docs) - 1)